@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Throughput benchmark for ConsoleDashWidget and MonitorDashWidget under synthetic load.
+
+A producer thread feeds generated ``rosgraph_msgs/Log`` messages into
+``ConsoleDashWidget._message_cb`` and ``diagnostic_msgs/DiagnosticStatus``
+messages into ``MonitorDashWidget.toplevel_state_callback``, the same way
+rospy callback threads would, while the Qt event loop runs on the main
+thread. No ROS master is needed.
+
+Reports sustained throughput, GUI thread latency, memory growth and
+the messages missing from the console model, e.g. trimmed by its message
+limit, for each configured rate.
+
+Usage::
+
+    python benchmark/bench_load.py --rates 100,1000,10000 --duration 10 \\
+        --severities info=70,warn=20,error=9,fatal=1 --burst 1:4 --output load.json
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import common
+
+SEVERITY_NAMES = {'debug': 1, 'info': 2, 'warn': 4, 'error': 8, 'fatal': 16}
+
+
+def parse_mix(text):
+    """
+    Parse ``name=weight,...`` into a list of (severity, cumulative weight).
+    """
+    mix = []
+    total = 0.0
+    for part in text.split(','):
+        name, weight = part.split('=')
+        total += float(weight)
+        mix.append((SEVERITY_NAMES[name.strip().lower()], total))
+    return [(level, weight / total) for level, weight in mix]
+
+
+def pick(mix, rng):
+    value = rng.random()
+    for level, weight in mix:
+        if value <= weight:
+            return level
+    return mix[-1][0]
+
+
+class Producer(threading.Thread):
+    """
+    Calls ``callback`` with messages from ``make_message`` at ``rate`` per second.
+    With a burst pattern ``(on, off)`` it sends at ``rate * (on + off) / on``
+    for ``on`` seconds and stays silent for ``off`` seconds, keeping the mean rate.
+    """
+    def __init__(self, callback, make_message, rate, duration, burst=None):
+        super(Producer, self).__init__()
+        self.daemon = True
+        self._callback = callback
+        self._make_message = make_message
+        self._rate = rate
+        self._duration = duration
+        self._burst = burst
+        self.sent = 0
+        self.behind = 0.0
+
+    def run(self):
+        start = time.time()
+        tick = 0.01
+        due = 0.0
+        while True:
+            now = time.time() - start
+            if now >= self._duration:
+                break
+            rate = self._rate
+            if self._burst:
+                on, off = self._burst
+                rate = rate * (on + off) / on if now % (on + off) < on else 0.0
+            due += rate * tick
+            while due >= 1.0:
+                self._callback(self._make_message(self.sent))
+                self.sent += 1
+                due -= 1.0
+            # Time the producer could not keep up with the requested rate
+            self.behind = max(self.behind, (time.time() - start) - now - tick)
+            time.sleep(max(0.0, tick - (time.time() - start - now)))
+
+
+class LatencyProbe(object):
+    """
+    A 10 ms timer on the GUI thread recording how late it fires.
+    """
+    def __init__(self):
+        from python_qt_binding.QtCore import QTimer
+        self.samples = []
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._beat)
+        self._last = time.time()
+        self._timer.start(10)
+
+    def _beat(self):
+        now = time.time()
+        self.samples.append(max(0.0, (now - self._last) * 1000.0 - 10.0))
+        self._last = now
+
+    def stop(self):
+        self._timer.stop()
+        samples = sorted(self.samples) or [0.0]
+        return {'gui_latency_ms_p50': samples[len(samples) // 2],
+                'gui_latency_ms_p99': samples[int(len(samples) * 0.99)],
+                'gui_latency_ms_max': samples[-1]}
+
+
+def run_event_loop(duration, done):
+    from python_qt_binding.QtWidgets import QApplication
+    end = time.time() + duration
+    while time.time() < end or not done():
+        QApplication.processEvents()
+        time.sleep(0.001)
+
+
+def bench_console(rate, args, rng):
+    from genpy import Time
+    from rosgraph_msgs.msg import Log
+    from rqt_robot_dashboard.console_dash_widget import ConsoleDashWidget
+    from rqt_robot_dashboard.profiling import rss_kb
+
+    mix = parse_mix(args.severities)
+    widget = ConsoleDashWidget(common.make_plugin_context())
+    inserted = [0]
+    insert_rows = widget._datamodel.insert_rows
+
+    def counting_insert(msgs):
+        inserted[0] += len(msgs)
+        return insert_rows(msgs)
+    widget._datamodel.insert_rows = counting_insert
+
+    def make_message(i):
+        msg = Log(level=pick(mix, rng), name='/node_%d' % (i % args.nodes),
+                  msg='synthetic message %d' % i, file='bench_load.py', function='make_message',
+                  line=i % 1000, topics=['/rosout'])
+        msg.header.stamp = Time.from_sec(time.time())
+        return msg
+
+    rss_before = rss_kb()
+    probe = LatencyProbe()
+    producer = Producer(widget._message_cb, make_message, rate, args.duration, args.burst)
+    start = time.time()
+    producer.start()
+    # Keep the loop running until the widget drained its queue
+    run_event_loop(args.duration, lambda: not producer.is_alive() and not widget._message_queue)
+    elapsed = time.time() - start
+    result = probe.stop()
+    # Rows trimmed by the model's message limit count as dropped
+    rows = widget._datamodel.rowCount()
+    widget.shutdown_widget()
+    result.update({
+        'requested_rate': rate,
+        'sent': producer.sent,
+        'inserted': inserted[0],
+        'model_rows': rows,
+        'dropped': producer.sent - rows,
+        'sustained_rate': inserted[0] / elapsed,
+        'drain_seconds': max(0.0, elapsed - args.duration),
+        'producer_behind_seconds': producer.behind,
+        'rss_growth_kb': rss_kb() - rss_before,
+    })
+    return result
+
+
+def bench_monitor(rate, args, rng):
+    from diagnostic_msgs.msg import DiagnosticStatus
+    from rqt_robot_dashboard.monitor_dash_widget import MonitorDashWidget
+    from rqt_robot_dashboard.profiling import rss_kb
+
+    widget = MonitorDashWidget(common.make_plugin_context())
+    changes = [0]
+    widget.state_changed.connect(lambda state: changes.__setitem__(0, changes[0] + 1))
+
+    def make_message(i):
+        # Mostly OK with occasional warnings and errors, to exercise state changes
+        value = rng.random()
+        level = 2 if value < args.flap / 2 else 1 if value < args.flap else 0
+        return DiagnosticStatus(level=level, name='toplevel_state')
+
+    rss_before = rss_kb()
+    probe = LatencyProbe()
+    producer = Producer(widget.toplevel_state_callback, make_message, rate, args.duration, args.burst)
+    start = time.time()
+    producer.start()
+    run_event_loop(args.duration, lambda: not producer.is_alive())
+    elapsed = time.time() - start
+    result = probe.stop()
+    widget.shutdown_widget()
+    result.update({
+        'requested_rate': rate,
+        'sent': producer.sent,
+        'sustained_rate': producer.sent / elapsed,
+        'state_changes': changes[0],
+        'producer_behind_seconds': producer.behind,
+        'rss_growth_kb': rss_kb() - rss_before,
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rates', default='100,1000,5000',
+                        help='comma separated message rates per second')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per rate')
+    parser.add_argument('--severities', default='debug=5,info=70,warn=15,error=9,fatal=1',
+                        help='relative weights of rosout severities')
+    parser.add_argument('--nodes', type=int, default=20, help='number of distinct publishing nodes')
+    parser.add_argument('--flap', type=float, default=0.05,
+                        help='fraction of diagnostics messages which are not OK')
+    parser.add_argument('--burst', default=None,
+                        help='on:off seconds, send bursts keeping the mean rate')
+    parser.add_argument('--widgets', default='console,monitor')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+    if args.burst:
+        args.burst = tuple(float(v) for v in args.burst.split(':'))
+
+    common.setup_offscreen()
+    common.stub_rospkg()
+    common.use_fake_transport()
+
+    rng = random.Random(args.seed)
+    benches = {'console': bench_console, 'monitor': bench_monitor}
+    results = {}
+    for name in args.widgets.split(','):
+        for rate in [int(r) for r in args.rates.split(',')]:
+            results['%s at %d/s' % (name, rate)] = benches[name](rate, args, rng)
+    common.write_results('load', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Benchmarks icon composition, widget construction and full dashboard builds.
+
+Runs on the Qt offscreen platform without a ROS master, with rospkg
+lookups resolved to this checkout.
+
+Usage::
+
+    python benchmark/bench_widgets.py [--widgets 10,100,300] [--output results.json]
+"""
+
+import argparse
+import os
+
+import common
+
+CONSOLE_ICONS = [['bg-green.svg', 'ic-console.svg'],
+                 ['bg-yellow.svg', 'ic-console.svg', 'ol-warn-badge.svg'],
+                 ['bg-red.svg', 'ic-console.svg', 'ol-err-badge.svg'],
+                 ['bg-grey.svg', 'ic-console.svg', 'ol-stale-badge.svg']]
+
+
+def bench_icons(results, repeat):
+    from python_qt_binding.QtCore import QSize
+    from rqt_robot_dashboard.util import IconAtlas, IconHelper
+
+    helper = IconHelper([os.path.join(common.ROOT, 'images')], 'benchmark')
+    composite = CONSOLE_ICONS[1]
+    number = 50
+
+    timing = common.measure(lambda: helper.build_icon(composite), repeat, number)
+    timing['composites_per_second'] = 1.0 / timing['best_seconds']
+    results['icon composite (build_icon)'] = timing
+
+    found = [helper.find_image(name) for name in composite]
+    timing = common.measure(lambda: helper.make_image(found, QSize(50, 30)), repeat, number)
+    timing['composites_per_second'] = 1.0 / timing['best_seconds']
+    results['icon composite (make_image 50x30)'] = timing
+
+    # Copies, because set_icon_lists appends overlay states to short lists
+    results['set_icon_lists (4 states)'] = common.measure(
+        lambda: helper.set_icon_lists([list(i) for i in CONSOLE_ICONS]), repeat, 10)
+
+    def fill_atlas():
+        atlas = IconAtlas(QSize(50, 30))
+        helper.set_atlas_lists(atlas, [list(i) for i in CONSOLE_ICONS])
+        atlas.pixmap()
+    results['set_atlas_lists (4 states)'] = common.measure(fill_atlas, repeat, 10)
+
+
+def bench_widgets(results, repeat):
+    from rqt_robot_dashboard.icon_tool_button import IconToolButton
+    from rqt_robot_dashboard.indicator_strip import IndicatorItem
+
+    results['IconToolButton.__init__'] = common.measure(
+        lambda: IconToolButton('benchmark', [list(i) for i in CONSOLE_ICONS]), repeat, 10)
+    results['IndicatorItem.__init__'] = common.measure(
+        lambda: IndicatorItem('benchmark', [list(i) for i in CONSOLE_ICONS]), repeat, 10)
+
+
+def bench_dashboards(results, repeat, counts):
+    from rqt_robot_dashboard.dashboard import Dashboard
+    from rqt_robot_dashboard.icon_tool_button import IconToolButton
+    from rqt_robot_dashboard.indicator_strip import IndicatorItem, IndicatorStrip
+
+    class ButtonDashboard(Dashboard):
+        def setup(self, context):
+            self.name = 'Benchmark'
+            self.paged_layout = context.argv() == ['paged']
+
+        def get_widgets(self):
+            buttons = [IconToolButton('button %d' % i, [list(icon) for icon in CONSOLE_ICONS])
+                       for i in range(self.count)]
+            return [buttons[i:i + 5] for i in range(0, len(buttons), 5)]
+
+    class StripDashboard(Dashboard):
+        def get_widgets(self):
+            items = [IndicatorItem('item %d' % i, [list(icon) for icon in CONSOLE_ICONS])
+                     for i in range(self.count)]
+            return [[IndicatorStrip(items[i:i + 50])] for i in range(0, len(items), 50)]
+
+    for count in counts:
+        for case, cls, argv in (('toolbar', ButtonDashboard, []),
+                                ('paged', ButtonDashboard, ['paged']),
+                                ('indicator strip', StripDashboard, [])):
+            def build():
+                cls.count = count
+                dashboard = cls(common.make_plugin_context(argv))
+                toolbar = dashboard.context.toolbars[0]
+                toolbar.resize(1200, 60)
+                toolbar.show()
+                common.process_events()
+                dashboard.shutdown_plugin()
+                toolbar.close()
+            timing = common.measure(build, repeat)
+            timing['widgets'] = count
+            results['dashboard build, %d widgets (%s)' % (count, case)] = timing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--widgets', default='10,100',
+                        help='comma separated widget counts for the dashboard build benchmark')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    common.setup_offscreen()
+    common.stub_rospkg()
+    common.use_fake_transport()
+
+    results = {}
+    bench_icons(results, args.repeat)
+    bench_widgets(results, args.repeat)
+    bench_dashboards(results, args.repeat, [int(c) for c in args.widgets.split(',')])
+    common.write_results('widgets', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
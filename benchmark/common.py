@@ -0,0 +1,171 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Shared helpers for the dashboard benchmarks.
+
+Benchmarks run headless on the Qt ``offscreen`` platform and without a ROS
+master. Results are written as JSON so runs on different commits can be
+compared with ``compare.py``.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_app = None
+
+
+def setup_offscreen():
+    """
+    Create the QApplication on the offscreen platform, unless another
+    platform was requested explicitly through ``QT_QPA_PLATFORM``.
+    """
+    global _app
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    if os.path.join(ROOT, 'src') not in sys.path:
+        sys.path.insert(0, os.path.join(ROOT, 'src'))
+    from python_qt_binding.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication(['benchmark'])
+    return _app
+
+
+class StaticRosPack(object):
+    """
+    Stands in for ``rospkg.RosPack`` so icon lookups do not depend on the
+    ROS package path, or on its crawl time. Only rqt_robot_dashboard is known.
+    """
+    def get_path(self, name):
+        if name != 'rqt_robot_dashboard':
+            raise KeyError(name)
+        return ROOT
+
+
+def stub_rospkg():
+    """
+    Make ``rospkg.RosPack`` resolve rqt_robot_dashboard to this checkout.
+    """
+    try:
+        import rospkg
+    except ImportError:
+        import types
+        rospkg = types.ModuleType('rospkg')
+        sys.modules['rospkg'] = rospkg
+    rospkg.RosPack = StaticRosPack
+
+
+def use_fake_transport():
+    """
+    Run widgets on an in-process transport with the wall clock, so no ROS
+    node or master is needed.
+
+    :returns: the installed ``FakeTransport``
+    """
+    from rqt_robot_dashboard.transport import FakeTransport, set_transport
+    transport = FakeTransport(clock=time.time)
+    set_transport(transport)
+    return transport
+
+
+def make_plugin_context(argv=None):
+    """
+    :returns: a :class:`rqt_robot_dashboard.plugin_context.FakePluginContext`,
+              call :func:`setup_offscreen` first
+    """
+    from rqt_robot_dashboard.plugin_context import FakePluginContext
+    return FakePluginContext(argv)
+
+
+def process_events():
+    from python_qt_binding.QtWidgets import QApplication
+    QApplication.processEvents()
+
+
+def measure(function, repeat=5, number=1):
+    """
+    Run ``function`` ``number`` times per sample and take ``repeat`` samples.
+
+    :returns: dict with the best and mean time of one call in seconds
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.time()
+        for _ in range(number):
+            function()
+        samples.append((time.time() - start) / number)
+    return {'best_seconds': min(samples), 'mean_seconds': sum(samples) / len(samples),
+            'repeat': repeat, 'number': number}
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.STDOUT).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(name, results, path=None):
+    """
+    Print ``results`` and, if ``path`` is given, write them with some
+    metadata about the run as JSON.
+
+    :param name: Name of the benchmark.
+    :type name: str
+    :param results: dict of case name to a dict of measured values.
+    :type results: dict
+    """
+    for case, values in sorted(results.items()):
+        print('%-40s %s' % (case, '  '.join('%s=%s' % (k, _format(v)) for k, v in sorted(values.items()))))
+    if path:
+        document = {
+            'benchmark': name,
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.time(),
+            'results': results,
+        }
+        with open(path, 'w') as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+
+
+def _format(value):
+    if isinstance(value, float):
+        return '%.6g' % value
+    return str(value)
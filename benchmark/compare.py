@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Compares two benchmark result files written with ``--output``.
+
+Usage::
+
+    python benchmark/compare.py baseline.json candidate.json
+"""
+
+import argparse
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--key', default=None,
+                        help='value to compare, by default best_seconds or min_seconds')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print('%s (%s) -> %s (%s)' % (baseline.get('revision'), args.baseline,
+                                  candidate.get('revision'), args.candidate))
+    for case in sorted(set(baseline['results']) & set(candidate['results'])):
+        old = baseline['results'][case]
+        new = candidate['results'][case]
+        key = args.key
+        if key is None:
+            key = 'best_seconds' if 'best_seconds' in old else 'min_seconds'
+        if key not in old or key not in new or not old[key]:
+            continue
+        print('%-45s %10.6g %10.6g  %+6.1f%%' % (case, old[key], new[key],
+                                                100.0 * (new[key] - old[key]) / old[key]))
+    for case in sorted(set(baseline['results']) ^ set(candidate['results'])):
+        print('%-45s only in %s' % (case, 'baseline' if case in baseline['results'] else 'candidate'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Measures how long it takes to import the dashboard widgets in a fresh interpreter.
+
+The ``minimal`` case imports only what a battery and menu dashboard needs,
+the ``all`` case imports every widget, which loads rqt_console,
+rqt_robot_monitor and rqt_nav_view as well. Each case runs in its own
+process so module caches do not carry over between runs.
+
+Usage::
+
+    python benchmark/import_time.py [--repeat N] [--output results.json]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+import common
+
+CASES = {
+    'minimal': 'from rqt_robot_dashboard.widgets import BatteryDashWidget, MenuDashWidget',
+    'all': 'from rqt_robot_dashboard.widgets import *',
+}
+
+_TIMER = '''
+import sys, time
+start = time.time()
+%s
+sys.stdout.write('%%f %%d' %% (time.time() - start, len(sys.modules)))
+'''
+
+
+def time_import(statement, repeat):
+    """
+    :returns: list of (seconds, number of loaded modules) for each run
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.join(common.ROOT, 'src')] +
+                                        ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', _TIMER % statement], env=env)
+        seconds, modules = output.decode().split()
+        runs.append((float(seconds), int(modules)))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in sorted(CASES.items()):
+        runs = time_import(statement, args.repeat)
+        results[name] = {
+            'min_seconds': min(r[0] for r in runs),
+            'mean_seconds': sum(r[0] for r in runs) / len(runs),
+            'modules': runs[-1][1],
+        }
+    common.write_results('import_time', results, args.output)
+    print('minimal/all: %.1f%%' % (100.0 * results['minimal']['min_seconds'] / results['all']['min_seconds']))
+
+
+if __name__ == '__main__':
+    main()
@@ -31,13 +31,17 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 
-import os
-import rospkg
+import time
+
 from python_qt_binding.QtCore import Signal, QSize
+from python_qt_binding.QtGui import QIcon
 from python_qt_binding.QtWidgets import QLabel
-from .util import IconHelper
+from .profiling import startup_profiler
+from .repaint import repaint_scheduler
+from .util import IconHelper, LazyToolTipMixin, hidden_in_parent, resolve_icon_paths
+from .watchdog import watchdog
 
-class BatteryDashWidget(QLabel):
+class BatteryDashWidget(LazyToolTipMixin, QLabel):
     """
     A Widget which displays incremental battery state, including a status tip.
     To use this widget simply call :func:`update_perc` and :func:`update_time`
@@ -45,12 +49,19 @@ class BatteryDashWidget(QLabel):
 
     :param name: The name of this widget
     :type name: str
+
+    Pixmap changes are committed through
+    :data:`rqt_robot_dashboard.repaint.repaint_scheduler`, only the empty
+    battery (state 0) bypasses its frame rate.
     """
     state_changed = Signal(int)
+    priority_states = (0,)
 
+    @startup_profiler.profile_widget
     def __init__(self, name='Battery', icons=None, charge_icons=None,
                  icon_paths=None, suppress_overlays=False, stale_icon=None):
         super(BatteryDashWidget, self).__init__()
+        self._pixmap_outdated = False
         if not icons:
             icons = []
             charge_icons = []
@@ -59,35 +70,81 @@ class BatteryDashWidget(QLabel):
                 charge_icons.append(['ic-battery-charge-%s.svg' % (x * 20)])
         if not stale_icon:
             stale_icon = ['ic-battery-0.svg', 'ol-stale-battery.svg']
-        icon_paths = (icon_paths if icon_paths else []) + [['rqt_robot_dashboard', 'images']]
-        paths = []
-        rp = rospkg.RosPack()
-        for path in icon_paths:
-            paths.append(os.path.join(rp.get_path(path[0]), path[1]))
-        self._icon_helper = IconHelper(paths, name)
+        self._icon_helper = IconHelper(resolve_icon_paths(icon_paths), name)
         # Add stale icon at end of icons so that it gets composited
         icons.append(stale_icon)
         charge_icons.append(stale_icon) # Need icons and charge_icons length to be same
+        # Discharging, charging and stale icons in one list, for indicator_icons
+        all_icons = [list(icon) for icon in icons + charge_icons]
+        self._indicator_icons = (all_icons, [list(icon) for icon in all_icons], True)
         converted_icons = self._icon_helper.set_icon_lists(icons, charge_icons, suppress_overlays)
         self._icons = converted_icons[0]
         self._charge_icons = converted_icons[1]
         self._name = name
         self._charging = False
         self._stale = True
+        self._time_value = 0
+        self._tooltip_stale = False
         self.__state = 0
         self.setMargin(5)
-        self.state_changed.connect(self._update_state)
+        self.state_changed.connect(watchdog.watch(self._update_state, '%s._update_state' % name))
         self.update_perc(0)
         self.update_time(0)
+        # Only updates from the dashboard count as live data
+        self._state_stamp = None
 
     def _update_state(self, state):
-        if self._stale:
+        urgent = state in self.priority_states and not self._stale
+        repaint_scheduler.schedule(self, lambda: self._commit_pixmap(state), urgent)
+
+    def _commit_pixmap(self, state):
+        if hidden_in_parent(self):
+            # The pixmap is set in showEvent once the widget is visible again
+            self._pixmap_outdated = True
+            return
+        if self._cached_state is not None:
+            # Restored from saved settings, shown greyed out until live data arrives
+            icons = self._charge_icons if self._charging else self._icons
+            self.setPixmap(icons[state].pixmap(QSize(60, 100), QIcon.Disabled))
+        elif self._stale:
             self.setPixmap(self._icons[-1].pixmap(QSize(60, 100)))
         elif self._charging:
             self.setPixmap(self._charge_icons[state].pixmap(QSize(60, 100)))
         else:
             self.setPixmap(self._icons[state].pixmap(QSize(60, 100)))
 
+    def showEvent(self, event):
+        if self._pixmap_outdated:
+            self._pixmap_outdated = False
+            self._commit_pixmap(self.__state)
+        super(BatteryDashWidget, self).showEvent(event)
+
+    @property
+    def icon_helper(self):
+        return self._icon_helper
+
+    def indicator_icons(self):
+        """
+        The icon file names of this widget, used to show it in an
+        :class:`rqt_robot_dashboard.indicator_strip.IndicatorStrip`.
+        The charging icons follow the discharging ones, the stale icon is the
+        last of each.
+
+        :returns: tuple of ``icons``, ``clicked_icons`` and ``suppress_overlays``
+        """
+        return self._indicator_icons
+
+    def indicator_state(self):
+        """
+        Index into :func:`indicator_icons` of the icon to draw for the current state.
+        """
+        count = len(self._icons)
+        if self._stale:
+            return count - 1
+        if self._charging:
+            return count + self.__state
+        return self.__state
+
     @property
     def state(self):
         """
@@ -120,16 +177,62 @@ class BatteryDashWidget(QLabel):
         """
         if 0 <= state and state < len(self._icons):
             self.__state = state
+            self._cached_state = None
             self.state_changed.emit(self.__state)
         else:
             raise IndexError("%s update_state received invalid state: %s" % (self._name, state))
 
     def update_time(self, value):
+        # The tooltip text is only built in tooltip_text, when it is shown
+        self._time_value = value
+        self._tooltip_stale = False
+        self.tooltip_data_changed()
+        self._state_stamp = time.time()
+        if self._cached_state is not None:
+            self._cached_state = None
+            self.state_changed.emit(self.__state)
+
+    def tooltip_text(self):
+        if self._tooltip_stale:
+            return "%s: Stale" % self._name
         try:
-            fval = float(value)
-            self.setToolTip("%s: %.2f%% remaining" % (self._name, fval))
+            fval = float(self._time_value)
+            return "%s: %.2f%% remaining" % (self._name, fval)
         except ValueError:
-            self.setToolTip("%s: %s%% remaining" % (self._name, value))
+            return "%s: %s%% remaining" % (self._name, self._time_value)
+
+    def snapshot_state(self):
+        """
+        The state saved by the dashboard to show it again on the next start.
+
+        :returns: dict with ``state``, ``tooltip``, ``stamp``, ``time`` and ``charging`` entries, or ``None``.
+        """
+        if self._cached_state is not None:
+            return self._cached_state
+        if self._state_stamp is None or self._tooltip_stale:
+            return None
+        return {'state': self.__state, 'tooltip': self.tooltip_text(), 'stamp': self._state_stamp,
+                'time': self._time_value, 'charging': self._charging}
+
+    def restore_cached_state(self, snapshot):
+        """
+        Show a state saved by :func:`snapshot_state`, marked as cached until
+        the next call to :func:`update_state`.
+
+        :param snapshot: The saved state.
+        :type snapshot: dict
+        """
+        state = snapshot.get('state')
+        if not isinstance(state, int) or not 0 <= state < len(self._icons) - 1:
+            return
+        if self._state_stamp is not None:
+            # A live update arrived already
+            return
+        self._charging = bool(snapshot.get('charging', False))
+        self._time_value = snapshot.get('time', 0)
+        self.__state = state
+        self._cached_state = snapshot
+        self.state_changed.emit(self.__state)
 
     def set_stale(self):
         """Set button to stale.
@@ -138,7 +241,8 @@ class BatteryDashWidget(QLabel):
         """
         self._charging = False
         self._stale = True
-        self.setToolTip("%s: Stale" % self._name)
+        self._tooltip_stale = True
+        self.tooltip_data_changed()
         # This triggers self.update_state which in turn will trigger _update_state
         self.update_perc(0)
 
@@ -30,17 +30,27 @@
 # ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+from collections import deque
+
 from rosgraph_msgs.msg import Log
 import rospkg
-import rospy
 from python_qt_binding.QtCore import QMutex, QMutexLocker, QSize, QTimer
 
 from rqt_console.console import Console
 from rqt_console.console_widget import ConsoleWidget
+from rqt_console.message import Message
 from rqt_console.message_data_model import MessageDataModel
 from rqt_console.message_proxy_model import MessageProxyModel
 
 from .icon_tool_button import IconToolButton
+from .log_spool import LogSpool
+from .log_store import ColumnarLogStore, LogRecord, LogSummary, record_from_log, summarize
+from .metrics import SIZE_BOUNDS, registry
+from .profiling import startup_profiler
+from .rosout_worker import RosoutWorker
+from .severity_index import SeverityIndex
+from .util import dasherr
+from .watchdog import watchdog
 
 
 class ConsoleDashWidget(IconToolButton):
@@ -49,8 +59,42 @@ class ConsoleDashWidget(IconToolButton):
 
     :param context: The plugin context to create the monitor in.
     :type context: qt_gui.plugin_context.PluginContext
+    :param spool_path: Append every received message to this file, see
+                       :class:`rqt_robot_dashboard.log_spool.LogSpool`, and
+                       keep only the latest ``memory_limit`` in the console.
+                       Older messages are brought back with :func:`load_spooled`.
+    :type spool_path: str
+    :param memory_limit: Number of messages shown in the console with ``spool_path`` or ``columnar``.
+    :type memory_limit: int
+    :param columnar: Keep received messages in a
+                     :class:`rqt_robot_dashboard.log_store.ColumnarLogStore`
+                     instead of one message object per row. Message objects
+                     are only created for the newest ``memory_limit`` messages
+                     while the console is shown, and dropped when it is hidden.
+    :type columnar: bool
+    :param store_limit: Number of messages kept in the columnar store,
+                        ten times ``memory_limit`` by default.
+    :type store_limit: int
+    :param ingest_process: Subscribe to ``/rosout_agg`` and decode the
+                           messages in a separate process, see
+                           :class:`rqt_robot_dashboard.rosout_worker.RosoutWorker`,
+                           so log storms do not slow down the dashboard.
+                           The state follows the worker's exact counts, the
+                           console shows a sample of the messages. Implies ``columnar``.
+    :type ingest_process: bool
+    :param ingest_min_severity: Lowest severity shown in the console with
+                                ``ingest_process``, e.g. ``Message.WARN``.
+                                Messages below it are still counted.
+    :type ingest_min_severity: int
     """
-    def __init__(self, context, icon_paths=None, minimal=True):
+    # Errors are shown without waiting for the next repaint frame
+    priority_states = (2,)
+    #: Number of offending nodes listed in the tooltip.
+    top_count = 3
+
+    @startup_profiler.profile_widget
+    def __init__(self, context, icon_paths=None, minimal=True, spool_path=None, memory_limit=5000,
+                 columnar=False, ingest_process=False, store_limit=None, ingest_min_severity=0):
         ok_icon = ['bg-green.svg', 'ic-console.svg']
         warn_icon = ['bg-yellow.svg', 'ic-console.svg', 'ol-warn-badge.svg']
         err_icon = ['bg-red.svg', 'ic-console.svg', 'ol-err-badge.svg']
@@ -66,6 +110,18 @@ class ConsoleDashWidget(IconToolButton):
         self._datamodel = MessageDataModel()
         self._proxymodel = MessageProxyModel()
         self._proxymodel.setSourceModel(self._datamodel)
+        self._memory_limit = memory_limit
+        self._spool = None
+        # Per load_spooled query, the stamp of the oldest message loaded so far
+        self._spool_cursors = {}
+        if spool_path:
+            self._spool = LogSpool(spool_path)
+            self._datamodel.set_message_limit(memory_limit)
+        self._store = None
+        self._synced_seq = 0
+        if columnar or ingest_process:
+            self._store = ColumnarLogStore(limit=store_limit or memory_limit * 10)
+            self._datamodel.set_message_limit(memory_limit)
 
         self._console = None
         self._rospack = rospkg.RosPack()
@@ -74,18 +130,35 @@ class ConsoleDashWidget(IconToolButton):
             self._console.destroyed.connect(self._console_destroyed)
 
         self._message_queue = []
+        # Set once the first message arrived, see update_rosout
+        self._received_messages = False
+        self._severity_index = SeverityIndex(window=30.0)
         self._mutex = QMutex()
-        self._subscriber = rospy.Subscriber('/rosout_agg', Log, self._message_cb)
+        self._metric_queue_length = registry.gauge('%s/queue length' % self.metrics_scope)
+        self._metric_batch_size = registry.histogram('%s/insert batch size' % self.metrics_scope, SIZE_BOUNDS)
+        self._metric_update_rosout = registry.histogram('%s/update_rosout ms' % self.metrics_scope)
+        self._worker = None
+        self._subscriber = None
+        # (receive time, LogSummary) per poll of the worker, and their sum
+        self._worker_counts = deque()
+        self._worker_totals = [0] * len(LogSummary._fields)
+        if ingest_process:
+            self._worker = RosoutWorker('/rosout_agg', min_severity=ingest_min_severity)
+            self._metric_worker_dropped = registry.gauge('%s/worker dropped' % self.metrics_scope)
+            self._worker.start()
+        else:
+            self._subscriber = self._transport.subscribe('/rosout_agg', Log, self._message_cb)
 
         self.context = context
-        self.clicked.connect(self._show_console)
+        self.clicked.connect(watchdog.watch(self._show_console, '%s._show_console' % self.name))
 
         self.update_state(0)
         self._timer = QTimer()
-        self._timer.timeout.connect(self._insert_messages)
+        self._timer.timeout.connect(watchdog.watch(self._insert_messages, '%s._insert_messages' % self.name))
         self._timer.start(100)
 
         self._console_shown = False
+        self._summary = None
         self.setToolTip("Rosout")
 
     def _show_console(self):
@@ -96,7 +169,9 @@ class ConsoleDashWidget(IconToolButton):
             if self._console_shown:
                 self.context.remove_widget(self._console)
                 self._console_shown = not self._console_shown
+                self._drop_synced_rows()
             else:
+                self._sync_console()
                 self.context.add_widget(self._console)
                 self._console_shown = not self._console_shown
         except Exception:
@@ -104,34 +179,83 @@ class ConsoleDashWidget(IconToolButton):
             self._show_console()
 
     def _insert_messages(self):
-        with QMutexLocker(self._mutex):
-            msgs = self._message_queue
-            self._message_queue = []
+        if self._worker is not None:
+            msgs, counts = self._worker.poll()
+            self._metric_worker_dropped.set(self._worker.dropped)
+            if any(counts):
+                self._received_messages = True
+                self._worker_counts.append((self._transport.get_time(), counts))
+                self._worker_totals = [total + count for total, count in zip(self._worker_totals, counts)]
+            if self._console is not None and self._console._paused:
+                msgs = []
+            if not self._worker.alive:
+                self._worker_died()
+        else:
+            with QMutexLocker(self._mutex):
+                msgs = self._message_queue
+                self._message_queue = []
+            self._metric_queue_length.set(0)
         if msgs:
-            self._datamodel.insert_rows(msgs)
+            self._received_messages = True
+            self._metric_batch_size.observe(len(msgs))
+            if self._store is not None:
+                self._store.append(msgs)
+                if self._console_shown:
+                    self._sync_console()
+            else:
+                self._datamodel.insert_rows(msgs)
+            self._severity_index.add_messages(self._transport.get_time(), msgs)
+            if self._spool:
+                if self._store is None:
+                    msgs = [LogRecord(msg.stamp[0], msg.stamp[1], msg.severity, msg.node,
+                                      msg.location, msg.topics, msg.message) for msg in msgs]
+                self._spool.append(msgs)
 
         # The console may not yet be initialized or may have been closed
         # So fail silently
         try:
-            self.update_rosout()
+            with self._metric_update_rosout.time():
+                self.update_rosout()
         except:
             pass
 
+    def _worker_died(self):
+        # Keep the console working with an in-process subscription
+        self._worker.stop(block=False)
+        self._worker = None
+        dasherr('The rosout worker process exited, receiving /rosout_agg in the dashboard instead.',
+                self, 'Console')
+        self._subscriber = self._transport.subscribe('/rosout_agg', Log, self._message_cb)
+
     def _message_cb(self, log_msg):
         if not self._console._paused:
-            msg = Console.convert_rosgraph_log_message(log_msg)
+            if self._store is not None:
+                msg = record_from_log(log_msg)
+            else:
+                msg = Console.convert_rosgraph_log_message(log_msg)
             with QMutexLocker(self._mutex):
                 self._message_queue.append(msg)
+                self._metric_queue_length.set(len(self._message_queue))
 
     def update_rosout(self):
+        if self._cached_state is not None and not self._received_messages:
+            # Keep showing the state restored from saved settings until live data arrives
+            return
         summary_dur = 30.0
-        if (rospy.get_time() < 30.0):
-            summary_dur = rospy.get_time() - 1.0
+        now = self._transport.get_time()
+        if (now < 30.0):
+            summary_dur = now - 1.0
 
         if (summary_dur < 0):
             summary_dur = 0.0
 
-        summary = self._console.get_message_summary(summary_dur)
+        if self._worker is not None:
+            summary = self._worker_summary(now - summary_dur)
+        elif self._store is not None:
+            summary = self._store.summary(now - summary_dur)
+        else:
+            # Against the transport clock rather than rqt_console's wall clock, for replays and tests
+            summary = summarize([msg.severity for msg in self._datamodel.get_message_between(now - summary_dur)])
 
         if (summary.fatal or summary.error):
             self.update_state(2)
@@ -140,6 +264,21 @@ class ConsoleDashWidget(IconToolButton):
         else:
             self.update_state(0)
 
+        # The tooltip text is only built in tooltip_text, when it is shown
+        self._summary = summary
+        self.tooltip_data_changed()
+
+    def _worker_summary(self, since):
+        # Counts of the worker's batches received since ``since``
+        while self._worker_counts and self._worker_counts[0][0] < since:
+            _, counts = self._worker_counts.popleft()
+            self._worker_totals = [total - count for total, count in zip(self._worker_totals, counts)]
+        return LogSummary(*self._worker_totals)
+
+    def tooltip_text(self):
+        summary = self._summary
+        if summary is None:
+            return None
         tooltip = ""
         if (summary.fatal):
             tooltip += "\nFatal: %s" % (summary.fatal)
@@ -156,9 +295,106 @@ class ConsoleDashWidget(IconToolButton):
             tooltip = "Rosout: no recent activity"
         else:
             tooltip = "Rosout: recent activity:" + tooltip
+        return tooltip + self._offenders_text()
+
+    def top_offenders(self, k=None):
+        """
+        The nodes which sent the most FATAL, ERROR and WARN messages in the
+        last 30 seconds, without scanning the console's message model.
 
-        if tooltip != self.toolTip():
-            self.setToolTip(tooltip)
+        :param k: Maximum number of nodes, ``top_count`` by default.
+        :type k: int
+        :returns: list of (node, [warn, error, fatal]) tuples, the worst first.
+        """
+        self._severity_index.expire(self._transport.get_time())
+        return self._severity_index.top_nodes(k or self.top_count)
+
+    def top_messages(self, k=None):
+        """
+        Like :func:`top_offenders`, for messages which only differ in numbers.
+
+        :returns: list of ((node, message), [warn, error, fatal]) tuples, the worst first.
+        """
+        self._severity_index.expire(self._transport.get_time())
+        return self._severity_index.top_fingerprints(k or self.top_count)
+
+    def _offenders_text(self):
+        lines = []
+        for node, (warn, error, fatal) in self.top_offenders():
+            counts = []
+            if fatal:
+                counts.append("%d fatal" % fatal)
+            if error:
+                counts.append("%d error" % error)
+            if warn:
+                counts.append("%d warn" % warn)
+            lines.append("%s: %s" % (node, ", ".join(counts)))
+        if not lines:
+            return ""
+        return "\nTop nodes:\n  " + "\n  ".join(lines)
+
+    def load_spooled(self, start=None, end=None, min_severity=0, limit=None):
+        """
+        Bring spooled messages back into the console, e.g. for an incident
+        further back than the in-memory history. Only available with ``spool_path``.
+        Messages still in the console are skipped. Repeating a call with the
+        same ``start``, ``end`` and ``min_severity`` pages further back, once
+        nothing older is left the next call starts again from the newest.
+
+        :param start: Earliest time in seconds, ``None`` for the beginning.
+        :type start: float
+        :param end: Latest time in seconds, ``None`` for the end.
+        :type end: float
+        :param min_severity: Lowest severity loaded, e.g. ``Message.WARN``.
+        :type min_severity: int
+        :param limit: Maximum number of messages, the newest ones are loaded.
+                      ``memory_limit`` by default, as the console keeps no more.
+        :type limit: int
+        :returns: the number of messages loaded.
+        """
+        if self._spool is None:
+            return 0
+        if limit is None:
+            limit = self._memory_limit
+        query = (start, end, min_severity)
+        cursor = self._spool_cursors.pop(query, end)
+        # The rows the console has right now, trimmed or dropped rows can be loaded again
+        seen = set(_message_key(msg) for msg in self._datamodel.get_message_between(0))
+        records = []
+        while len(records) < limit:
+            page = self._spool.read(start, cursor, min_severity, limit)
+            new = [record for record in page if _message_key(record) not in seen]
+            new = new[max(0, len(new) - (limit - len(records))):]
+            oldest = new[0] if new else page[0] if page else None
+            if oldest is None or (not new and oldest.secs + oldest.nsecs * 1e-9 == cursor):
+                break
+            seen.update(_message_key(record) for record in new)
+            records = new + records
+            # Inclusive, records sharing this stamp are skipped as seen on the next page
+            cursor = oldest.secs + oldest.nsecs * 1e-9
+        if records:
+            self._spool_cursors[query] = cursor
+            self._datamodel.insert_rows([_make_message(record) for record in records])
+        return len(records)
+
+    def _sync_console(self):
+        # Create message objects for the rows the console has not seen yet
+        if self._store is None:
+            return
+        first = max(self._synced_seq, self._store.next_seq - self._memory_limit)
+        msgs = [_make_message(record) for record in self._store.records(first)]
+        self._synced_seq = self._store.next_seq
+        if msgs:
+            self._datamodel.insert_rows(msgs)
+
+    def _drop_synced_rows(self):
+        # The columnar store keeps the messages, the console's copies are only needed while it is shown
+        if self._store is None:
+            return
+        rows = self._datamodel.rowCount()
+        if rows:
+            self._datamodel.remove_rows(list(range(rows)))
+        self._synced_seq = 0
 
     def _console_destroyed(self):
         if self._console:
@@ -170,10 +406,32 @@ class ConsoleDashWidget(IconToolButton):
             self._console.cleanup_browsers_on_close()
         if self._subscriber:
             self._subscriber.unregister()
+        if self._worker:
+            self._worker.stop()
         self._timer.stop()
+        if self._spool:
+            self._spool.close()
 
     def save_settings(self, plugin_settings, instance_settings):
         self._console.save_settings(plugin_settings, instance_settings)
 
     def restore_settings(self, plugin_settings, instance_settings):
         self._console.restore_settings(plugin_settings, instance_settings)
+
+
+def _message_key(msg):
+    # Identifies a message in the spool as well as in the console model
+    if isinstance(msg, LogRecord):
+        return (msg.secs, msg.nsecs, msg.severity, msg.node, msg.message)
+    return (msg.stamp[0], msg.stamp[1], msg.severity, msg.node, msg.message)
+
+
+def _make_message(record):
+    msg = Message()
+    msg.message = record.message
+    msg.severity = record.severity
+    msg.node = record.node
+    msg.stamp = (record.secs, record.nsecs)
+    msg.topics = record.topics
+    msg.location = record.location
+    return msg
@@ -30,27 +30,74 @@
 # ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import json
+
 from python_qt_binding.QtCore import QSize, Qt
-from python_qt_binding.QtWidgets import QToolBar, QGroupBox, QHBoxLayout
+from python_qt_binding.QtGui import QKeySequence
+from python_qt_binding.QtWidgets import QToolBar, QGroupBox, QHBoxLayout, QShortcut
 from qt_gui.plugin import Plugin
 
+from .dashboard_pager import DashboardPager
+from .metrics import MetricsPublisher, registry
+from .metrics_panel import MetricsPanel
+from .profiling import PROFILE_ARGUMENT, startup_profiler
+from .repaint import repaint_scheduler
+from .watchdog import watchdog
+
+WIDGET_STATES_KEY = 'dashboard_widget_states'
+
 
 class Dashboard(Plugin):
     """
     Base class from which dashboards should inherit.
 
+    Options a subclass can set in :func:`setup`:
+
+    * ``self.paged_layout = True`` for dashboards with many widgets. Groups
+      that do not fit in the toolbar are hidden and paged in on demand.
+    * ``self.max_frame_rate`` (e.g. ``2``) for operator stations on remote
+      displays, see :class:`rqt_robot_dashboard.repaint.RepaintScheduler`.
+      Errors and widgets with ``repaint_priority`` set are still shown
+      immediately.
+    * ``self.warm_start = False`` to not show the widget states saved with
+      the perspective, greyed out, until live data arrives.
+
+    Environment variables for debugging:
+
+    * ``RQT_DASHBOARD_PROFILE`` (or the ``--profile-startup`` plugin
+      argument) logs the startup time per phase and per widget and keeps
+      the report in ``self.startup_report``.
+    * ``RQT_DASHBOARD_METRICS=1`` records runtime metrics, shown in a debug
+      panel toggled with Ctrl+Shift+M. With ``publish`` they are also
+      published on the ``dashboard_metrics`` topic.
+    * ``RQT_DASHBOARD_WATCHDOG`` set to a threshold in milliseconds logs
+      every GUI thread stall above it with the slot that ran longest.
+    * ``RQT_DASHBOARD_MAX_FPS`` sets the frame rate like ``self.max_frame_rate``.
+
     :param context: the plugin context
     :type context: qt_gui.plugin.Plugin
     """
     def __init__(self, context):
         super(Dashboard, self).__init__(context)
         self.context = context
-        self.setup(context)
+        if PROFILE_ARGUMENT in context.argv():
+            startup_profiler.enabled = True
+        startup_profiler.reset()
+        with startup_profiler.phase('setup'):
+            self.setup(context)
 
         if not hasattr(self, 'name'):
             self.name = 'Dashboard'
         if not hasattr(self, 'max_icon_size'):
             self.max_icon_size = QSize(50, 30)
+        if not hasattr(self, 'paged_layout'):
+            self.paged_layout = False
+        if not hasattr(self, 'warm_start'):
+            self.warm_start = True
+        if not hasattr(self, 'max_frame_rate'):
+            self.max_frame_rate = None
+        if self.max_frame_rate is not None:
+            repaint_scheduler.set_frame_rate(self.max_frame_rate)
         self._main_widget = QToolBar()
         self._main_widget.setIconSize(self.max_icon_size)
         self._main_widget.setObjectName(self.name)
@@ -59,10 +106,29 @@ class Dashboard(Plugin):
             self._main_widget.setWindowTitle(self._main_widget.windowTitle() + (' (%d)' % context.serial_number()))
 
         # Convert list of widgets into layout
+        self._widgets = []
+        self._groups = []
+        self._pager = None
         self.add_widgets()
 
         # Display the dashboard
-        context.add_toolbar(self._main_widget)
+        with startup_profiler.phase('add_toolbar'):
+            context.add_toolbar(self._main_widget)
+
+        self._metrics_panel = None
+        self._metrics_panel_shown = False
+        self._metrics_publisher = None
+        if registry.enabled:
+            self._metrics_shortcut = QShortcut(QKeySequence('Ctrl+Shift+M'), self._main_widget)
+            self._metrics_shortcut.activated.connect(self._toggle_metrics_panel)
+            if registry.publish:
+                self._metrics_publisher = MetricsPublisher(registry)
+
+        watchdog.start()
+
+        self.startup_report = None
+        if startup_profiler.enabled:
+            self.startup_report = startup_profiler.publish_report(self._main_widget.windowTitle())
 
     def setup(self, context):
         """
@@ -81,13 +147,112 @@ class Dashboard(Plugin):
         Called when the toolbar is closed by Qt.
         """
         for widget in self._widgets:
-            if hasattr(widget, 'shutdown_widget'):
-                widget.shutdown_widget()
-            if hasattr(widget, 'close'):
-                widget.close()
+            self._shutdown_widget(widget)
+        watchdog.stop()
+        if self._metrics_publisher:
+            self._metrics_publisher.shutdown()
+        if self._metrics_panel:
+            self._metrics_panel.close()
 
         self.shutdown_dashboard()
 
+    def _toggle_metrics_panel(self):
+        if self._metrics_panel is None:
+            self._metrics_panel = MetricsPanel()
+        if self._metrics_panel_shown:
+            self.context.remove_widget(self._metrics_panel)
+        else:
+            self.context.add_widget(self._metrics_panel)
+        self._metrics_panel_shown = not self._metrics_panel_shown
+
+    def _shutdown_widget(self, widget):
+        if hasattr(widget, 'wrapped_widgets'):
+            # Widgets shown by an IndicatorStrip are not in the layout themselves
+            for wrapped in widget.wrapped_widgets():
+                self._shutdown_widget(wrapped)
+        repaint_scheduler.cancel(widget)
+        if hasattr(widget, 'shutdown_widget'):
+            widget.shutdown_widget()
+        if hasattr(widget, 'metrics_scope'):
+            registry.release(widget.metrics_scope)
+        if hasattr(widget, 'close'):
+            widget.close()
+
+    def save_settings(self, plugin_settings, instance_settings):
+        """
+        Saves the widget states, see :func:`save_widget_states`.
+        Subclasses overriding this should call it.
+        """
+        self.save_widget_states(instance_settings)
+
+    def restore_settings(self, plugin_settings, instance_settings):
+        """
+        Shows the saved widget states, see :func:`restore_widget_states`.
+        Subclasses overriding this should call it.
+        """
+        self.restore_widget_states(instance_settings)
+
+    def save_widget_states(self, instance_settings):
+        """
+        Save the state, tooltip and update time of every widget providing
+        ``snapshot_state``, e.g. :class:`rqt_robot_dashboard.icon_tool_button.IconToolButton`.
+        Snapshots which are not JSON serializable are skipped.
+
+        :param instance_settings: The instance settings of the plugin.
+        :type instance_settings: qt_gui.settings.Settings
+        """
+        states = {}
+        for key, widget in self._widget_keys():
+            if hasattr(widget, 'snapshot_state'):
+                snapshot = widget.snapshot_state()
+                if snapshot is None:
+                    continue
+                try:
+                    json.dumps(snapshot)
+                except (TypeError, ValueError):
+                    continue
+                states[key] = snapshot
+        instance_settings.set_value(WIDGET_STATES_KEY, json.dumps(states))
+
+    def restore_widget_states(self, instance_settings):
+        """
+        Show the widget states saved by :func:`save_widget_states` right away.
+        They are marked as cached until the widgets receive live data.
+
+        :param instance_settings: The instance settings of the plugin.
+        :type instance_settings: qt_gui.settings.Settings
+        """
+        if not self.warm_start:
+            return
+        value = instance_settings.value(WIDGET_STATES_KEY)
+        if not value:
+            return
+        try:
+            states = json.loads(value)
+        except (TypeError, ValueError):
+            return
+        for key, widget in self._widget_keys():
+            snapshot = states.get(key)
+            if isinstance(snapshot, dict) and hasattr(widget, 'restore_cached_state'):
+                widget.restore_cached_state(snapshot)
+
+    def _widget_keys(self):
+        # Widgets are identified by object name, numbered if the name is used more than once
+        seen = {}
+        for widget in self._all_widgets():
+            name = widget.objectName() or type(widget).__name__
+            seen[name] = seen.get(name, 0) + 1
+            key = name if seen[name] == 1 else '%s#%d' % (name, seen[name])
+            yield key, widget
+
+    def _all_widgets(self):
+        # The widgets in the layout followed by those they wrap, see IndicatorStrip.wrapped_widgets
+        for widget in self._widgets:
+            yield widget
+            if hasattr(widget, 'wrapped_widgets'):
+                for wrapped in widget.wrapped_widgets():
+                    yield wrapped
+
     def shutdown_dashboard(self):
         """
         Called after shutdown plugin, subclasses should do cleanup here, not in shutdown_plugin
@@ -98,6 +263,9 @@ class Dashboard(Plugin):
         """
         Most of the dashboard customization should be done here.
         If this function is not overriden the dashboard will display nothing.
+        Widgets and groups can be changed later on with :func:`add_group`,
+        :func:`remove_group`, :func:`add_widget`, :func:`remove_widget` and
+        :func:`move_widget` without rebuilding the dashboard.
 
         :returns: List of lists containing dashboard widgets, or list of lists
                   containing a string followed by a list of dashboard widgets.
@@ -110,38 +278,188 @@ class Dashboard(Plugin):
 
         This method can be reimplemented in order to customize appearances.
         """
-        widgets = self.get_widgets()
+        with startup_profiler.phase('get_widgets'):
+            widgets = self.get_widgets()
         self._widgets = [] # stores widgets which may need to be shut down when done
-        for group in widgets:
-            # Check for group label
-            if isinstance(group[0], str):
-                grouplabel, v = group
-                box = QGroupBox(grouplabel)
-                box.setContentsMargins(0, 18, 0, 0) # LTRB
-                # Apply the center-label directive only for single-icon groups
-                if len(group[1]) == 1:
-                    box.setAlignment(Qt.AlignHCenter)
-            else:
-                box = QGroupBox()
-                box.setContentsMargins(0, 0, 0, 0) # LTRB
-                v = group
-            # Add widgets to QGroupBox
-            layout = QHBoxLayout()
-            layout.setSpacing(0)
-            layout.setContentsMargins(0, 0, 0, 0) # LTRB
-            for i in v:
+        self._groups = []
+        self._pager = None
+        if self.paged_layout:
+            self._pager = DashboardPager()
+            self._main_widget.addWidget(self._pager)
+        with startup_profiler.phase('layout'):
+            for group in widgets:
+                self.add_group(group)
+
+    def add_group(self, group, index=None):
+        """
+        Add a group of widgets to the running dashboard.
+
+        :param group: A list of widgets, or a list containing a label followed
+                      by a list of widgets, as returned by :func:`get_widgets`.
+        :type group: list
+        :param index: Position of the new group, appended if ``None``.
+        :type index: int
+        :returns: The index of the new group.
+        """
+        if index is None or index > len(self._groups):
+            index = len(self._groups)
+        box = self._make_group_box(group)
+        record = {'box': box, 'action': None, 'separator': None}
+        if self._pager is not None:
+            self._pager.add_group(box, index)
+        elif index < len(self._groups):
+            before = self._groups[index]['action']
+            record['action'] = self._main_widget.insertWidget(before, box)
+            record['separator'] = self._main_widget.insertSeparator(before)
+        else:
+            record['action'] = self._main_widget.addWidget(box)
+            record['separator'] = self._main_widget.addSeparator()
+        self._groups.insert(index, record)
+        return index
+
+    def remove_group(self, index):
+        """
+        Remove a group from the running dashboard.
+        ``shutdown_widget`` is called on every widget of the group.
+
+        :param index: Index of the group to remove.
+        :type index: int
+        """
+        record = self._groups.pop(index)
+        box = record['box']
+        for widget in self._group_widgets(box):
+            self._widgets.remove(widget)
+            self._shutdown_widget(widget)
+        if self._pager is not None:
+            self._pager.remove_group(box)
+        else:
+            self._main_widget.removeAction(record['action'])
+            self._main_widget.removeAction(record['separator'])
+            box.setParent(None)
+        box.deleteLater()
+
+    def group_count(self):
+        """
+        :returns: The number of widget groups in the dashboard.
+        """
+        return len(self._groups)
+
+    def add_widget(self, widget, group_index, position=None):
+        """
+        Add a single widget to an existing group of the running dashboard.
+
+        :param widget: The widget to add.
+        :type widget: QWidget
+        :param group_index: Index of the group to add the widget to.
+        :type group_index: int
+        :param position: Position of the widget within the group, appended if ``None``.
+        :type position: int
+        """
+        box = self._groups[group_index]['box']
+        self._insert_into_box(widget, box, position)
+        self._widgets.append(widget)
+
+    def remove_widget(self, widget):
+        """
+        Remove a single widget from the running dashboard and shut it down.
+        Its group stays in place, even if it becomes empty.
+
+        :raises ValueError: If ``widget`` is not part of the dashboard
+
+        :param widget: The widget to remove.
+        :type widget: QWidget
+        """
+        self._check_widget(widget)
+        self._take_from_box(widget)
+        self._widgets.remove(widget)
+        self._shutdown_widget(widget)
+
+    def move_widget(self, widget, group_index, position=None):
+        """
+        Move a widget to another group (or position) without shutting it down.
+
+        :raises ValueError: If ``widget`` is not part of the dashboard
+
+        :param widget: The widget to move.
+        :type widget: QWidget
+        :param group_index: Index of the destination group.
+        :type group_index: int
+        :param position: Position within the destination group, appended if ``None``.
+        :type position: int
+        """
+        self._check_widget(widget)
+        box = self._groups[group_index]['box']
+        self._take_from_box(widget)
+        self._insert_into_box(widget, box, position)
+        # setParent(None) in _take_from_box hid the widget
+        widget.show()
+
+    def _check_widget(self, widget):
+        if widget not in self._widgets:
+            raise ValueError("%s is not a widget of dashboard %s" % (widget.objectName(), self.name))
+
+    def _group_widgets(self, box):
+        layout = box.layout()
+        return [layout.itemAt(i).widget() for i in range(layout.count())
+                if layout.itemAt(i).widget() is not None]
+
+    def _insert_into_box(self, widget, box, position):
+        try:
+            widget.setIconSize(self.max_icon_size)
+        except AttributeError:
+            pass
+        layout = box.layout()
+        if position is None:
+            position = layout.count()
+        layout.insertWidget(position, widget)
+        self._group_resized(box)
+
+    def _take_from_box(self, widget):
+        box = widget.parentWidget()
+        box.layout().removeWidget(widget)
+        widget.setParent(None)
+        self._group_resized(box)
+
+    def _group_resized(self, box):
+        box.layout().activate()
+        if self._pager is not None:
+            self._pager.group_resized(box)
+
+    def _make_group_box(self, group):
+        """
+        Build the QGroupBox holding one group of widgets.
+
+        :param group: A list of widgets, or a label followed by a list of widgets.
+        :type group: list
+        """
+        # Check for group label
+        if isinstance(group[0], str):
+            grouplabel, v = group
+            box = QGroupBox(grouplabel)
+            box.setContentsMargins(0, 18, 0, 0) # LTRB
+            # Apply the center-label directive only for single-icon groups
+            if len(group[1]) == 1:
+                box.setAlignment(Qt.AlignHCenter)
+        else:
+            box = QGroupBox()
+            box.setContentsMargins(0, 0, 0, 0) # LTRB
+            v = group
+        # Add widgets to QGroupBox
+        layout = QHBoxLayout()
+        layout.setSpacing(0)
+        layout.setContentsMargins(0, 0, 0, 0) # LTRB
+        for i in v:
+            try:
                 try:
-                    try:
-                        i.setIconSize(self.max_icon_size) # without this, icons are tiny
-                    except AttributeError as e:
-                        # triggers with battery which uses a QLabel instead of a QToolButton-based widget
-                        pass
-                    layout.addWidget(i)
-                    self._widgets.append(i)
-                except:
-                    raise Exception("All widgets must be a subclass of QWidget!")
-
-            layout.activate()
-            box.setLayout(layout)
-            self._main_widget.addWidget(box)
-            self._main_widget.addSeparator()
+                    i.setIconSize(self.max_icon_size) # without this, icons are tiny
+                except AttributeError as e:
+                    # triggers with battery which uses a QLabel instead of a QToolButton-based widget
+                    pass
+                layout.addWidget(i)
+                self._widgets.append(i)
+            except:
+                raise Exception("All widgets must be a subclass of QWidget!")
+
+        layout.activate()
+        box.setLayout(layout)
+        return box
@@ -0,0 +1,173 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+from python_qt_binding.QtCore import QSize, Qt
+from python_qt_binding.QtWidgets import QHBoxLayout, QSizePolicy, QToolButton, QWidget
+
+
+class DashboardPager(QWidget):
+    """
+    A horizontal strip which only shows as many widget groups as fit in its
+    current width. The remaining groups are hidden, which keeps them out of
+    the layout and paint passes, and can be paged in with the arrow buttons
+    or the mouse wheel.
+
+    Used by :class:`rqt_robot_dashboard.dashboard.Dashboard` when ``paged_layout`` is set.
+    """
+    def __init__(self, parent=None):
+        super(DashboardPager, self).__init__(parent)
+        self._groups = []
+        self._widths = []
+        self._first = 0
+        self._last = -1
+
+        self._prev_button = QToolButton()
+        self._prev_button.setArrowType(Qt.LeftArrow)
+        self._prev_button.setAutoRaise(True)
+        self._prev_button.clicked.connect(self.previous_page)
+        self._next_button = QToolButton()
+        self._next_button.setArrowType(Qt.RightArrow)
+        self._next_button.setAutoRaise(True)
+        self._next_button.clicked.connect(self.next_page)
+
+        self._group_layout = QHBoxLayout()
+        self._group_layout.setSpacing(0)
+        self._group_layout.setContentsMargins(0, 0, 0, 0)
+
+        layout = QHBoxLayout()
+        layout.setSpacing(0)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._prev_button)
+        layout.addLayout(self._group_layout)
+        layout.addStretch()
+        layout.addWidget(self._next_button)
+        self.setLayout(layout)
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+
+    def add_group(self, box, index=None):
+        """
+        Add a group box to the strip.
+
+        :param box: The group widget to add.
+        :type box: QWidget
+        :param index: Position of the group, appended if ``None``.
+        :type index: int
+        """
+        if index is None:
+            index = len(self._groups)
+        box.setVisible(False)
+        self._groups.insert(index, box)
+        self._widths.insert(index, box.sizeHint().width())
+        self._group_layout.insertWidget(index, box)
+        self.updateGeometry()
+        self._relayout()
+
+    def remove_group(self, box):
+        """
+        Remove a group box from the strip. The box is not deleted.
+        """
+        index = self._groups.index(box)
+        del self._groups[index]
+        del self._widths[index]
+        self._group_layout.removeWidget(box)
+        box.setParent(None)
+        if self._first >= len(self._groups):
+            self._first = max(0, len(self._groups) - 1)
+        self.updateGeometry()
+        self._relayout()
+
+    def group_resized(self, box):
+        """
+        Refresh the cached width of ``box`` after its contents changed.
+        """
+        self._widths[self._groups.index(box)] = box.sizeHint().width()
+        self.updateGeometry()
+        self._relayout()
+
+    def next_page(self):
+        if self._last + 1 < len(self._groups):
+            self._first = self._last + 1
+            self._relayout()
+
+    def previous_page(self):
+        if self._first <= 0:
+            return
+        available = self._available_width()
+        used = 0
+        first = self._first
+        while first > 0 and (used + self._widths[first - 1] <= available or first == self._first):
+            first -= 1
+            used += self._widths[first]
+        self._first = first
+        self._relayout()
+
+    def _available_width(self):
+        return self.width() - self._prev_button.sizeHint().width() - self._next_button.sizeHint().width()
+
+    def _relayout(self):
+        available = self._available_width()
+        used = 0
+        self._last = self._first - 1
+        for i, box in enumerate(self._groups):
+            visible = False
+            if i >= self._first and i == self._last + 1:
+                # Always show at least one group, even if it is cut off
+                if used + self._widths[i] <= available or i == self._first:
+                    visible = True
+                    used += self._widths[i]
+                    self._last = i
+            if box.isVisibleTo(self) != visible:
+                box.setVisible(visible)
+        self._prev_button.setEnabled(self._first > 0)
+        self._next_button.setEnabled(self._last + 1 < len(self._groups))
+
+    def sizeHint(self):
+        arrows = self._prev_button.sizeHint().width() + self._next_button.sizeHint().width()
+        height = max([self._prev_button.sizeHint().height()] + [box.sizeHint().height() for box in self._groups])
+        return QSize(arrows + sum(self._widths), height)
+
+    def minimumSizeHint(self):
+        arrows = self._prev_button.sizeHint().width() + self._next_button.sizeHint().width()
+        return QSize(arrows + max(self._widths or [0]), self.sizeHint().height())
+
+    def resizeEvent(self, event):
+        super(DashboardPager, self).resizeEvent(event)
+        self._relayout()
+
+    def wheelEvent(self, event):
+        if event.angleDelta().y() < 0 or event.angleDelta().x() < 0:
+            self.next_page()
+        else:
+            self.previous_page()
+        event.accept()
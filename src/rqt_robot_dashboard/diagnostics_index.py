@@ -0,0 +1,141 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+from collections import OrderedDict
+
+# Order in which levels are reported, worst first: error, stale, warning
+_WORST_FIRST = (2, 3, 1)
+
+
+class DiagnosticsIndex(object):
+    """
+    Lightweight index of the status entries published on ``/diagnostics_agg``,
+    keyed by name, for triage without building the robot monitor tree.
+
+    Each :func:`update` only touches the entries whose level or message
+    changed. Entries are also kept per level, most recently changed last,
+    so :func:`worst` is proportional to the number of entries returned.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._by_level = {}
+        # Number of descendants of every name, names with none are leaves
+        self._descendants = {}
+        self.updates = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, statuses, stamp=None):
+        """
+        Apply the status entries of a ``diagnostic_msgs/DiagnosticArray``.
+        Entries missing from ``statuses`` are removed.
+
+        :param statuses: The ``status`` field of the message.
+        :type statuses: list of diagnostic_msgs.msg.DiagnosticStatus
+        :param stamp: Time of the message in seconds.
+        :type stamp: float
+        :returns: the number of entries which changed.
+        """
+        self.updates += 1
+        changed = 0
+        seen = set()
+        for status in statuses:
+            name = status.name
+            seen.add(name)
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == status.level and entry[1] == status.message:
+                continue
+            changed += 1
+            if entry is None:
+                self._add_ancestors(name, 1)
+            else:
+                del self._by_level[entry[0]][name]
+            self._entries[name] = (status.level, status.message, stamp)
+            self._by_level.setdefault(status.level, OrderedDict())[name] = True
+        if len(seen) != len(self._entries):
+            for name in set(self._entries) - seen:
+                self.remove(name)
+                changed += 1
+        return changed
+
+    def remove(self, name):
+        entry = self._entries.pop(name, None)
+        if entry is not None:
+            del self._by_level[entry[0]][name]
+            self._add_ancestors(name, -1)
+
+    def get(self, name):
+        """
+        :returns: (level, message, stamp) of the entry, or ``None``.
+        """
+        return self._entries.get(name)
+
+    def count(self, level):
+        """
+        :returns: the number of entries at ``level``.
+        """
+        return len(self._by_level.get(level, ()))
+
+    def worst(self, n=5, leaves_only=True):
+        """
+        The ``n`` worst entries: errors, then stale entries, then warnings,
+        the most recently changed first within a level.
+
+        :param n: Maximum number of entries.
+        :type n: int
+        :param leaves_only: Skip group entries of the aggregator, e.g.
+                            ``/Robot/Motors`` when ``/Robot/Motors/Left`` is present.
+        :type leaves_only: bool
+        :returns: list of (name, level, message) tuples.
+        """
+        result = []
+        for level in _WORST_FIRST:
+            for name in reversed(self._by_level.get(level, ())):
+                if leaves_only and self._descendants.get(name):
+                    continue
+                result.append((name, level, self._entries[name][1]))
+                if len(result) >= n:
+                    return result
+        return result
+
+    def _add_ancestors(self, name, increment):
+        index = name.rfind('/')
+        while index > 0:
+            ancestor = name[:index]
+            count = self._descendants.get(ancestor, 0) + increment
+            if count:
+                self._descendants[ancestor] = count
+            else:
+                del self._descendants[ancestor]
+            index = ancestor.rfind('/')
@@ -30,19 +30,26 @@
 # ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-import os
+import time
 
 from python_qt_binding.QtCore import Signal
+from python_qt_binding.QtGui import QIcon
 from python_qt_binding.QtWidgets import QToolButton
-import rospy
 
-from .util import IconHelper
+from .metrics import registry
+from .profiling import startup_profiler
+from .repaint import repaint_scheduler
+from .transport import get_transport
+from .util import IconHelper, LazyToolTipMixin, hidden_in_parent, resolve_icon_paths
+from .watchdog import watchdog
 
 
-class IconToolButton(QToolButton):
+class IconToolButton(LazyToolTipMixin, QToolButton):
     """
     This is the base class for all widgets.
     It provides state and icon switching support as well as convenience functions for creating icons.
+    Subclasses with frequently changing tooltips should override ``tooltip_text``,
+    see :class:`rqt_robot_dashboard.util.LazyToolTipMixin`.
 
     :raises IndexError: if ``icons`` is not a list of lists of strings
 
@@ -60,26 +67,40 @@ class IconToolButton(QToolButton):
     ['package name', 'subdirectory'] example ['rqt_pr2_dashboard', 'images/svg']
 
     :type icon_paths: list of lists of strings
+
+    Icon changes are committed through
+    :data:`rqt_robot_dashboard.repaint.repaint_scheduler`, which may delay
+    them to limit the repaint rate. Set ``repaint_priority`` to ``True`` for
+    critical widgets such as a runstop, and list the states which should be
+    shown without delay in ``priority_states``.
     """
     state_changed = Signal(int)
+    repaint_priority = False
+    priority_states = ()
 
+    @startup_profiler.profile_widget
     def __init__(self, name, icons, clicked_icons=None, suppress_overlays=False, icon_paths=None):
         super(IconToolButton, self).__init__()
 
         self.name = name
         self.setObjectName(self.name)
-
-        self.state_changed.connect(self._update_state)
+        # Clock, logging and subscriptions, see rqt_robot_dashboard.transport
+        self._transport = get_transport()
+        self._icon_outdated = False
+        # Prefix of the metrics of this instance, released by the dashboard on shutdown
+        self.metrics_scope = registry.scope(name)
+        self._metric_state_changes = registry.counter('%s/state changes' % self.metrics_scope)
+        self._metric_repaints = registry.counter('%s/repaints' % self.metrics_scope)
+
+        self.state_changed.connect(watchdog.watch(self._update_state, '%s._update_state' % name))
         self.pressed.connect(self._pressed)
         self.released.connect(self._released)
 
-        import rospkg
-        icon_paths = (icon_paths if icon_paths else []) + [['rqt_robot_dashboard', 'images']]
-        paths = []
-        rp = rospkg.RosPack()
-        for path in icon_paths:
-            paths.append(os.path.join(rp.get_path(path[0]), path[1]))
-        self.icon_helper = IconHelper(paths, name)
+        self.icon_helper = IconHelper(resolve_icon_paths(icon_paths), name)
+        # Copied before set_icon_lists fills in the overlays, for indicator_icons
+        self._icon_lists = ([list(icon) for icon in icons],
+                            [list(icon) for icon in clicked_icons] if clicked_icons is not None else None,
+                            suppress_overlays)
         converted_icons = self.icon_helper.set_icon_lists(icons, clicked_icons, suppress_overlays)
         self._icons = converted_icons[0]
         self._clicked_icons = converted_icons[1]
@@ -87,7 +108,7 @@ class IconToolButton(QToolButton):
         self.setStyleSheet('QToolButton {border: none;}')
 
         self.__state = 0
-
+        self._state_stamp = None
 
     def update_state(self, state):
         """
@@ -101,6 +122,9 @@ class IconToolButton(QToolButton):
         """
         if 0 <= state and state < len(self._icons):
             self.__state = state
+            self._state_stamp = time.time()
+            self._cached_state = None
+            self._metric_state_changes.inc()
             self.state_changed.emit(self.__state)
         else:
             raise IndexError("%s update_state received invalid state: %s" % (self.name, state))
@@ -112,11 +136,75 @@ class IconToolButton(QToolButton):
         """
         return self.__state
 
+    def indicator_icons(self):
+        """
+        The icon file names of this button, used to show it in an
+        :class:`rqt_robot_dashboard.indicator_strip.IndicatorStrip`.
+
+        :returns: tuple of ``icons``, ``clicked_icons`` and ``suppress_overlays`` as passed to the constructor
+        """
+        return self._icon_lists
+
+    def indicator_state(self):
+        """
+        Index into :func:`indicator_icons` of the icon to draw for the current state.
+        """
+        return self.__state
+
     def _update_state(self, state):
-        if self.isDown():
+        urgent = self.repaint_priority or self.__state in self.priority_states
+        repaint_scheduler.schedule(self, self._commit_icon, urgent)
+
+    def _commit_icon(self):
+        if hidden_in_parent(self):
+            # The icon is set in showEvent once the widget is visible again
+            self._icon_outdated = True
+            return
+        if self._cached_state is not None:
+            # Restored from saved settings, shown greyed out until live data arrives
+            pixmap = self._icons[self.__state].pixmap(self.iconSize(), QIcon.Disabled)
+            self.setIcon(QIcon(pixmap))
+        elif self.isDown():
             self.setIcon(self._clicked_icons[self.__state])
         else:
             self.setIcon(self._icons[self.__state])
+        self._metric_repaints.inc()
+
+    def snapshot_state(self):
+        """
+        The state saved by the dashboard to show it again on the next start,
+        before the first message arrives.
+        Subclasses may add more JSON serializable entries.
+
+        :returns: dict with ``state``, ``tooltip`` and ``stamp`` entries, or ``None``.
+        """
+        if self._cached_state is not None:
+            # No live update since the last start, keep the original snapshot
+            return self._cached_state
+        if self._state_stamp is None:
+            return None
+        return {'state': self.__state, 'tooltip': self.toolTip(), 'stamp': self._state_stamp}
+
+    def restore_cached_state(self, snapshot):
+        """
+        Show a state saved by :func:`snapshot_state`, marked as cached until
+        the next call to :func:`update_state`.
+
+        :param snapshot: The saved state.
+        :type snapshot: dict
+        """
+        state = snapshot.get('state')
+        if not isinstance(state, int) or not 0 <= state < len(self._icons):
+            return
+        self.__state = state
+        self._cached_state = snapshot
+        self.state_changed.emit(self.__state)
+
+    def showEvent(self, event):
+        if self._icon_outdated:
+            self._icon_outdated = False
+            self._commit_icon()
+        super(IconToolButton, self).showEvent(event)
 
     def _pressed(self):
         self.setIcon(self._clicked_icons[self.__state])
@@ -0,0 +1,325 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+from python_qt_binding.QtCore import QEvent, QObject, QRect, QSize, Signal
+from python_qt_binding.QtGui import QCursor, QPainter
+from python_qt_binding.QtWidgets import QSizePolicy, QToolTip, QWidget
+
+from .util import IconHelper, get_icon_atlas, resolve_icon_paths
+
+
+class IndicatorItem(QObject):
+    """
+    A status indicator drawn by an :class:`IndicatorStrip` instead of being a widget of its own.
+    It takes the same arguments and offers the same ``update_state``/``state``
+    API as :class:`rqt_robot_dashboard.icon_tool_button.IconToolButton`, so
+    dense dashboards can swap buttons for items without touching their state logic.
+
+    :param name: name of the object
+    :type name: str
+    :param icons: A list of lists of strings to create icons for the states of this item.
+    :type icons: list
+    :param clicked_icons: A list of clicked state icons. len must equal icons
+    :type clicked_icons: list
+    :param suppress_overlays: if false and there is only one icon path supplied
+    :type suppress_overlays: bool
+    :param icon_paths: list of lists of package and subdirectory in the form\
+    ['package name', 'subdirectory'] example ['rqt_pr2_dashboard', 'images/svg']
+    :type icon_paths: list of lists of strings
+    :param icon_helper: helper to find the images with instead of one built from ``icon_paths``
+    :type icon_helper: rqt_robot_dashboard.util.IconHelper
+    """
+    state_changed = Signal(int)
+    clicked = Signal()
+
+    def __init__(self, name, icons, clicked_icons=None, suppress_overlays=False, icon_paths=None,
+                 icon_helper=None):
+        super(IndicatorItem, self).__init__()
+        self.name = name
+        self.setObjectName(self.name)
+
+        if icon_helper is None:
+            icon_helper = IconHelper(resolve_icon_paths(icon_paths), name)
+        self.icon_helper = icon_helper
+        # Icons are only rendered once a strip asks for them in its atlas
+        self._icons, self._clicked_icons = self.icon_helper.expand_icon_lists(
+            icons, clicked_icons, suppress_overlays)
+        self._atlas_slots = {}
+
+        self._tool_tip = ''
+        self.__state = 0
+
+    def update_state(self, state):
+        """
+        Set the state of this item and schedule a repaint of its cell.
+
+        :raises IndexError: If state is not a proper index to ``self._icons``
+
+        :param state: The state to set.
+        :type state: int
+        """
+        if 0 <= state and state < len(self._icons):
+            self.__state = state
+            self.state_changed.emit(self.__state)
+        else:
+            raise IndexError("%s update_state received invalid state: %s" % (self.name, state))
+
+    @property
+    def state(self):
+        """
+        Read-only accessor for the items current state.
+        """
+        return self.__state
+
+    def setToolTip(self, tool_tip):
+        self._tool_tip = tool_tip
+
+    def toolTip(self):
+        return self._tool_tip
+
+    def atlas_slot(self, atlas, pressed=False):
+        """
+        The slot of the current state's icon in ``atlas``, rendering the
+        icons of all states into it on first use.
+
+        :param atlas: The atlas of the strip drawing this item.
+        :type atlas: rqt_robot_dashboard.util.IconAtlas
+        :param pressed: Whether to return the clicked icon.
+        :type pressed: bool
+        """
+        slots = self._atlas_slots.get(atlas)
+        if slots is None:
+            slots = ([self.icon_helper.build_atlas_slot(atlas, icon) for icon in self._icons],
+                     [self.icon_helper.build_atlas_slot(atlas, icon) for icon in self._clicked_icons])
+            self._atlas_slots[atlas] = slots
+        return slots[1 if pressed else 0][self.__state]
+
+
+class WidgetIndicator(IndicatorItem):
+    """
+    An :class:`IndicatorItem` showing an existing dashboard widget, so widgets
+    such as :class:`rqt_robot_dashboard.widgets.MonitorDashWidget` or
+    :class:`rqt_robot_dashboard.widgets.BatteryDashWidget` can be placed in an
+    :class:`IndicatorStrip` without being rewritten.
+
+    The widget keeps its subscriptions and state logic but is not added to a
+    layout itself. The item follows its ``state_changed`` signal, reads its
+    tooltip when one is shown and forwards clicks to it, popping up its menu
+    if it has one. States restored from saved settings are drawn in full
+    colour, as the atlas has no greyed out icons.
+
+    The widget must provide ``indicator_icons()``, returning the
+    ``(icons, clicked_icons, suppress_overlays)`` to draw, and
+    ``indicator_state()``, returning the index of the icon to draw for its
+    current state. :class:`rqt_robot_dashboard.icon_tool_button.IconToolButton`
+    and :class:`rqt_robot_dashboard.battery_dash_widget.BatteryDashWidget`
+    implement both.
+
+    A dashboard shuts down and saves the state of the wrapped widgets of
+    every strip in its groups, see :func:`IndicatorStrip.wrapped_widgets`.
+
+    :param widget: The widget to show.
+    :type widget: QWidget
+    """
+    def __init__(self, widget):
+        icons, clicked_icons, suppress_overlays = widget.indicator_icons()
+        super(WidgetIndicator, self).__init__(widget.objectName(), icons, clicked_icons, suppress_overlays,
+                                              icon_helper=widget.icon_helper)
+        self.widget = widget
+        widget.state_changed.connect(self._widget_state_changed)
+        self.clicked.connect(self._click_widget)
+        self._widget_state_changed()
+
+    def update_state(self, state):
+        """
+        Set the state of the wrapped widget, the item follows once it changed.
+        """
+        self.widget.update_state(state)
+
+    @property
+    def state(self):
+        """
+        Read-only accessor for the wrapped widget's current state.
+        """
+        return self.widget.state
+
+    def setToolTip(self, tool_tip):
+        self.widget.setToolTip(tool_tip)
+
+    def toolTip(self):
+        return self.widget.toolTip()
+
+    def _widget_state_changed(self, state=None):
+        super(WidgetIndicator, self).update_state(self.widget.indicator_state())
+
+    def _click_widget(self):
+        menu = self.widget.menu() if hasattr(self.widget, 'menu') else None
+        if menu is not None:
+            menu.popup(QCursor.pos())
+        elif hasattr(self.widget, 'click'):
+            self.widget.click()
+
+
+class IndicatorStrip(QWidget):
+    """
+    A single widget painting a row of :class:`IndicatorItem` s in one ``paintEvent``.
+    Icons are drawn from the :class:`rqt_robot_dashboard.util.IconAtlas` shared
+    by all widgets of the same icon size. Clicks and tooltips are routed to the item under the cursor. Compared to
+    one ``IconToolButton`` per indicator this avoids per-widget style polishing
+    and only repaints the cells whose state changed.
+
+    :param items: The items to display.
+    :type items: list of IndicatorItem
+    :param icon_size: The size of every cell.
+    :type icon_size: QSize
+    """
+    def __init__(self, items=None, icon_size=None, parent=None):
+        super(IndicatorStrip, self).__init__(parent)
+        self._items = []
+        self._icon_size = icon_size if icon_size else QSize(50, 30)
+        self._atlas = get_icon_atlas(self._icon_size)
+        self._pressed_index = -1
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        for item in items if items else []:
+            self.add_item(item)
+
+    def add_item(self, item, index=None):
+        """
+        Add an item to the strip.
+
+        :param item: The item to add.
+        :type item: IndicatorItem
+        :param index: Position of the item, appended if ``None``.
+        :type index: int
+        """
+        if index is None:
+            index = len(self._items)
+        self._items.insert(index, item)
+        item.state_changed.connect(self._item_changed)
+        # Render now rather than in paintEvent, so the atlas pixmap is
+        # converted once for the first paint
+        item.atlas_slot(self._atlas)
+        self.updateGeometry()
+        self.update()
+
+    def remove_item(self, item):
+        """
+        Remove an item from the strip.
+        """
+        self._items.remove(item)
+        item.state_changed.disconnect(self._item_changed)
+        self._pressed_index = -1
+        self.updateGeometry()
+        self.update()
+
+    def items(self):
+        return list(self._items)
+
+    def wrapped_widgets(self):
+        """
+        The dashboard widgets shown by the :class:`WidgetIndicator` items of
+        this strip. :class:`rqt_robot_dashboard.dashboard.Dashboard` shuts them
+        down and saves their states like the widgets in its layout.
+        """
+        return [item.widget for item in self._items if isinstance(item, WidgetIndicator)]
+
+    def setIconSize(self, size):
+        self._icon_size = QSize(size)
+        self._atlas = get_icon_atlas(self._icon_size)
+        for item in self._items:
+            item.atlas_slot(self._atlas)
+        self.updateGeometry()
+        self.update()
+
+    def iconSize(self):
+        return QSize(self._icon_size)
+
+    def sizeHint(self):
+        return QSize(self._icon_size.width() * len(self._items), self._icon_size.height())
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def item_at(self, pos):
+        """
+        :param pos: A position in widget coordinates.
+        :type pos: QPoint
+        :returns: The index of the item under ``pos`` or -1.
+        """
+        if pos.y() < 0 or pos.y() >= self._icon_size.height() or pos.x() < 0:
+            return -1
+        index = pos.x() // self._icon_size.width()
+        return index if index < len(self._items) else -1
+
+    def _cell(self, index):
+        return QRect(index * self._icon_size.width(), 0,
+                     self._icon_size.width(), self._icon_size.height())
+
+    def _item_changed(self, state):
+        index = self._items.index(self.sender())
+        self.update(self._cell(index))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        region = event.rect()
+        for index, item in enumerate(self._items):
+            cell = self._cell(index)
+            if not region.intersects(cell):
+                continue
+            self._atlas.draw(painter, cell, item.atlas_slot(self._atlas, index == self._pressed_index))
+        painter.end()
+
+    def mousePressEvent(self, event):
+        self._pressed_index = self.item_at(event.pos())
+        if self._pressed_index >= 0:
+            self.update(self._cell(self._pressed_index))
+
+    def mouseReleaseEvent(self, event):
+        index = self._pressed_index
+        self._pressed_index = -1
+        if index < 0:
+            return
+        self.update(self._cell(index))
+        if self.item_at(event.pos()) == index:
+            self._items[index].clicked.emit()
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            index = self.item_at(event.pos())
+            if index >= 0 and self._items[index].toolTip():
+                QToolTip.showText(event.globalPos(), self._items[index].toolTip(), self, self._cell(index))
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super(IndicatorStrip, self).event(event)
@@ -0,0 +1,151 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import math
+from array import array
+
+#: Sparkline characters for OK, warning, error and stale.
+SPARK_CHARS = (u'\u2581', u'\u2584', u'\u2588', u'\u00b7')
+# Errors and warnings win over stale within one sparkline slot
+_RANK = (0, 2, 3, 1)
+
+
+class LevelHistory(object):
+    """
+    Fixed size history of diagnostic levels.
+
+    Samples are run-length compressed: consecutive samples with the same
+    level are kept as one run with its start time and sample count, in
+    ring buffers backed by :mod:`array`. Memory stays constant no matter
+    how long the dashboard runs. Once ``capacity`` runs are stored, the
+    oldest run is dropped.
+
+    :param capacity: Number of level changes kept.
+    :type capacity: int
+    """
+    def __init__(self, capacity=256):
+        self._capacity = capacity
+        self._starts = array('d', [0.0] * capacity)
+        self._levels = array('b', [0] * capacity)
+        self._counts = array('L', [0] * capacity)
+        self._first = 0
+        self._size = 0
+        self._dropped = False
+        self.samples = 0
+        self.last_stamp = None
+
+    def __len__(self):
+        return self._size
+
+    def add(self, stamp, level):
+        """
+        Record a sample.
+
+        :param stamp: Time of the sample in seconds, not older than the previous sample.
+        :type stamp: float
+        :param level: Diagnostic level, 0 to 3.
+        :type level: int
+        """
+        self.samples += 1
+        self.last_stamp = stamp
+        if self._size:
+            last = (self._first + self._size - 1) % self._capacity
+            if self._levels[last] == level:
+                self._counts[last] += 1
+                return
+        if self._size < self._capacity:
+            index = (self._first + self._size) % self._capacity
+            self._size += 1
+        else:
+            index = self._first
+            self._first = (self._first + 1) % self._capacity
+            self._dropped = True
+        self._starts[index] = stamp
+        self._levels[index] = level
+        self._counts[index] = 1
+
+    def runs(self):
+        """
+        :returns: list of (start time, level, sample count) tuples, oldest first.
+        """
+        result = []
+        for i in range(self._size):
+            index = (self._first + i) % self._capacity
+            result.append((self._starts[index], self._levels[index], self._counts[index]))
+        return result
+
+    def changes(self, since):
+        """
+        :param since: Start of the time window in seconds.
+        :type since: float
+        :returns: the number of level changes at or after ``since``.
+        """
+        count = 0
+        for i in range(self._size):
+            index = (self._first + i) % self._capacity
+            if self._starts[index] >= since and (i > 0 or self._dropped):
+                count += 1
+        return count
+
+    def sparkline(self, start, end, width=30):
+        """
+        Render the levels between ``start`` and ``end`` as one character per
+        time slot, showing the worst level in the slot. Slots without data
+        are blank.
+
+        :param start: Start of the time window in seconds.
+        :type start: float
+        :param end: End of the time window in seconds, usually now.
+        :type end: float
+        :param width: Number of characters.
+        :type width: int
+        """
+        worst = [-1] * width
+        if self._size and end > start:
+            slot = float(end - start) / width
+            runs = self.runs()
+            for i, (run_start, level, _) in enumerate(runs):
+                if i + 1 < len(runs):
+                    run_end = runs[i + 1][0]
+                else:
+                    run_end = max(self.last_stamp, run_start)
+                if run_end < start or run_start > end:
+                    continue
+                # A run lasts until the next one starts
+                first = min(width - 1, max(0, int((run_start - start) / slot)))
+                last = min(width - 1, max(first, int(math.ceil((run_end - start) / slot)) - 1))
+                level = min(level, 3)
+                for j in range(first, last + 1):
+                    if worst[j] < 0 or _RANK[level] > _RANK[worst[j]]:
+                        worst[j] = level
+        return u''.join(SPARK_CHARS[level] if level >= 0 else u' ' for level in worst)
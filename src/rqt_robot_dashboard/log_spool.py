@@ -0,0 +1,218 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import mmap
+import os
+import struct
+from array import array
+
+from .log_store import LogRecord
+
+# secs, nsecs, severity, then the byte lengths of node, location, topics and message
+_HEADER = struct.Struct('<IIBHHHI')
+
+
+class LogSpool(object):
+    """
+    Append-only binary file of log records, for unbounded console history
+    at bounded memory.
+
+    Every record is a fixed size header followed by the UTF-8 encoded node,
+    location, comma separated topics and message text. A small in-memory
+    index keeps the offset, time range and worst severity of every block of
+    ``block_size`` records, so :func:`read` only touches the blocks in the
+    requested time range and severity. Reads use a memory map of the file.
+    An existing spool file is appended to, its index is rebuilt on open.
+
+    :param path: Path of the spool file.
+    :type path: str
+    :param block_size: Number of records per index entry.
+    :type block_size: int
+    """
+    def __init__(self, path, block_size=256):
+        self.path = path
+        self._block_size = block_size
+        self._offsets = array('Q')
+        self._first_stamps = array('d')
+        self._last_stamps = array('d')
+        self._severities = array('B')
+        self._count = 0
+        self._size = 0
+        self._file = open(path, 'ab')
+        if os.path.getsize(path):
+            self._rebuild_index()
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size(self):
+        """
+        Size of the spool file in bytes.
+        """
+        return self._size
+
+    def append(self, records):
+        """
+        Append records to the spool.
+
+        :param records: :class:`rqt_robot_dashboard.log_store.LogRecord` tuples.
+        :type records: list
+        """
+        chunks = []
+        offset = self._size
+        for secs, nsecs, severity, node, location, topics, message in records:
+            fields = [_encode(node, 0xffff), _encode(location, 0xffff),
+                      _encode(','.join(topics), 0xffff), _encode(message, 0xffffffff)]
+            header = _HEADER.pack(secs, nsecs, severity, *[len(f) for f in fields])
+            self._index(offset, secs + nsecs * 1e-9, severity)
+            chunks.append(header)
+            chunks.extend(fields)
+            offset += len(header) + sum(len(f) for f in fields)
+        self._file.write(b''.join(chunks))
+        self._file.flush()
+        self._size = offset
+
+    def read(self, start=None, end=None, min_severity=0, limit=None):
+        """
+        Read records back from the spool, oldest first.
+
+        :param start: Earliest time in seconds, ``None`` for the beginning.
+        :type start: float
+        :param end: Latest time in seconds, ``None`` for the end.
+        :type end: float
+        :param min_severity: Lowest severity returned, e.g. 4 for warnings and worse.
+        :type min_severity: int
+        :param limit: Maximum number of records, the most recently appended
+                      ones are returned if there are more. Blocks are then
+                      read newest first, only until ``limit`` records are found.
+        :type limit: int
+        :returns: list of :class:`rqt_robot_dashboard.log_store.LogRecord` tuples.
+        """
+        if not self._size or limit == 0:
+            return []
+        blocks = range(len(self._offsets))
+        if limit is not None:
+            blocks = reversed(blocks)
+        chunks = []
+        found = 0
+        with open(self.path, 'rb') as spool:
+            view = mmap.mmap(spool.fileno(), self._size, access=mmap.ACCESS_READ)
+            try:
+                for block in blocks:
+                    if start is not None and self._last_stamps[block] < start:
+                        continue
+                    if end is not None and self._first_stamps[block] > end:
+                        continue
+                    if self._severities[block] < min_severity:
+                        continue
+                    chunk = []
+                    self._read_block(view, block, start, end, min_severity, chunk)
+                    chunks.append(chunk)
+                    found += len(chunk)
+                    if limit is not None and found >= limit:
+                        break
+            finally:
+                view.close()
+        if limit is not None:
+            chunks.reverse()
+        records = [record for chunk in chunks for record in chunk]
+        if limit is not None and len(records) > limit:
+            records = records[len(records) - limit:]
+        return records
+
+    def close(self):
+        self._file.close()
+
+    def _read_block(self, view, block, start, end, min_severity, records):
+        offset = self._offsets[block]
+        if block + 1 < len(self._offsets):
+            block_end = self._offsets[block + 1]
+        else:
+            block_end = self._size
+        while offset < block_end:
+            secs, nsecs, severity, node_len, location_len, topics_len, message_len = \
+                _HEADER.unpack_from(view, offset)
+            offset += _HEADER.size
+            stamp = secs + nsecs * 1e-9
+            length = node_len + location_len + topics_len + message_len
+            if severity >= min_severity and (start is None or stamp >= start) and \
+                    (end is None or stamp <= end):
+                fields = []
+                position = offset
+                for field_len in (node_len, location_len, topics_len, message_len):
+                    fields.append(view[position:position + field_len].decode('utf-8', 'replace'))
+                    position += field_len
+                topics = fields[2].split(',') if fields[2] else []
+                records.append(LogRecord(secs, nsecs, severity, fields[0], fields[1], topics, fields[3]))
+            offset += length
+
+    def _index(self, offset, stamp, severity):
+        if self._count % self._block_size == 0:
+            self._offsets.append(offset)
+            self._first_stamps.append(stamp)
+            self._last_stamps.append(stamp)
+            self._severities.append(min(severity, 255))
+        else:
+            self._first_stamps[-1] = min(self._first_stamps[-1], stamp)
+            self._last_stamps[-1] = max(self._last_stamps[-1], stamp)
+            self._severities[-1] = max(self._severities[-1], min(severity, 255))
+        self._count += 1
+
+    def _rebuild_index(self):
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as spool:
+            view = mmap.mmap(spool.fileno(), size, access=mmap.ACCESS_READ)
+            try:
+                offset = 0
+                while offset + _HEADER.size <= size:
+                    header = _HEADER.unpack_from(view, offset)
+                    length = _HEADER.size + sum(header[3:])
+                    if offset + length > size:
+                        break
+                    self._index(offset, header[0] + header[1] * 1e-9, header[2])
+                    offset += length
+            finally:
+                view.close()
+        if offset < size:
+            # Drop a record cut off by a crash, new records are appended after the last complete one
+            self._file.truncate(offset)
+        self._size = offset
+
+
+def _encode(text, max_length):
+    if text is None:
+        return b''
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+    return text[:max_length]
@@ -0,0 +1,223 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+#: One log message, as stored by :class:`ColumnarLogStore` and :class:`rqt_robot_dashboard.log_spool.LogSpool`.
+LogRecord = namedtuple('LogRecord', ['secs', 'nsecs', 'severity', 'node', 'location', 'topics', 'message'])
+
+#: Number of messages per severity, with the attributes of rqt_console's message summary.
+LogSummary = namedtuple('LogSummary', ['debug', 'info', 'warn', 'error', 'fatal'])
+
+# Severity values of rosgraph_msgs/Log, in the order of LogSummary
+_SUMMARY_SEVERITIES = (1, 2, 4, 8, 16)
+
+
+def summarize(severities):
+    """
+    Count the messages per severity.
+
+    :param severities: The severity of every message.
+    :type severities: sequence of int
+    :returns: a :class:`LogSummary`.
+    """
+    return LogSummary(*[severities.count(severity) for severity in _SUMMARY_SEVERITIES])
+
+
+def record_from_log(log_msg):
+    """
+    Convert a ``rosgraph_msgs/Log`` message, like
+    ``rqt_console.console.Console.convert_rosgraph_log_message`` does,
+    without creating a message object per row.
+    """
+    return LogRecord(log_msg.header.stamp.secs, log_msg.header.stamp.nsecs, log_msg.level,
+                     log_msg.name, '%s:%s:%s' % (log_msg.file, log_msg.function, log_msg.line),
+                     sorted(log_msg.topics), log_msg.msg)
+
+
+class ColumnarLogStore(object):
+    """
+    Compact in-memory store of log messages, one column per field.
+
+    Stamps and severities are kept in :mod:`array` columns, node, location
+    and topic strings are interned and stored as ids, and the message texts
+    share one UTF-8 encoded arena. Rows are only turned into
+    :class:`LogRecord` tuples when read.
+
+    Rows are numbered with sequence numbers which stay valid when the oldest
+    rows are dropped because of ``limit``. Time window queries assume the
+    messages arrive roughly in stamp order.
+
+    :param limit: Maximum number of rows kept, ``None`` for no limit.
+    :type limit: int
+    """
+    def __init__(self, limit=None):
+        self.limit = limit
+        self._secs = array('L')
+        self._nsecs = array('L')
+        self._severities = array('B')
+        self._nodes = array('L')
+        self._locations = array('L')
+        self._topics = array('L')
+        self._text_offsets = array('Q')
+        self._text = bytearray()
+        self._text_base = 0
+        self._strings = []
+        self._string_ids = {}
+        self._first_seq = 0
+
+    def __len__(self):
+        return len(self._severities)
+
+    @property
+    def first_seq(self):
+        """
+        Sequence number of the oldest row kept.
+        """
+        return self._first_seq
+
+    @property
+    def next_seq(self):
+        """
+        Sequence number of the next row appended.
+        """
+        return self._first_seq + len(self._severities)
+
+    def append(self, records):
+        """
+        :param records: :class:`LogRecord` tuples.
+        :type records: list
+        """
+        intern = self._intern
+        for secs, nsecs, severity, node, location, topics, message in records:
+            self._secs.append(secs)
+            self._nsecs.append(nsecs)
+            self._severities.append(severity)
+            self._nodes.append(intern(node))
+            self._locations.append(intern(location))
+            self._topics.append(intern(','.join(topics)))
+            self._text_offsets.append(self._text_base + len(self._text))
+            self._text.extend(message.encode('utf-8'))
+        if self.limit is not None and len(self) > self.limit + self.limit // 2:
+            # Dropping in chunks keeps the cost of moving the columns amortized
+            self._drop(len(self) - self.limit)
+
+    def record(self, seq):
+        """
+        :param seq: Sequence number of the row.
+        :type seq: int
+        :returns: the row as a :class:`LogRecord`.
+        :raises IndexError: if the row was dropped or does not exist yet.
+        """
+        index = seq - self._first_seq
+        if not 0 <= index < len(self):
+            raise IndexError('log row %d is not stored' % seq)
+        start = self._text_offsets[index] - self._text_base
+        if index + 1 < len(self):
+            end = self._text_offsets[index + 1] - self._text_base
+        else:
+            end = len(self._text)
+        topics = self._strings[self._topics[index]]
+        return LogRecord(self._secs[index], self._nsecs[index], self._severities[index],
+                         self._strings[self._nodes[index]], self._strings[self._locations[index]],
+                         topics.split(',') if topics else [],
+                         self._text[start:end].decode('utf-8', 'replace'))
+
+    def records(self, since_seq=None):
+        """
+        :param since_seq: Sequence number of the first row, the oldest row kept by default.
+        :type since_seq: int
+        :returns: the rows from ``since_seq`` on.
+        """
+        first = self._first_seq if since_seq is None else max(since_seq, self._first_seq)
+        return [self.record(seq) for seq in range(first, self.next_seq)]
+
+    def summary(self, since=None):
+        """
+        Count the rows per severity.
+
+        :param since: Only count rows stamped at or after this time in seconds.
+        :type since: float
+        :returns: a :class:`LogSummary`.
+        """
+        index = self._index_at(since)
+        severities = self._severities[index:] if index else self._severities
+        return summarize(severities)
+
+    def sequence_numbers(self, min_severity=0, start=None, end=None):
+        """
+        :returns: the sequence numbers of the rows with at least
+                  ``min_severity`` stamped between ``start`` and ``end``.
+        """
+        first = self._index_at(start)
+        last = len(self) if end is None else self._index_at(end, after=True)
+        return [self._first_seq + index for index in range(first, last)
+                if self._severities[index] >= min_severity]
+
+    def nbytes(self):
+        """
+        Approximate memory used by the columns and the text arena, without the interned strings.
+        """
+        columns = (self._secs, self._nsecs, self._severities, self._nodes, self._locations,
+                   self._topics, self._text_offsets)
+        return sum(len(column) * column.itemsize for column in columns) + len(self._text)
+
+    def _intern(self, text):
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self._strings)
+            self._strings.append(text)
+        return string_id
+
+    def _index_at(self, stamp, after=False):
+        if stamp is None:
+            return 0
+        secs = int(stamp)
+        nsecs = int(round((stamp - secs) * 1e9))
+        index = bisect_left(self._secs, secs)
+        # Refine within the second
+        while index < len(self) and self._secs[index] == secs and \
+                (self._nsecs[index] < nsecs or (after and self._nsecs[index] == nsecs)):
+            index += 1
+        return index
+
+    def _drop(self, count):
+        cut = self._text_offsets[count] - self._text_base
+        for column in (self._secs, self._nsecs, self._severities, self._nodes,
+                       self._locations, self._topics, self._text_offsets):
+            del column[:count]
+        del self._text[:cut]
+        self._text_base += cut
+        self._first_seq += count
@@ -30,19 +30,90 @@
 # ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
+import itertools
+import time
+
+from python_qt_binding.QtCore import QRunnable, QThreadPool, QTimer, Signal
 from python_qt_binding.QtWidgets import QMenu, QToolButton
 from .icon_tool_button import IconToolButton
+from .metrics import registry
+from .profiling import startup_profiler
+from .util import dasherr
+from .watchdog import watchdog
+
+
+class _ActionRunnable(QRunnable):
+    """
+    Runs an asynchronous menu action on a worker thread and reports its
+    start and outcome through the widget's ``_action_started`` and
+    ``_action_finished`` signals, which Qt delivers on the GUI thread.
+    Nothing is reported once the widget is shut down, and an action still
+    queued then is not run.
+    """
+    def __init__(self, widget, token, callback):
+        super(_ActionRunnable, self).__init__()
+        self._widget = widget
+        self._token = token
+        self._callback = callback
+
+    def run(self):
+        if not self._report(self._widget._action_started, self._token):
+            return
+        try:
+            self._callback()
+        except Exception as e:
+            self._report(self._widget._action_finished, self._token, False, str(e))
+        else:
+            self._report(self._widget._action_finished, self._token, True, '')
+
+    def _report(self, signal, *args):
+        if self._widget._shut_down:
+            return False
+        try:
+            signal.emit(*args)
+        except RuntimeError:
+            # The widget was deleted after its shutdown
+            return False
+        return True
+
+
+class _AsyncCall(object):
+    """
+    An asynchronous menu action which was triggered and has not returned yet.
+    """
+    __slots__ = ('action', 'name', 'start', 'timeout', 'on_done', 'timer', 'timed_out')
+
+    def __init__(self, action, name, timeout, on_done):
+        self.action = action
+        self.name = name
+        self.start = None
+        self.timeout = timeout
+        self.on_done = on_done
+        self.timer = None
+        self.timed_out = False
 
 
 class MenuDashWidget(IconToolButton):
     """
     A widget which displays a pop-up menu when clicked
 
+    Actions added with :func:`add_async_action` run on a worker pool shared
+    by all menus, so slow callbacks such as ROS service calls do not freeze
+    the dashboard.
+
     :param name: The name to give this widget.
     :type name: str
     :param icon: The icon to display in this widgets button.
     :type icon: str
     """
+    #: Maximum number of asynchronous actions running at the same time, for all menus
+    max_workers = 4
+    _pool = None
+    _tokens = itertools.count()
+    _action_started = Signal(int)
+    _action_finished = Signal(int, bool, str)
+
+    @startup_profiler.profile_widget
     def __init__(self, name, icons=None, clicked_icons=None, icon_paths=[]):
         if icons == None:
             icons = [['bg-grey.svg', 'ic-motors.svg']]
@@ -60,6 +131,13 @@ class MenuDashWidget(IconToolButton):
 
         self.setMenu(self._menu)
 
+        # token -> _AsyncCall
+        self._in_flight = {}
+        self._action_stats = {}
+        self._shut_down = False
+        self._action_started.connect(self._async_action_started)
+        self._action_finished.connect(self._async_action_finished)
+
     def add_separator(self):
         return self._menu.addSeparator()
 
@@ -72,4 +150,134 @@ class MenuDashWidget(IconToolButton):
         :param callback: Function to be called when this item is pressed.
         :type callback: callable
         """
-        return self._menu.addAction(name, callback)
+        return self._menu.addAction(name, watchdog.watch(callback, '%s: %s' % (self.name, name)))
+
+    def add_async_action(self, name, callback, timeout=10.0, on_done=None):
+        """
+        Add an action whose callback runs on a worker thread, and return the newly created action.
+        The action is disabled while its callback runs. Failures and timeouts are
+        reported with :func:`rqt_robot_dashboard.util.dasherr`.
+
+        The timeout starts when a worker picks the callback up, so actions
+        waiting for a free worker do not time out. A timed out callback
+        cannot be stopped; it keeps its worker and its action stays disabled
+        until it returns, and its result is ignored. So a hung callback
+        occupies at most one worker.
+
+        :param name: The name of the action.
+        :type name: str
+        :param callback: Function to be called on a worker thread when this item is pressed.\
+        It must not touch Qt widgets, :func:`rqt_robot_dashboard.util.dasherr` and friends\
+        may be called.
+        :type callback: callable
+        :param timeout: Seconds of running after which the action is reported as failed, ``None`` to wait forever.
+        :type timeout: float
+        :param on_done: Called on the GUI thread with ``(success, error message)`` when the action\
+        completes, fails or times out.
+        :type on_done: callable
+        """
+        action = self._menu.addAction(name)
+        action.triggered.connect(lambda: self._start_async_action(action, name, callback, timeout, on_done))
+        return action
+
+    def action_stats(self):
+        """
+        Statistics of the asynchronous actions of this menu.
+
+        :returns: dict of action name to a dict with ``calls``, ``failures``, ``timeouts``,
+                  ``in_flight``, ``mean_seconds`` and ``max_seconds``
+        """
+        stats = {}
+        for name, values in self._action_stats.items():
+            stats[name] = dict(values)
+            stats[name]['in_flight'] = len([1 for call in self._in_flight.values() if call.name == name])
+            completed = values['calls'] - values['timeouts']
+            stats[name]['mean_seconds'] = values['seconds'] / completed if completed else 0.0
+            del stats[name]['seconds']
+        return stats
+
+    @classmethod
+    def _worker_pool(cls):
+        if MenuDashWidget._pool is None:
+            MenuDashWidget._pool = QThreadPool()
+            MenuDashWidget._pool.setMaxThreadCount(cls.max_workers)
+        return MenuDashWidget._pool
+
+    def _start_async_action(self, action, name, callback, timeout, on_done):
+        if self._shut_down:
+            return
+        token = next(self._tokens)
+        action.setEnabled(False)
+        self._in_flight[token] = _AsyncCall(action, name, timeout, on_done)
+        self._action_stats.setdefault(name, {'calls': 0, 'failures': 0, 'timeouts': 0,
+                                             'seconds': 0.0, 'max_seconds': 0.0})
+        registry.gauge('%s/actions in flight' % self.metrics_scope).set(len(self._in_flight))
+        self._worker_pool().start(_ActionRunnable(self, token, callback))
+
+    def _async_action_started(self, token):
+        call = self._in_flight.get(token)
+        if call is None or self._shut_down:
+            return
+        call.start = time.time()
+        if call.timeout is not None:
+            # Parented, so it is stopped with the widget
+            call.timer = QTimer(self)
+            call.timer.setSingleShot(True)
+            call.timer.timeout.connect(lambda: self._async_action_timed_out(token))
+            call.timer.start(int(call.timeout * 1000))
+
+    def _async_action_finished(self, token, success, error):
+        if self._shut_down:
+            return
+        call = self._in_flight.pop(token, None)
+        if call is None:
+            return
+        self._stop_timer(call)
+        # The worker is free again, only now the action can be used again
+        call.action.setEnabled(True)
+        registry.gauge('%s/actions in flight' % self.metrics_scope).set(len(self._in_flight))
+        if call.timed_out:
+            # Already reported as failed
+            return
+        elapsed = time.time() - call.start
+        stats = self._action_stats[call.name]
+        stats['calls'] += 1
+        stats['seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        registry.histogram('%s/%s ms' % (self.metrics_scope, call.name)).observe(elapsed * 1000.0)
+        self._async_action_done(call.name, success, error, call.on_done)
+
+    def _async_action_timed_out(self, token):
+        call = self._in_flight.get(token)
+        if call is None or self._shut_down:
+            return
+        # The callback keeps running and stays in flight until it returns
+        call.timed_out = True
+        self._stop_timer(call)
+        self._action_stats[call.name]['calls'] += 1
+        self._action_stats[call.name]['timeouts'] += 1
+        self._async_action_done(call.name, False, 'timed out after %.1f seconds' % call.timeout, call.on_done)
+
+    def _stop_timer(self, call):
+        if call.timer is not None:
+            call.timer.stop()
+            call.timer.deleteLater()
+            call.timer = None
+
+    def _async_action_done(self, name, success, error, on_done):
+        if not success:
+            self._action_stats[name]['failures'] += 1
+            dasherr('%s: %s failed: %s' % (self.name, name, error), self, title=name)
+        if on_done is not None:
+            on_done(success, error)
+
+    def shutdown_widget(self):
+        """
+        Stop reporting asynchronous actions. Callbacks still running are
+        left to finish on their worker, their results are ignored, and
+        queued ones are not run.
+        """
+        self._shut_down = True
+        for call in self._in_flight.values():
+            self._stop_timer(call)
+        self._in_flight = {}
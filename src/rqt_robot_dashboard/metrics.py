@@ -0,0 +1,273 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import time
+from contextlib import contextmanager
+
+#: ``1`` enables the metrics registry, ``publish`` also publishes the metrics on :data:`METRICS_TOPIC`.
+METRICS_ENV_VAR = 'RQT_DASHBOARD_METRICS'
+METRICS_TOPIC = 'dashboard_metrics'
+
+#: Default histogram bounds, in milliseconds
+LATENCY_BOUNDS = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0)
+#: Histogram bounds for sizes of batches and queues
+SIZE_BOUNDS = (1, 10, 100, 1000, 10000)
+
+
+class Counter(object):
+    """
+    A monotonically increasing count, e.g. messages received.
+    """
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+
+    def inc(self, increment=1):
+        self.value += increment
+
+    def snapshot(self):
+        return {'type': 'counter', 'value': self.value}
+
+
+class Gauge(object):
+    """
+    A value which can go up and down, e.g. a queue length.
+    """
+    __slots__ = ('name', 'value', 'max')
+
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+        self.max = 0
+
+    def set(self, value):
+        self.value = value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        return {'type': 'gauge', 'value': self.value, 'max': self.max}
+
+
+class Histogram(object):
+    """
+    Counts observations in fixed buckets, plus count, sum and maximum.
+
+    :param bounds: Upper bounds of the buckets, the last bucket is unbounded.
+    :type bounds: tuple of float
+    """
+    __slots__ = ('name', 'bounds', 'buckets', 'count', 'sum', 'max')
+
+    def __init__(self, name, bounds=LATENCY_BOUNDS):
+        self.name = name
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        i = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @contextmanager
+    def time(self):
+        """
+        Context manager observing the time spent in its body, in milliseconds.
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.observe((time.time() - start) * 1000.0)
+
+    def snapshot(self):
+        return {'type': 'histogram', 'count': self.count, 'sum': self.sum, 'max': self.max,
+                'mean': self.sum / self.count if self.count else 0.0,
+                'bounds': list(self.bounds), 'buckets': list(self.buckets)}
+
+
+class _NullMetric(object):
+    """
+    Stands in for every metric while the registry is disabled.
+    """
+    __slots__ = ()
+
+    def inc(self, increment=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, value):
+        pass
+
+    @contextmanager
+    def time(self):
+        yield
+
+
+_null_metric = _NullMetric()
+
+
+class MetricsRegistry(object):
+    """
+    Holds the counters, gauges and histograms recorded by dashboard widgets.
+
+    Widgets fetch their metrics once, usually in ``__init__``. While the
+    registry is disabled they get a shared no-op object, so recording costs
+    a single method call on the hot path.
+
+    Widget metrics are named ``<scope>/<metric>``, with a scope reserved per
+    widget instance by :func:`scope` and dropped again by :func:`release`.
+    """
+    def __init__(self):
+        value = os.environ.get(METRICS_ENV_VAR, '')
+        self.enabled = bool(value) and value.lower() not in ('0', 'false', 'no')
+        self.publish = value.lower() == 'publish'
+        self._metrics = {}
+        # name -> number of scopes handed out for it
+        self._scope_counts = {}
+
+    def _get(self, name, cls, *args):
+        if not self.enabled:
+            return _null_metric
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = cls(name, *args)
+            self._metrics[name] = metric
+        return metric
+
+    def counter(self, name):
+        """
+        :returns: the :class:`Counter` called ``name``
+        """
+        return self._get(name, Counter)
+
+    def gauge(self, name):
+        """
+        :returns: the :class:`Gauge` called ``name``
+        """
+        return self._get(name, Gauge)
+
+    def histogram(self, name, bounds=LATENCY_BOUNDS):
+        """
+        :returns: the :class:`Histogram` called ``name``
+        """
+        return self._get(name, Histogram, bounds)
+
+    def scope(self, name):
+        """
+        Reserve a metric name prefix for one widget instance. Widgets sharing
+        a name get ``name``, ``name#2``, ``name#3`` and so on, suffixes are
+        not reused. While the registry is disabled ``name`` is returned as is.
+
+        :param name: The widget name.
+        :type name: str
+        :returns: the reserved scope
+        """
+        if not self.enabled:
+            return name
+        count = self._scope_counts.get(name, 0) + 1
+        self._scope_counts[name] = count
+        return name if count == 1 else '%s#%d' % (name, count)
+
+    def release(self, scope):
+        """
+        Drop the metrics of a scope reserved with :func:`scope`, e.g. when its
+        widget is shut down.
+        """
+        self.remove(scope + '/')
+
+    def remove(self, prefix):
+        """
+        Drop all metrics whose name starts with ``prefix``, e.g. when a widget is shut down.
+        """
+        for name in [n for n in self._metrics if n.startswith(prefix)]:
+            del self._metrics[name]
+
+    def snapshot(self):
+        """
+        :returns: dict of metric name to a dict of its current values
+        """
+        return dict((name, metric.snapshot()) for name, metric in list(self._metrics.items()))
+
+
+class MetricsPublisher(object):
+    """
+    Periodically publishes a registry snapshot as a ``diagnostic_msgs/DiagnosticArray``.
+
+    :param registry: The registry to publish.
+    :type registry: MetricsRegistry
+    :param topic: The topic to publish on.
+    :type topic: str
+    :param period: Seconds between two messages.
+    :type period: float
+    """
+    def __init__(self, registry, topic=METRICS_TOPIC, period=1.0):
+        import rospy
+        from diagnostic_msgs.msg import DiagnosticArray
+        self._registry = registry
+        self._publisher = rospy.Publisher(topic, DiagnosticArray, queue_size=1)
+        self._timer = rospy.Timer(rospy.Duration(period), self._publish)
+
+    def _publish(self, event):
+        import rospy
+        from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus, KeyValue
+        status = DiagnosticStatus(name='rqt_robot_dashboard metrics', level=DiagnosticStatus.OK)
+        for name, values in sorted(self._registry.snapshot().items()):
+            for key in ('value', 'max', 'count', 'mean'):
+                if key in values:
+                    status.values.append(KeyValue(key='%s/%s' % (name, key), value=str(values[key])))
+        array = DiagnosticArray(status=[status])
+        array.header.stamp = rospy.Time.now()
+        self._publisher.publish(array)
+
+    def shutdown(self):
+        self._timer.shutdown()
+        self._publisher.unregister()
+
+
+#: The registry shared by all dashboards and widgets of this process.
+registry = MetricsRegistry()
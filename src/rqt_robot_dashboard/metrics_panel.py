@@ -0,0 +1,107 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import time
+
+from python_qt_binding.QtCore import QTimer
+from python_qt_binding.QtWidgets import QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
+
+from .metrics import registry
+
+
+class MetricsPanel(QWidget):
+    """
+    A debug panel listing the metrics recorded by the dashboard widgets.
+    Counters also show their rate since the last refresh. The panel only
+    refreshes while it is visible, rows of metrics removed from the
+    registry (e.g. of a widget which was shut down) are dropped.
+
+    Toggled with Ctrl+Shift+M on a dashboard running with ``RQT_DASHBOARD_METRICS`` set.
+
+    :param metrics_registry: The registry to display, the shared one by default.
+    :type metrics_registry: rqt_robot_dashboard.metrics.MetricsRegistry
+    """
+    def __init__(self, metrics_registry=None, parent=None):
+        super(MetricsPanel, self).__init__(parent)
+        self.setObjectName('DashboardMetricsPanel')
+        self.setWindowTitle('Dashboard Metrics')
+        self._registry = metrics_registry if metrics_registry else registry
+        self._items = {}
+        self._last_values = {}
+        self._last_refresh = time.time()
+
+        self._tree = QTreeWidget()
+        self._tree.setHeaderLabels(['Metric', 'Value', 'Rate/s', 'Mean', 'Max'])
+        self._tree.setRootIsDecorated(False)
+        self._tree.setSortingEnabled(True)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._tree)
+        self.setLayout(layout)
+
+        self._timer = QTimer()
+        self._timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        now = time.time()
+        elapsed = max(now - self._last_refresh, 1e-6)
+        self._last_refresh = now
+        snapshot = self._registry.snapshot()
+        for name in [n for n in self._items if n not in snapshot]:
+            item = self._items.pop(name)
+            self._tree.takeTopLevelItem(self._tree.indexOfTopLevelItem(item))
+            self._last_values.pop(name, None)
+        for name, values in snapshot.items():
+            item = self._items.get(name)
+            if item is None:
+                item = QTreeWidgetItem([name])
+                self._items[name] = item
+                self._tree.addTopLevelItem(item)
+            value = values.get('value', values.get('count', 0))
+            rate = ''
+            if values['type'] in ('counter', 'histogram'):
+                rate = '%.1f' % ((value - self._last_values.get(name, value)) / elapsed)
+            self._last_values[name] = value
+            item.setText(1, str(value))
+            item.setText(2, rate)
+            item.setText(3, '%.3f' % values['mean'] if 'mean' in values else '')
+            item.setText(4, str(values['max']) if 'max' in values else '')
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start(1000)
+        super(MetricsPanel, self).showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super(MetricsPanel, self).hideEvent(event)
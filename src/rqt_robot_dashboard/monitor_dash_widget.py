@@ -30,11 +30,14 @@
 # ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-import rospy
-from diagnostic_msgs.msg import DiagnosticStatus
+from diagnostic_msgs.msg import DiagnosticArray, DiagnosticStatus
 from python_qt_binding.QtCore import QMutex, QMutexLocker, QSize, QTimer, Signal
-from rqt_robot_monitor.robot_monitor import RobotMonitorWidget
+from .diagnostics_index import DiagnosticsIndex
 from .icon_tool_button import IconToolButton
+from .level_history import LevelHistory
+from .metrics import SIZE_BOUNDS, registry
+from .profiling import startup_profiler
+from .watchdog import watchdog
 
 
 class MonitorDashWidget(IconToolButton):
@@ -44,13 +47,28 @@ class MonitorDashWidget(IconToolButton):
     Times out after certain period of time (set as 5 sec as of Apr 2013)
     without receiving diagnostics msg ('/diagnostics_toplevel_state' of
     DiagnosticStatus type), status becomes as 'stale'.
+    With a transport on a manual clock, e.g. in a bag replay, the timeout
+    follows the transport time instead of the wall clock.
 
     :param context: The plugin context to create the monitor in.
     :type context: qt_gui.plugin_context.PluginContext
+    :param index_diagnostics: Subscribe to ``/diagnostics_agg`` and list the
+                              worst components in the tooltip, see
+                              :class:`rqt_robot_dashboard.diagnostics_index.DiagnosticsIndex`.
+    :type index_diagnostics: bool
     """
     _msg_trigger = Signal()
+    #: Seconds without diagnostics until the state is stale.
+    stale_timeout = 5.0
+    #: Time window of the level history shown in the tooltip, in seconds.
+    history_window = 60.0
+    #: Number of components listed in the tooltip with ``index_diagnostics``.
+    worst_count = 5
+    # Errors are shown without waiting for the next repaint frame
+    priority_states = (2,)
 
-    def __init__(self, context, icon_paths=[]):
+    @startup_profiler.profile_widget
+    def __init__(self, context, icon_paths=[], index_diagnostics=False):
         self._graveyard = []
         ok_icon = ['bg-green.svg', 'ic-diagnostics.svg']
         warn_icon = ['bg-yellow.svg', 'ic-diagnostics.svg',
@@ -66,55 +84,159 @@ class MonitorDashWidget(IconToolButton):
 
         self.setFixedSize(self._icons[0].actualSize(QSize(50, 30)))
 
+        self._metric_messages = registry.counter('%s/messages' % self.metrics_scope)
+        self._metric_stale_transitions = registry.counter('%s/stale transitions' % self.metrics_scope)
+
         self._monitor = None
         self._close_mutex = QMutex()
         self._show_mutex = QMutex()
 
-        self._last_update = rospy.Time.now()
+        self._last_update = self._transport.get_time()
+        # Transport time of the last diagnostics message
+        self._last_message = None
+        self._manual_clock = getattr(self._transport, 'manual_clock', False)
 
         self.context = context
-        self.clicked.connect(self._show_monitor)
+        self.clicked.connect(watchdog.watch(self._show_monitor, '%s._show_monitor' % self.name))
 
         self._monitor_shown = False
         self.setToolTip('Diagnostics')
 
-        self._diagnostics_toplevel_state_sub = rospy.Subscriber(
-                                'diagnostics_toplevel_state',
-                                DiagnosticStatus, self.toplevel_state_callback)
         self._top_level_state = -1
+        self._history = LevelHistory()
+        self._history_mutex = QMutex()
+        self._diagnostics_index = None
+        self._index_mutex = QMutex()
+        if index_diagnostics:
+            self._diagnostics_index = DiagnosticsIndex()
+            self._metric_index_changes = registry.histogram('%s/index changes per message' % self.metrics_scope, SIZE_BOUNDS)
         self._stall_timer = QTimer()
-        self._stall_timer.timeout.connect(self._stalled)
+        self._stall_timer.timeout.connect(watchdog.watch(self._stalled, '%s._stalled' % self.name))
         self._stalled()
         self._plugin_settings = None
         self._instance_settings = None
-        self._msg_trigger.connect(self._handle_msg_trigger)   
+        self._msg_trigger.connect(self._handle_msg_trigger)
+        if self._manual_clock:
+            self._transport.add_clock_listener(self.check_stale)
+
+        # Subscribe last, the callbacks may run as soon as the subscribers exist
+        self._diagnostics_toplevel_state_sub = self._transport.subscribe(
+                                'diagnostics_toplevel_state',
+                                DiagnosticStatus, self.toplevel_state_callback)
+        self._diagnostics_agg_sub = None
+        if index_diagnostics:
+            self._diagnostics_agg_sub = self._transport.subscribe(
+                                    '/diagnostics_agg', DiagnosticArray, self._diagnostics_agg_callback)
 
     def toplevel_state_callback(self, msg):
+        self._metric_messages.inc()
+        now = self._transport.get_time()
+        with QMutexLocker(self._history_mutex):
+            self._history.add(now, msg.level)
+        self._last_message = now
         self._is_stale = False
         self._msg_trigger.emit()
 
         if self._top_level_state != msg.level:
             if (msg.level >= 2):
                 self.update_state(2)
-                self.setToolTip("Diagnostics: Error")
             elif (msg.level == 1):
                 self.update_state(1)
-                self.setToolTip("Diagnostics: Warning")
             else:
                 self.update_state(0)
-                self.setToolTip("Diagnostics: OK")
             self._top_level_state = msg.level
+            self.tooltip_data_changed()
+
+    def _diagnostics_agg_callback(self, msg):
+        with QMutexLocker(self._index_mutex):
+            changed = self._diagnostics_index.update(msg.status, msg.header.stamp.to_sec())
+        self._metric_index_changes.observe(changed)
+
+    def worst_components(self, n=None):
+        """
+        The worst components on ``/diagnostics_agg``, only available with
+        ``index_diagnostics``.
+
+        :param n: Maximum number of components, ``worst_count`` by default.
+        :type n: int
+        :returns: list of (name, level, message) tuples.
+        """
+        if self._diagnostics_index is None:
+            return []
+        with QMutexLocker(self._index_mutex):
+            return self._diagnostics_index.worst(n or self.worst_count)
+
+    def restore_cached_state(self, snapshot):
+        if self._top_level_state not in (-1, 3):
+            # A live message arrived already
+            return
+        super(MonitorDashWidget, self).restore_cached_state(snapshot)
+        # Make sure the next message replaces the cached state
+        self._top_level_state = -1
+        # and that it goes stale like live data if none arrives
+        self._last_message = self._transport.get_time()
+        self._handle_msg_trigger()
 
     def _handle_msg_trigger(self):
-        self._stall_timer.start(5000)
+        if not self._manual_clock:
+            self._stall_timer.start(int(self.stale_timeout * 1000))
+
+    def check_stale(self, now=None):
+        """
+        Go stale if no diagnostics arrived in the last ``stale_timeout``
+        seconds of transport time. Called whenever a manual transport clock moves.
+
+        :param now: The transport time, read from the transport if ``None``.
+        :type now: float
+        """
+        if self._top_level_state == 3 or self._last_message is None:
+            return
+        if now is None:
+            now = self._transport.get_time()
+        if now - self._last_message >= self.stale_timeout:
+            self._stalled()
 
     def _stalled(self):
         self._stall_timer.stop()
+        if self._top_level_state not in (-1, 3):
+            self._metric_stale_transitions.inc()
         self._is_stale = True
+        with QMutexLocker(self._history_mutex):
+            self._history.add(self._transport.get_time(), 3)
         self.update_state(3)
         self._top_level_state = 3
-        self.setToolTip("Diagnostics: Stale\nNo message received on "
-                        "/diagnostics_agg in the last 5 seconds")
+        self.tooltip_data_changed()
+
+    def tooltip_text(self):
+        # Built from the current state only when the tooltip is shown
+        if self.state == 3:
+            text = ("Diagnostics: Stale\nNo message received on "
+                    "/diagnostics_agg in the last 5 seconds")
+        elif self.state == 2:
+            text = "Diagnostics: Error"
+        elif self.state == 1:
+            text = "Diagnostics: Warning"
+        else:
+            text = "Diagnostics: OK"
+        return text + self._history_text() + self._worst_text()
+
+    def _worst_text(self):
+        worst = self.worst_components()
+        if not worst:
+            return ""
+        labels = {1: 'Warning', 2: 'Error', 3: 'Stale'}
+        lines = ["%s: %s (%s)" % (name, message, labels.get(level, level))
+                 for name, level, message in worst]
+        return "\nWorst components:\n  " + "\n  ".join(lines)
+
+    def _history_text(self):
+        with QMutexLocker(self._history_mutex):
+            if not self._history.samples:
+                return ""
+            now = max(self._transport.get_time(), self._history.last_stamp)
+            since = now - self.history_window
+            return "\nLast %d s: %s\n%d level changes" % (
+                self.history_window, self._history.sparkline(since, now), self._history.changes(since))
 
     def _show_monitor(self):
         with QMutexLocker(self._show_mutex):
@@ -124,6 +246,9 @@ class MonitorDashWidget(IconToolButton):
                     self._monitor_close()
                     self._monitor_shown = False
                 else:
+                    # Imported here so the dashboard does not load the robot
+                    # monitor until it is opened for the first time
+                    from rqt_robot_monitor.robot_monitor import RobotMonitorWidget
                     self._monitor = RobotMonitorWidget(self.context,
                                                        '/diagnostics_agg')
                     if self._plugin_settings:
@@ -152,14 +277,19 @@ class MonitorDashWidget(IconToolButton):
 
     def shutdown_widget(self):
         self._stall_timer.stop()
+        if self._manual_clock:
+            self._transport.remove_clock_listener(self.check_stale)
         if self._monitor:
             self._monitor.shutdown()
         self._diagnostics_toplevel_state_sub.unregister()
+        if self._diagnostics_agg_sub:
+            self._diagnostics_agg_sub.unregister()
 
     def save_settings(self, plugin_settings, instance_settings):
-        if self._monitor_shown:
-            self._monitor.save_settings(self._plugin_settings,
-                                        self._instance_settings)
+        self._plugin_settings = plugin_settings
+        self._instance_settings = instance_settings
+        if self._monitor is not None:
+            self._monitor.save_settings(plugin_settings, instance_settings)
 
     def restore_settings(self, plugin_settings, instance_settings):
         self._plugin_settings = plugin_settings
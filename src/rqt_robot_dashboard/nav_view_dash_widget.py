@@ -30,20 +30,39 @@
 # ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 
-from python_qt_binding.QtCore import QMutex, QMutexLocker, QSize
-from rqt_nav_view.nav_view import NavViewWidget
+import threading
+
+from python_qt_binding.QtCore import QMutex, QMutexLocker, QSize, QTimer, Signal
 
 from .icon_tool_button import IconToolButton
+from .profiling import startup_profiler
+from .watchdog import watchdog
 
 
 class NavViewDashWidget(IconToolButton):
     """
     A widget which launches a nav_view widget in order to view and interact with the ROS nav stack
 
+    With ``prewarm`` the nav view module is imported in a background thread
+    and the nav view is created ``prewarm_delay`` seconds after the dashboard
+    starts, so it subscribes early and shows the latest map instantly when
+    clicked. The nav view converts incoming maps in its subscriber thread.
+
+    With ``unsubscribe_when_hidden`` the nav view is closed when hidden,
+    which drops its map subscription to save bandwidth; it is created and
+    subscribed again the next time it is shown.
+
     :param context: The plugin context in which to dsiplay the nav_view, ''qt_gui.plugin_context.PluginContext''
     :param name: The widgets name, ''str''
+    :param prewarm: Create the nav view in the background before it is first shown, ''bool''
+    :param prewarm_delay: Seconds to wait before prewarming, ''float''
+    :param unsubscribe_when_hidden: Close the nav view and its subscriptions while hidden, ''bool''
     """
-    def __init__(self, context, name='NavView', icon_paths=None):
+    _navview_module_loaded = Signal()
+
+    @startup_profiler.profile_widget
+    def __init__(self, context, name='NavView', icon_paths=None, prewarm=False, prewarm_delay=0.0,
+                 unsubscribe_when_hidden=False):
         self._icons = [['bg-grey.svg', 'ic-navigation.svg']]
         super(NavViewDashWidget, self).__init__(name, icons=self._icons, suppress_overlays=True, icon_paths=icon_paths)
         self.context = context
@@ -52,17 +71,49 @@ class NavViewDashWidget(IconToolButton):
 
         self._navview = None
         self._navview_shown = False
-        self.clicked.connect(self._show_navview)
+        self._settings = None
+        self._shut_down = False
+        self._unsubscribe_when_hidden = unsubscribe_when_hidden
+        self.clicked.connect(watchdog.watch(self._show_navview, '%s._show_navview' % name))
         self._show_mutex = QMutex()
 
+        self._navview_module_loaded.connect(self._prewarm)
+        if prewarm:
+            QTimer.singleShot(int(prewarm_delay * 1000), self._start_prewarm)
+
+    def _start_prewarm(self):
+        loader = threading.Thread(target=self._load_navview_module, name='%s prewarm' % self.name)
+        loader.daemon = True
+        loader.start()
+
+    def _load_navview_module(self):
+        # Only the import happens here, widgets must be created on the GUI thread
+        import rqt_nav_view.nav_view
+        self._navview_module_loaded.emit()
+
+    def _prewarm(self):
+        with QMutexLocker(self._show_mutex):
+            if not self._shut_down and self._navview is None:
+                self._create_navview()
+
+    def _create_navview(self):
+        # Imported here so the dashboard does not load the nav view
+        # until it is needed
+        from rqt_nav_view.nav_view import NavViewWidget
+        self._navview = NavViewWidget()
+        if self._settings:
+            self._navview.restore_settings(*self._settings)
+
     def _show_navview(self):
         with QMutexLocker(self._show_mutex):
             if self._navview is None:
-                self._navview = NavViewWidget()
+                self._create_navview()
             try:
                 if self._navview_shown:
                     self.context.remove_widget(self._navview)
                     self._navview_shown = not self._navview_shown
+                    if self._unsubscribe_when_hidden:
+                        self._release_navview()
                 else:
                     self.context.add_widget(self._navview)
                     self._navview_shown = not self._navview_shown
@@ -70,12 +121,22 @@ class NavViewDashWidget(IconToolButton):
                 self._navview_shown = not self._navview_shown
                 self._show_navview()
 
+    def _release_navview(self):
+        if self._settings:
+            self._navview.save_settings(*self._settings)
+        self._navview.close()
+        self._navview = None
+
     def shutdown_widget(self):
+        self._shut_down = True
         if self._navview:
             self._navview.close()
 
     def save_settings(self, plugin_settings, instance_settings):
-        self._navview.save_settings(plugin_settings, instance_settings)
+        if self._navview:
+            self._navview.save_settings(plugin_settings, instance_settings)
 
     def restore_settings(self, plugin_settings, instance_settings):
-        self._navview.restore_settings(plugin_settings, instance_settings)
+        self._settings = (plugin_settings, instance_settings)
+        if self._navview:
+            self._navview.restore_settings(plugin_settings, instance_settings)
@@ -0,0 +1,254 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+import time
+
+from python_qt_binding.QtCore import QCoreApplication, QObject, Qt, Signal
+from python_qt_binding.QtWidgets import QHBoxLayout, QListWidget, QPushButton, QVBoxLayout, QWidget
+
+from .transport import get_transport
+
+_LOG_FUNCTIONS = {'info': 'loginfo', 'warn': 'logwarn', 'error': 'logerr'}
+
+
+class Notification(object):
+    """
+    One distinct message, with the number of times it was reported.
+    """
+    __slots__ = ('key', 'level', 'title', 'text', 'count', 'first', 'last', 'logged', 'unlogged', 'shown')
+
+    def __init__(self, key, level, title, text, now):
+        self.key = key
+        self.level = level
+        self.title = title
+        self.text = text
+        self.count = 1
+        self.first = now
+        self.last = now
+        self.logged = None
+        self.unlogged = 0
+        self.shown = None
+
+    def __str__(self):
+        text = '[%s] %s: %s' % (self.level.upper(), self.title, self.text)
+        if self.count > 1:
+            text += ' (x%d)' % self.count
+        return text
+
+
+class NotificationManager(QObject):
+    """
+    Collects the messages reported with :func:`rqt_robot_dashboard.util.dashinfo`,
+    :func:`~rqt_robot_dashboard.util.dashwarn` and :func:`~rqt_robot_dashboard.util.dasherr`.
+
+    Identical messages are coalesced into one entry with a repeat counter
+    and logged at most once per ``log_interval`` seconds. The
+    :class:`NotificationPanel` is refreshed at most once per event loop
+    iteration, so a burst of errors costs constant UI work. It is opened
+    for a new message, a repeated message reopens a closed panel at most
+    once per ``show_interval`` seconds. Only the ``history`` most recently
+    reported distinct messages are kept.
+
+    :func:`notify` may be called from any thread, e.g. rospy callbacks or
+    the worker threads of asynchronous menu actions. The panel is only
+    created and updated in the GUI thread.
+
+    :param history: Number of distinct messages to keep.
+    :type history: int
+    :param log_interval: Minimum seconds between two log lines for the same message.
+    :type log_interval: float
+    :param show_interval: Minimum seconds between two times the same message opens the panel.
+    :type show_interval: float
+    :param clock: Callable returning the current time in seconds.
+    :type clock: callable
+    """
+    changed = Signal()
+    _refresh_requested = Signal()
+
+    def __init__(self, history=100, log_interval=5.0, show_interval=60.0, clock=time.time):
+        super(NotificationManager, self).__init__()
+        app = QCoreApplication.instance()
+        if app is not None:
+            # The manager may be created by the first notify, in any thread
+            self.moveToThread(app.thread())
+        self._lock = threading.Lock()
+        self._history = history
+        self._by_key = {}
+        self._log_interval = log_interval
+        self._show_interval = show_interval
+        self._clock = clock
+        self._panel = None
+        self._owners = {}
+        self._refresh_pending = False
+        self._show_pending = False
+        # Queued, so the refresh runs in the GUI thread once per event loop iteration
+        self._refresh_requested.connect(self._refresh, Qt.QueuedConnection)
+
+    def notify(self, level, text, title, owner=None):
+        """
+        Report a message.
+
+        :param level: One of ``'info'``, ``'warn'`` or ``'error'``.
+        :type level: str
+        :param text: The message.
+        :type text: str
+        :param title: A short title, e.g. the action which failed.
+        :type title: str
+        :param owner: Object reporting the message, its ``_message_box`` is
+                      set to the panel once it is shown.
+        :type owner: QObject
+        :returns: the :class:`Notification` entry for this message
+        """
+        message = None
+        with self._lock:
+            now = self._clock()
+            key = (level, title, text)
+            notification = self._by_key.get(key)
+            if notification is None:
+                if len(self._by_key) >= self._history:
+                    # Forget the message which was reported least recently
+                    oldest = min(self._by_key.values(), key=lambda n: n.last)
+                    del self._by_key[oldest.key]
+                notification = Notification(key, level, title, text, now)
+                self._by_key[key] = notification
+            else:
+                notification.count += 1
+                notification.last = now
+
+            if notification.shown is None or now - notification.shown >= self._show_interval:
+                notification.shown = now
+                self._show_pending = True
+
+            if notification.logged is None or now - notification.logged >= self._log_interval:
+                message = text
+                if notification.unlogged:
+                    message += ' (repeated %d more times)' % notification.unlogged
+                notification.logged = now
+                notification.unlogged = 0
+            else:
+                notification.unlogged += 1
+
+            if owner is not None:
+                self._owners[id(owner)] = owner
+            request_refresh = not self._refresh_pending
+            self._refresh_pending = True
+
+        if message is not None:
+            getattr(get_transport(), _LOG_FUNCTIONS.get(level, 'loginfo'))(message)
+        if request_refresh:
+            self._refresh_requested.emit()
+        return notification
+
+    def notifications(self):
+        """
+        :returns: the kept notifications, most recently reported first
+        """
+        with self._lock:
+            return sorted(self._by_key.values(), key=lambda n: n.last, reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._by_key.clear()
+        self.changed.emit()
+
+    def panel(self):
+        """
+        Must be called from the GUI thread.
+
+        :returns: the panel showing the notifications, created on first use
+        """
+        if self._panel is None:
+            self._panel = NotificationPanel(self)
+        return self._panel
+
+    def _refresh(self):
+        with self._lock:
+            self._refresh_pending = False
+            show, self._show_pending = self._show_pending, False
+            owners, self._owners = self._owners, {}
+        panel = self.panel()
+        for owner in owners.values():
+            # Kept for code which used the QMessageBox previously stored here
+            owner._message_box = panel
+        self.changed.emit()
+        if show and not panel.isVisible():
+            panel.show()
+
+
+class NotificationPanel(QWidget):
+    """
+    A single non-modal window listing the dashboard notifications.
+    """
+    def __init__(self, manager, parent=None):
+        super(NotificationPanel, self).__init__(parent, Qt.Tool)
+        self.setObjectName('DashboardNotifications')
+        self.setWindowTitle('Dashboard Notifications')
+        self._manager = manager
+
+        self._list = QListWidget()
+        clear_button = QPushButton('Clear')
+        clear_button.clicked.connect(manager.clear)
+        close_button = QPushButton('Close')
+        close_button.clicked.connect(self.hide)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(clear_button)
+        buttons.addWidget(close_button)
+        layout = QVBoxLayout()
+        layout.addWidget(self._list)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+        self.resize(500, 200)
+
+        manager.changed.connect(self._update)
+
+    def _update(self):
+        self._list.clear()
+        self._list.addItems([str(n) for n in self._manager.notifications()])
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_notification_manager():
+    """
+    :returns: the notification manager shared by all dashboards of this process
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = NotificationManager()
+    return _manager
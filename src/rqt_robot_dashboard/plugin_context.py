@@ -0,0 +1,68 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+from python_qt_binding.QtCore import QObject
+
+
+class FakePluginContext(QObject):
+    """
+    Stands in for ``qt_gui.plugin_context.PluginContext`` when a dashboard
+    runs outside of rqt_gui, e.g. in benchmarks or bag replays. Toolbars and
+    widgets added by the dashboard are only collected.
+
+    ``qt_gui.plugin.Plugin`` uses the context as its QObject parent, so
+    this has to be a QObject too.
+
+    :param argv: The plugin arguments.
+    :type argv: list of str
+    """
+    def __init__(self, argv=None):
+        super(FakePluginContext, self).__init__()
+        self._argv = argv if argv else []
+        self.toolbars = []
+        self.widgets = []
+
+    def serial_number(self):
+        return 1
+
+    def argv(self):
+        return self._argv
+
+    def add_toolbar(self, toolbar):
+        self.toolbars.append(toolbar)
+
+    def add_widget(self, widget):
+        self.widgets.append(widget)
+
+    def remove_widget(self, widget):
+        self.widgets.remove(widget)
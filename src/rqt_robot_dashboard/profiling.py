@@ -0,0 +1,173 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from .transport import get_transport
+
+#: Set to ``1`` to profile dashboard startup, or to a file name to also write the report there as JSON.
+PROFILE_ENV_VAR = 'RQT_DASHBOARD_PROFILE'
+#: Plugin argument enabling the startup profiler, e.g. ``rqt -s my_dashboard --args --profile-startup``
+PROFILE_ARGUMENT = '--profile-startup'
+
+
+class StartupProfiler(object):
+    """
+    Collects wall time per startup phase and per widget, plus event counts
+    like the number of rendered icons, while a dashboard is constructed.
+    All methods are cheap no-ops while :attr:`enabled` is false.
+    """
+    def __init__(self):
+        value = os.environ.get(PROFILE_ENV_VAR, '')
+        self.enabled = bool(value) and value.lower() not in ('0', 'false', 'no')
+        self.output_path = value if self.enabled and value.lower() not in ('1', 'true', 'yes') else None
+        self.reset()
+
+    def reset(self):
+        """
+        Drop everything recorded so far.
+        """
+        self._start = time.time()
+        self._phases = {}
+        self._widgets = []
+        self._counters = {}
+        self._active_widgets = set()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Context manager adding the time spent in its body to phase ``name``.
+        Phases with the same name are summed up.
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            seconds, calls = self._phases.get(name, (0.0, 0))
+            self._phases[name] = (seconds + time.time() - start, calls + 1)
+
+    def count(self, name, increment=1):
+        """
+        Increase the counter ``name``.
+        """
+        if self.enabled:
+            self._counters[name] = self._counters.get(name, 0) + increment
+
+    def profile_widget(self, init):
+        """
+        Decorator for widget ``__init__`` methods recording the construction
+        time and number of icon renders of every widget.
+        Only the outermost decorated ``__init__`` of a widget is recorded, so
+        a subclass and its base class can both be decorated.
+        """
+        @functools.wraps(init)
+        def wrapper(widget, *args, **kwargs):
+            if not self.enabled or id(widget) in self._active_widgets:
+                return init(widget, *args, **kwargs)
+            start = time.time()
+            renders = self._counters.get('icon renders', 0)
+            self._active_widgets.add(id(widget))
+            try:
+                init(widget, *args, **kwargs)
+            finally:
+                self._active_widgets.discard(id(widget))
+            self._widgets.append({
+                'name': getattr(widget, 'name', None) or getattr(widget, '_name', ''),
+                'class': type(widget).__name__,
+                'seconds': time.time() - start,
+                'icon renders': self._counters.get('icon renders', 0) - renders,
+            })
+        return wrapper
+
+    def report(self):
+        """
+        :returns: the recorded data as a dict which can be serialized to JSON
+        """
+        return {
+            'total seconds': time.time() - self._start,
+            'phases': dict((name, {'seconds': seconds, 'calls': calls})
+                           for name, (seconds, calls) in self._phases.items()),
+            'widgets': list(self._widgets),
+            'counters': dict(self._counters),
+        }
+
+    def format_report(self, title='Dashboard startup'):
+        """
+        :returns: the report as human readable text
+        """
+        report = self.report()
+        lines = ['%s: %.3fs' % (title, report['total seconds'])]
+        for name, phase in sorted(report['phases'].items(), key=lambda p: -p[1]['seconds']):
+            lines.append('  %-20s %8.3fs  (%d calls)' % (name, phase['seconds'], phase['calls']))
+        for widget in sorted(report['widgets'], key=lambda w: -w['seconds']):
+            lines.append('  %-20s %8.3fs  %3d icon renders  [%s]' % (
+                widget['name'], widget['seconds'], widget['icon renders'], widget['class']))
+        for name, value in sorted(report['counters'].items()):
+            lines.append('  %s: %d' % (name, value))
+        return '\n'.join(lines)
+
+    def publish_report(self, title='Dashboard startup'):
+        """
+        Log the report and write it as JSON if a file name was configured.
+
+        :returns: the report dict
+        """
+        report = self.report()
+        get_transport().loginfo(self.format_report(title))
+        if self.output_path:
+            with open(self.output_path, 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+        return report
+
+
+def rss_kb():
+    """
+    Resident set size of this process in kB, or 0 where /proc is unavailable.
+    """
+    try:
+        import resource
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize() // 1024
+    except (IOError, OSError, ImportError):
+        return 0
+
+
+#: The profiler used by all dashboards and widgets of this process.
+startup_profiler = StartupProfiler()
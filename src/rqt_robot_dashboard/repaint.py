@@ -0,0 +1,163 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+
+from python_qt_binding.QtCore import QElapsedTimer, QObject, QTimer
+
+from .metrics import SIZE_BOUNDS, registry
+
+#: Maximum number of repaint frames per second, e.g. ``2`` for remote displays.
+FRAME_RATE_ENV_VAR = 'RQT_DASHBOARD_MAX_FPS'
+
+
+class RepaintScheduler(QObject):
+    """
+    Collects the visual changes of all dashboard widgets and commits them
+    together in one frame, at most ``frame_rate`` times per second.
+
+    Over X forwarding or VNC every ``setIcon``/``setPixmap`` costs bandwidth,
+    so widgets hand their repaint to :func:`schedule` instead of doing it
+    right away. Only the latest change per widget is kept until the next
+    frame. Urgent changes, e.g. a runstop or an error state, bypass the
+    throttle and are committed immediately.
+
+    Throttling is off unless a frame rate is set, either with
+    ``RQT_DASHBOARD_MAX_FPS`` or :func:`set_frame_rate`.
+
+    :param frame_rate: Maximum frames per second, ``None`` or ``0`` disables throttling.
+    :type frame_rate: float
+    """
+    def __init__(self, frame_rate=None):
+        super(RepaintScheduler, self).__init__()
+        value = os.environ.get(FRAME_RATE_ENV_VAR, '')
+        if frame_rate is None and value:
+            try:
+                frame_rate = float(value)
+            except ValueError:
+                frame_rate = None
+        self._pending = {}
+        self._timer = None
+        self._clock = None
+        self._last_frame = None
+        self._metric_frames = registry.counter('repaint/frames')
+        self._metric_coalesced = registry.counter('repaint/coalesced')
+        self._metric_urgent = registry.counter('repaint/urgent')
+        self._metric_frame_size = registry.histogram('repaint/changes per frame', SIZE_BOUNDS)
+        self.set_frame_rate(frame_rate)
+
+    @property
+    def frame_rate(self):
+        return self._frame_rate
+
+    @property
+    def enabled(self):
+        return self._frame_rate > 0
+
+    def set_frame_rate(self, frame_rate):
+        """
+        Change the maximum frame rate. Pending changes are committed right
+        away when throttling is turned off.
+
+        :param frame_rate: Maximum frames per second, ``None`` or ``0`` disables throttling.
+        :type frame_rate: float
+        """
+        self._frame_rate = float(frame_rate) if frame_rate and frame_rate > 0 else 0.0
+        if not self.enabled:
+            self.flush()
+        elif self._timer is not None and self._timer.isActive():
+            self._timer.start(self._frame_delay())
+
+    def schedule(self, widget, commit, urgent=False):
+        """
+        Commit a visual change of ``widget`` with the next frame.
+
+        :param widget: The widget which changed, only its latest change is kept.
+        :type widget: QWidget
+        :param commit: Callable doing the repaint, e.g. setting the new icon.
+        :type commit: callable
+        :param urgent: Commit immediately, bypassing the frame rate.
+        :type urgent: bool
+        """
+        if not self.enabled or urgent:
+            self._pending.pop(id(widget), None)
+            if urgent and self.enabled:
+                self._metric_urgent.inc()
+            commit()
+            return
+        if id(widget) in self._pending:
+            self._metric_coalesced.inc()
+        self._pending[id(widget)] = commit
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self.flush)
+            self._clock = QElapsedTimer()
+            self._clock.start()
+        if not self._timer.isActive():
+            self._timer.start(self._frame_delay())
+
+    def cancel(self, widget):
+        """
+        Drop the pending change of ``widget``, e.g. when it is shut down.
+        """
+        self._pending.pop(id(widget), None)
+
+    def flush(self):
+        """
+        Commit all pending changes now.
+        """
+        if self._timer is not None:
+            self._timer.stop()
+            self._last_frame = self._clock.elapsed()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self._metric_frames.inc()
+        self._metric_frame_size.observe(len(pending))
+        for commit in pending.values():
+            try:
+                commit()
+            except RuntimeError:
+                # The underlying C++ widget was deleted before the frame
+                pass
+
+    def _frame_delay(self):
+        interval = 1000.0 / self._frame_rate
+        if self._last_frame is None:
+            return 0
+        return int(max(0.0, interval - (self._clock.elapsed() - self._last_frame)))
+
+
+#: The scheduler shared by all dashboards and widgets of this process.
+repaint_scheduler = RepaintScheduler()
@@ -0,0 +1,255 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Replays a recorded bag file through a dashboard without a ROS master.
+
+The dashboard runs offscreen on a :class:`rqt_robot_dashboard.transport.FakeTransport`
+whose clock follows the bag time. Messages are delivered to every widget
+which subscribed through the transport, at 1x, Nx or maximum speed, and
+the run reports per-widget callback time, the state transitions of every
+widget, memory use and the metrics recorded by the widgets.
+
+Dashboards must subscribe through ``get_transport().subscribe`` (as the
+standard widgets do) for their topics to be replayed.
+
+The monitor goes stale on the transport clock, so stale transitions
+happen at the same bag time at any speed. Other widget timers, such as
+the console's insert timer, run on the wall clock.
+
+Usage::
+
+    rosrun rqt_robot_dashboard dashboard_replay my_pkg.my_dashboard:MyDashboard robot.bag \\
+        --speed 10 --output replay.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import time
+
+from .metrics import registry
+from .profiling import rss_kb
+from .transport import FakeTransport, set_transport
+
+DEFAULT_TOPICS = ['/rosout_agg', '/diagnostics_toplevel_state', '/diagnostics_agg']
+#: Largest step of the transport clock, in bag seconds. Gaps in the bag are
+#: stepped through, so timeouts on the transport time (e.g. a stale monitor)
+#: happen at the same bag time at any replay speed.
+CLOCK_STEP = 0.1
+
+
+def _owner_name(callback):
+    owner = getattr(callback, '__self__', None)
+    if owner is None:
+        return getattr(callback, '__name__', repr(callback))
+    return getattr(owner, 'name', None) or type(owner).__name__
+
+
+class _ReplayTransport(FakeTransport):
+    """
+    A FakeTransport timing every callback it delivers a message to.
+    """
+    def __init__(self):
+        super(_ReplayTransport, self).__init__()
+        self.callback_stats = {}
+
+    def publish(self, topic, msg):
+        subscriptions = list(self._subscriptions.get(self._resolve(topic), []))
+        for subscription in subscriptions:
+            start = time.time()
+            subscription.callback(msg)
+            elapsed = time.time() - start
+            key = '%s <- %s' % (_owner_name(subscription.callback), subscription.name)
+            stats = self.callback_stats.setdefault(key, {'calls': 0, 'seconds': 0.0, 'max_ms': 0.0})
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+            stats['max_ms'] = max(stats['max_ms'], elapsed * 1000.0)
+        return len(subscriptions)
+
+
+class DashboardReplay(object):
+    """
+    Feeds the messages of a bag file through a dashboard.
+
+    :param dashboard_class: The Dashboard subclass to instantiate.
+    :type dashboard_class: type
+    :param bag_path: Path of the bag file.
+    :type bag_path: str
+    :param topics: Topics to replay, all known dashboard topics if ``None``.
+    :type topics: list of str
+    :param speed: Replay speed factor, ``None`` to replay as fast as possible.
+    :type speed: float
+    :param argv: Plugin arguments passed to the dashboard.
+    :type argv: list of str
+    """
+    def __init__(self, dashboard_class, bag_path, topics=None, speed=1.0, argv=None):
+        self._dashboard_class = dashboard_class
+        self._bag_path = bag_path
+        self._topics = topics
+        self._speed = speed
+        self._argv = argv
+        self.timeline = []
+        self.memory = []
+        self.topic_counts = {}
+        self._wall_seconds = 0.0
+        self._bag_seconds = 0.0
+        self._callback_stats = {}
+        self._metrics = {}
+
+    def run(self):
+        """
+        Replay the bag and return the report, see :func:`report`.
+        """
+        import rosbag
+        from python_qt_binding.QtWidgets import QApplication
+        from .plugin_context import FakePluginContext
+
+        transport = _ReplayTransport()
+        previous_transport = set_transport(transport)
+        metrics_enabled = registry.enabled
+        registry.enabled = True
+        try:
+            rss_start = rss_kb()
+            dashboard = self._dashboard_class(FakePluginContext(self._argv))
+            for widget in dashboard._widgets:
+                if hasattr(widget, 'state_changed'):
+                    widget.state_changed.connect(self._state_recorder(transport, widget))
+            self.memory.append((0.0, rss_kb() - rss_start))
+
+            topics = self._topics
+            if topics is None:
+                topics = sorted(set(DEFAULT_TOPICS) | set(transport._subscriptions))
+            wall_start = time.time()
+            bag_start = None
+            last_events = 0.0
+            with rosbag.Bag(self._bag_path) as bag:
+                for topic, msg, stamp in bag.read_messages(topics=topics):
+                    bag_time = stamp.to_sec()
+                    if bag_start is None:
+                        bag_start = bag_time
+                    if self._speed:
+                        delay = (bag_time - bag_start) / self._speed - (time.time() - wall_start)
+                        while delay > 0:
+                            QApplication.processEvents()
+                            time.sleep(min(delay, 0.01))
+                            delay = (bag_time - bag_start) / self._speed - (time.time() - wall_start)
+                    while bag_time - transport.get_time() > CLOCK_STEP and transport.get_time() >= bag_start:
+                        transport.advance(CLOCK_STEP)
+                    transport.set_time(bag_time)
+                    transport.publish(topic, msg)
+                    self.topic_counts[topic] = self.topic_counts.get(topic, 0) + 1
+                    # Let widget timers (e.g. the console's insert timer) run
+                    if time.time() - last_events > 0.01:
+                        QApplication.processEvents()
+                        last_events = time.time()
+                    if sum(self.topic_counts.values()) % 1000 == 0:
+                        self.memory.append((bag_time - bag_start, rss_kb() - rss_start))
+            QApplication.processEvents()
+            self._wall_seconds = time.time() - wall_start
+            self._bag_seconds = (transport.get_time() - bag_start) if bag_start is not None else 0.0
+            self.memory.append((self._bag_seconds, rss_kb() - rss_start))
+            self._callback_stats = transport.callback_stats
+            self._metrics = registry.snapshot()
+            dashboard.shutdown_plugin()
+        finally:
+            registry.enabled = metrics_enabled
+            set_transport(previous_transport)
+        return self.report()
+
+    def _state_recorder(self, transport, widget):
+        name = getattr(widget, 'name', None) or getattr(widget, '_name', type(widget).__name__)
+
+        def record(state):
+            self.timeline.append((transport.get_time(), name, state))
+        return record
+
+    def report(self):
+        """
+        :returns: dict with the wall and bag duration, message counts per topic,
+                  callback time per widget and topic, the state timeline as
+                  (bag time, widget, state), RSS growth samples in kB as
+                  (seconds into the bag, kB), and the widget metrics
+        """
+        return {
+            'bag': self._bag_path,
+            'speed': self._speed,
+            'wall_seconds': self._wall_seconds,
+            'bag_seconds': self._bag_seconds,
+            'topics': self.topic_counts,
+            'callbacks': self._callback_stats,
+            'timeline': self.timeline,
+            'rss_growth_kb': self.memory,
+            'metrics': self._metrics,
+        }
+
+
+def _load_class(spec):
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        module_name, _, class_name = spec.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay a bag file through a dashboard offscreen.')
+    parser.add_argument('dashboard', help='dashboard class as package.module:Class')
+    parser.add_argument('bag', help='bag file to replay')
+    parser.add_argument('--speed', default='1',
+                        help="replay speed factor, or 'max' to replay as fast as possible")
+    parser.add_argument('--topics', default=None, help='comma separated topics to replay')
+    parser.add_argument('--args', nargs=argparse.REMAINDER, default=[],
+                        help='plugin arguments passed to the dashboard')
+    parser.add_argument('--output', help='write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from python_qt_binding.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(['dashboard_replay'])
+
+    replay = DashboardReplay(_load_class(args.dashboard), args.bag,
+                             topics=args.topics.split(',') if args.topics else None,
+                             speed=None if args.speed == 'max' else float(args.speed),
+                             argv=args.args)
+    report = replay.run()
+
+    print('Replayed %.1fs of %s in %.1fs' % (report['bag_seconds'], args.bag, report['wall_seconds']))
+    for topic, count in sorted(report['topics'].items()):
+        print('  %-40s %8d messages' % (topic, count))
+    for key, stats in sorted(report['callbacks'].items(), key=lambda s: -s[1]['seconds']):
+        print('  %-40s %8.3fs  max %.2f ms  (%d calls)' % (key, stats['seconds'], stats['max_ms'], stats['calls']))
+    print('  %d state transitions, RSS growth %d kB' % (len(report['timeline']), report['rss_growth_kb'][-1][1]))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
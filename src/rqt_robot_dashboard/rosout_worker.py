@@ -0,0 +1,240 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import subprocess
+import sys
+import threading
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection
+
+from .log_store import _SUMMARY_SEVERITIES, LogSummary, record_from_log
+from .severity_index import WARN
+
+
+class RosoutWorker(object):
+    """
+    Subscribes to ``/rosout_agg`` in a separate process, so decoding log
+    storms does not compete with the dashboard's GUI thread for the GIL.
+
+    The worker counts every message per severity and converts those at or
+    above ``min_severity`` into :class:`rqt_robot_dashboard.log_store.LogRecord`
+    tuples. Every ``period`` seconds it sends the counts and a sample of at
+    most ``sample_size`` of the records through a pipe, warnings and worse
+    before the rest. The dashboard's work per batch is therefore bounded
+    however many messages arrive, while the counts stay exact. When the
+    dashboard falls behind, the worker keeps at most ``max_pending`` records.
+    Records left out of a sample or dropped are counted in :attr:`dropped`.
+
+    The worker is started as ``python -m rqt_robot_dashboard.rosout_worker``
+    and runs its own anonymous ROS node. It is neither a fork of the
+    dashboard nor a ``multiprocessing`` child, which would run the
+    dashboard's ``__main__`` script again.
+
+    :param topic: The log topic.
+    :type topic: str
+    :param period: Seconds between batches.
+    :type period: float
+    :param min_severity: Lowest severity forwarded as records, all severities are counted.
+    :type min_severity: int
+    :param max_pending: Maximum number of records waiting in the worker.
+    :type max_pending: int
+    :param sample_size: Maximum number of records sent per batch.
+    :type sample_size: int
+    """
+    def __init__(self, topic='/rosout_agg', period=0.1, min_severity=0, max_pending=10000, sample_size=200):
+        self.topic = topic
+        self.period = period
+        self.min_severity = min_severity
+        self.max_pending = max_pending
+        self.sample_size = sample_size
+        #: Records the worker did not forward, because they were left out of a sample or the dashboard fell behind.
+        self.dropped = 0
+        self._process = None
+        self._conn = None
+
+    @property
+    def alive(self):
+        """
+        ``False`` once the worker process exited or closed its pipe.
+        """
+        return self._conn is not None and self._process is not None and self._process.poll() is None
+
+    def start(self):
+        if self._process is not None:
+            return
+        self._conn, self._process = self._spawn()
+
+    def _spawn(self):
+        conn, child_conn = Pipe()
+        fd = child_conn.fileno()
+        env = dict(os.environ)
+        # The worker imports this package from wherever the dashboard found it
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'rqt_robot_dashboard.rosout_worker', str(fd), self.topic,
+             str(self.period), str(self.min_severity), str(self.max_pending), str(self.sample_size)],
+            pass_fds=(fd,), env=env)
+        child_conn.close()
+        return conn, process
+
+    def poll(self, max_records=1000):
+        """
+        Receive the batches sent by the worker without blocking.
+
+        :param max_records: Batches are received until at least this many
+                            records arrived, the rest is left for the next call.
+        :type max_records: int
+        :returns: tuple of a list of :class:`rqt_robot_dashboard.log_store.LogRecord`
+                  tuples and a :class:`rqt_robot_dashboard.log_store.LogSummary`
+                  counting all messages of the received batches.
+        """
+        records = []
+        counts = [0] * len(LogSummary._fields)
+        if self._conn is None:
+            return records, LogSummary(*counts)
+        try:
+            while len(records) < max_records and self._conn.poll():
+                batch, batch_counts, self.dropped = self._conn.recv()
+                records.extend(batch)
+                counts = [total + count for total, count in zip(counts, batch_counts)]
+        except (EOFError, IOError):
+            # The worker died, keep what was received, alive is False from now on
+            self._conn.close()
+            self._conn = None
+        return records, LogSummary(*counts)
+
+    def stop(self, timeout=2.0, block=True):
+        """
+        Ask the worker to exit, it is terminated if it does not within ``timeout`` seconds.
+
+        :param block: If ``False``, wait for the worker in a background
+                      thread, e.g. when called from the GUI thread.
+        :type block: bool
+        """
+        if self._process is None:
+            return
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except (EOFError, IOError):
+                pass
+            self._conn.close()
+            self._conn = None
+        process, self._process = self._process, None
+        if block:
+            _reap(process, timeout)
+        else:
+            thread = threading.Thread(target=_reap, args=(process, timeout), name='rosout worker reaper')
+            thread.daemon = True
+            thread.start()
+
+
+def _reap(process, timeout):
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.terminate()
+        process.wait()
+
+
+def _sample(records, size):
+    """
+    At most ``size`` of ``records`` in their original order, the newest
+    warnings and worse first, then the newest of the rest.
+    """
+    if len(records) <= size:
+        return records
+    severe = [i for i, record in enumerate(records) if record.severity >= WARN]
+    keep = severe[max(0, len(severe) - size):]
+    if len(keep) < size:
+        rest = [i for i, record in enumerate(records) if record.severity < WARN]
+        keep.extend(rest[len(rest) - (size - len(keep)):])
+    return [records[i] for i in sorted(keep)]
+
+
+def _worker_main(conn, topic, period, min_severity, max_pending, sample_size):
+    # Runs in the worker process
+    import rospy
+    from rosgraph_msgs.msg import Log
+
+    rospy.init_node('rqt_dashboard_rosout', anonymous=True, disable_signals=True, disable_rosout=True)
+    lock = threading.Lock()
+    state = {'pending': [], 'counts': [0] * len(_SUMMARY_SEVERITIES), 'dropped': 0}
+
+    def callback(log_msg):
+        with lock:
+            if log_msg.level in _SUMMARY_SEVERITIES:
+                state['counts'][_SUMMARY_SEVERITIES.index(log_msg.level)] += 1
+        if log_msg.level < min_severity:
+            return
+        record = record_from_log(log_msg)
+        with lock:
+            pending = state['pending']
+            pending.append(record)
+            if len(pending) > max_pending:
+                state['dropped'] += len(pending) - max_pending
+                del pending[:len(pending) - max_pending]
+
+    subscriber = rospy.Subscriber(topic, Log, callback, queue_size=1000)
+    try:
+        while not rospy.is_shutdown():
+            if conn.poll(period) and conn.recv() is None:
+                break
+            with lock:
+                pending = state['pending']
+                counts = state['counts']
+                state['pending'] = []
+                state['counts'] = [0] * len(_SUMMARY_SEVERITIES)
+                batch = _sample(pending, sample_size)
+                state['dropped'] += len(pending) - len(batch)
+                dropped = state['dropped']
+            if batch or any(counts):
+                conn.send((batch, counts, dropped))
+    except (EOFError, IOError):
+        # The dashboard closed
+        pass
+    finally:
+        subscriber.unregister()
+        rospy.signal_shutdown('dashboard closed')
+
+
+def main(argv=None):
+    fd, topic, period, min_severity, max_pending, sample_size = (argv or sys.argv)[1:7]
+    _worker_main(Connection(int(fd)), topic, float(period), int(min_severity), int(max_pending),
+                 int(sample_size))
+
+
+if __name__ == '__main__':
+    main()
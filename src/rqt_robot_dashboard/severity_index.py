@@ -0,0 +1,157 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import heapq
+import re
+
+# Severity values of rosgraph_msgs/Log, also used by rqt_console messages
+WARN = 4
+ERROR = 8
+FATAL = 16
+_SEVERITIES = (WARN, ERROR, FATAL)
+
+_NUMBERS = re.compile(r'\d+')
+
+
+def fingerprint(text, length=80):
+    """
+    Key grouping log messages which only differ in numbers,
+    e.g. ``Joint 3 error 0.25`` and ``Joint 4 error 0.31``.
+    """
+    return _NUMBERS.sub('#', text[:length])
+
+
+class SeverityIndex(object):
+    """
+    Counts of recent WARN, ERROR and FATAL messages per node and per
+    (node, message fingerprint) over a sliding time window.
+
+    Messages are added in batches and counted per time bucket. When the
+    window moves on, expired buckets are subtracted from the running totals,
+    so the totals are always current without rescanning any messages.
+
+    :param window: Length of the sliding window in seconds.
+    :type window: float
+    :param bucket: Length of a time bucket in seconds.
+    :type bucket: float
+    """
+    def __init__(self, window=30.0, bucket=1.0):
+        self._bucket = bucket
+        self._num_buckets = max(1, int(round(window / bucket)))
+        self._buckets = [None] * self._num_buckets
+        self._head = None
+        # name -> [warn, error, fatal]
+        self._nodes = {}
+        self._fingerprints = {}
+
+    def add_messages(self, now, messages):
+        """
+        Count a batch of messages received at ``now``.
+
+        :param now: Receive time of the batch in seconds.
+        :type now: float
+        :param messages: Messages with ``severity``, ``node`` and ``message`` attributes.
+        :type messages: list
+        """
+        bucket = None
+        for msg in messages:
+            if msg.severity < WARN:
+                continue
+            if bucket is None:
+                bucket = self._current_bucket(now)
+            column = _SEVERITIES.index(msg.severity) if msg.severity in _SEVERITIES else 2
+            key = (msg.node, fingerprint(msg.message))
+            self._count(self._nodes, msg.node, column, 1)
+            self._count(self._fingerprints, key, column, 1)
+            entry = (msg.node, key, column)
+            bucket[entry] = bucket.get(entry, 0) + 1
+
+    def expire(self, now):
+        """
+        Drop the counts which left the window at ``now``.
+        """
+        self._current_bucket(now)
+
+    def top_nodes(self, k=3):
+        """
+        :returns: up to ``k`` (node, [warn, error, fatal]) tuples, the worst first.
+        """
+        return self._top(self._nodes, k)
+
+    def top_fingerprints(self, k=3):
+        """
+        :returns: up to ``k`` ((node, fingerprint), [warn, error, fatal]) tuples, the worst first.
+        """
+        return self._top(self._fingerprints, k)
+
+    def clear(self):
+        self._buckets = [None] * self._num_buckets
+        self._head = None
+        self._nodes = {}
+        self._fingerprints = {}
+
+    def _top(self, totals, k):
+        return heapq.nlargest(k, totals.items(), key=lambda item: item[1][::-1])
+
+    def _current_bucket(self, now):
+        index = int(now // self._bucket)
+        if self._head is not None and index < self._head:
+            # Time jumped back, e.g. a restarted simulation
+            self.clear()
+        if self._head is None:
+            self._head = index
+        elif index > self._head:
+            for expired in range(self._head + 1, min(index, self._head + self._num_buckets) + 1):
+                self._drop(expired % self._num_buckets)
+            self._head = index
+        slot = index % self._num_buckets
+        if self._buckets[slot] is None:
+            self._buckets[slot] = {}
+        return self._buckets[slot]
+
+    def _drop(self, slot):
+        entries = self._buckets[slot]
+        self._buckets[slot] = None
+        if not entries:
+            return
+        for (node, key, column), count in entries.items():
+            self._count(self._nodes, node, column, -count)
+            self._count(self._fingerprints, key, column, -count)
+
+    def _count(self, totals, name, column, increment):
+        counts = totals.get(name)
+        if counts is None:
+            counts = totals[name] = [0, 0, 0]
+        counts[column] += increment
+        if not any(counts):
+            del totals[name]
@@ -0,0 +1,153 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import rospy
+from python_qt_binding.QtCore import QMutex, QMutexLocker
+
+from .profiling import startup_profiler
+
+
+class SharedSubscription(object):
+    """
+    Handle returned by :func:`SubscriptionHub.subscribe`.
+    It mimics the part of ``rospy.Subscriber`` used by the dashboard widgets,
+    so calling :func:`unregister` in ``shutdown_widget`` works unchanged.
+    """
+    def __init__(self, hub, key, callback):
+        self._hub = hub
+        self._key = key
+        self._callback = callback
+
+    @property
+    def name(self):
+        return self._key[0]
+
+    def unregister(self):
+        """
+        Remove this callback from the shared subscription.
+        The underlying ``rospy.Subscriber`` is unregistered once its last
+        callback is gone. Calling this more than once is harmless.
+        """
+        if self._hub is not None:
+            self._hub._release(self._key, self)
+            self._hub = None
+
+
+class SubscriptionHub(object):
+    """
+    Keeps one ``rospy.Subscriber`` per (topic, message type) and fans every
+    message out to all registered callbacks, so widgets watching the same
+    topic only pay for a single deserialization.
+    """
+    def __init__(self):
+        self._mutex = QMutex()
+        # key -> [rospy.Subscriber, tuple of SharedSubscription]
+        self._entries = {}
+
+    def subscribe(self, topic, data_class, callback):
+        """
+        Register ``callback`` for messages of ``data_class`` on ``topic``.
+
+        :param topic: Topic name, resolved the same way ``rospy.Subscriber`` does.
+        :type topic: str
+        :param data_class: The message class.
+        :type data_class: type
+        :param callback: Function called with each message, from a rospy thread.
+        :type callback: callable
+        :returns: a :class:`SharedSubscription` handle
+        """
+        key = (rospy.resolve_name(topic), data_class)
+        with QMutexLocker(self._mutex):
+            handle = SharedSubscription(self, key, callback)
+            entry = self._entries.get(key)
+            if entry is None:
+                with startup_profiler.phase('subscribe'):
+                    subscriber = rospy.Subscriber(key[0], data_class, self._dispatch, key)
+                self._entries[key] = [subscriber, (handle,)]
+            else:
+                # Replace the tuple instead of mutating it so _dispatch can
+                # iterate over a snapshot
+                entry[1] = entry[1] + (handle,)
+        return handle
+
+    def subscriber_count(self, topic, data_class):
+        """
+        Number of callbacks sharing the subscription on ``topic``.
+        """
+        key = (rospy.resolve_name(topic), data_class)
+        with QMutexLocker(self._mutex):
+            entry = self._entries.get(key)
+            return len(entry[1]) if entry else 0
+
+    def _release(self, key, handle):
+        subscriber = None
+        with QMutexLocker(self._mutex):
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] = tuple(h for h in entry[1] if h is not handle)
+            if not entry[1]:
+                subscriber = entry[0]
+                del self._entries[key]
+        if subscriber is not None:
+            subscriber.unregister()
+
+    def _dispatch(self, msg, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        for handle in entry[1]:
+            with QMutexLocker(self._mutex):
+                # Skip callbacks unregistered by an earlier one or another thread
+                current = self._entries.get(key)
+                if current is None or handle not in current[1]:
+                    continue
+            try:
+                handle._callback(msg)
+            except Exception as e:
+                # One failing widget must not starve the others
+                rospy.logerr("Dashboard callback on %s failed: %s" % (key[0], e))
+
+
+_hub = SubscriptionHub()
+
+
+def subscribe(topic, data_class, callback):
+    """
+    Subscribe through the package-wide :class:`SubscriptionHub`.
+    Dashboard widgets should use this instead of creating a ``rospy.Subscriber``
+    so duplicate consumers of a topic share one subscription.
+
+    :returns: a :class:`SharedSubscription` handle, call ``unregister()`` on it in ``shutdown_widget``
+    """
+    return _hub.subscribe(topic, data_class, callback)
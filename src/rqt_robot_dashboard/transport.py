@@ -0,0 +1,204 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+"""
+Clock, logging and subscriptions used by the dashboard widgets.
+
+Widgets talk to ROS only through the transport returned by
+:func:`get_transport`. By default this is a :class:`RospyTransport`; tests,
+benchmarks and embedding applications can install a :class:`FakeTransport`
+with :func:`set_transport` before creating widgets to run them without a
+ROS master, with a controlled clock and synchronous message delivery.
+"""
+
+
+class RospyTransport(object):
+    """
+    The default transport, backed by rospy. Subscriptions go through the
+    shared :mod:`rqt_robot_dashboard.subscription_hub`.
+    rospy is imported on first use only.
+    """
+    def get_time(self):
+        """
+        :returns: the current ROS time in seconds
+        """
+        import rospy
+        return rospy.get_time()
+
+    def loginfo(self, msg):
+        import rospy
+        rospy.loginfo(msg)
+
+    def logwarn(self, msg):
+        import rospy
+        rospy.logwarn(msg)
+
+    def logerr(self, msg):
+        import rospy
+        rospy.logerr(msg)
+
+    def subscribe(self, topic, data_class, callback):
+        """
+        Subscribe ``callback`` to ``topic``.
+
+        :returns: a handle with an ``unregister()`` method
+        """
+        from . import subscription_hub
+        return subscription_hub.subscribe(topic, data_class, callback)
+
+
+class _FakeSubscription(object):
+    def __init__(self, transport, topic, callback):
+        self._transport = transport
+        self.name = topic
+        self.callback = callback
+
+    def unregister(self):
+        if self._transport is not None:
+            self._transport._subscriptions[self.name].remove(self)
+            self._transport = None
+
+
+class FakeTransport(object):
+    """
+    An in-process transport for tests and benchmarks.
+
+    Messages passed to :func:`publish` are delivered synchronously to the
+    callbacks subscribed to that topic, log messages are collected in
+    :attr:`logs` and time only moves when told to, unless a clock is given.
+    With this manual clock, widgets which time out on the transport time
+    (e.g. a stale monitor) register with :func:`add_clock_listener`.
+
+    :param start_time: Initial time in seconds for the manual clock.
+    :type start_time: float
+    :param clock: Optional callable returning the time, e.g. ``time.time``.
+    :type clock: callable
+    """
+    def __init__(self, start_time=0.0, clock=None):
+        self._time = start_time
+        self._clock = clock
+        self._subscriptions = {}
+        self._clock_listeners = []
+        self.logs = []
+
+    @staticmethod
+    def _resolve(topic):
+        return '/' + topic.lstrip('/')
+
+    def get_time(self):
+        if self._clock is not None:
+            return self._clock()
+        return self._time
+
+    @property
+    def manual_clock(self):
+        """
+        ``True`` if time only moves with :func:`set_time` and :func:`advance`.
+        """
+        return self._clock is None
+
+    def set_time(self, seconds):
+        self._time = seconds
+        self._clock_changed()
+
+    def advance(self, seconds):
+        self._time += seconds
+        self._clock_changed()
+
+    def add_clock_listener(self, callback):
+        """
+        Call ``callback`` with the new time whenever the manual clock moves.
+        """
+        self._clock_listeners.append(callback)
+
+    def remove_clock_listener(self, callback):
+        if callback in self._clock_listeners:
+            self._clock_listeners.remove(callback)
+
+    def _clock_changed(self):
+        for callback in list(self._clock_listeners):
+            callback(self._time)
+
+    def loginfo(self, msg):
+        self.logs.append(('info', msg))
+
+    def logwarn(self, msg):
+        self.logs.append(('warn', msg))
+
+    def logerr(self, msg):
+        self.logs.append(('error', msg))
+
+    def subscribe(self, topic, data_class, callback):
+        subscription = _FakeSubscription(self, self._resolve(topic), callback)
+        self._subscriptions.setdefault(subscription.name, []).append(subscription)
+        return subscription
+
+    def subscriber_count(self, topic):
+        return len(self._subscriptions.get(self._resolve(topic), []))
+
+    def publish(self, topic, msg):
+        """
+        Deliver ``msg`` to every callback subscribed to ``topic``.
+
+        :returns: the number of callbacks called
+        """
+        subscriptions = list(self._subscriptions.get(self._resolve(topic), []))
+        for subscription in subscriptions:
+            subscription.callback(msg)
+        return len(subscriptions)
+
+
+_transport = None
+
+
+def get_transport():
+    """
+    :returns: the transport used by newly created widgets
+    """
+    global _transport
+    if _transport is None:
+        _transport = RospyTransport()
+    return _transport
+
+
+def set_transport(transport):
+    """
+    Install ``transport`` for widgets created from now on.
+    Passing ``None`` restores the default :class:`RospyTransport`.
+
+    :returns: the previously installed transport
+    """
+    global _transport
+    previous = get_transport()
+    _transport = transport
+    return previous
@@ -31,75 +31,183 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 import os
+import time
 
-import rospy
-
+from python_qt_binding.QtCore import QEvent, QPoint, QRect, QRectF, QSize, Qt
 from python_qt_binding.QtGui import QIcon, QImage, QPainter, QPixmap
-from python_qt_binding.QtWidgets import QMessageBox
+from python_qt_binding.QtWidgets import QToolTip
 from python_qt_binding.QtSvg import QSvgRenderer
 
+from .notifications import get_notification_manager
+from .profiling import startup_profiler
+from .transport import get_transport
+
+
+def resolve_icon_paths(icon_paths=None):
+    """
+    Turn ``['package name', 'subdirectory']`` pairs into absolute image directories.
+    The rqt_robot_dashboard image directory is always appended as the last fallback.
+
+    :param icon_paths: list of lists of package and subdirectory
+    :type icon_paths: list of lists of strings
+    :returns: list of str
+    """
+    import rospkg
+    icon_paths = (icon_paths if icon_paths else []) + [['rqt_robot_dashboard', 'images']]
+    paths = []
+    with startup_profiler.phase('rospkg lookup'):
+        rp = rospkg.RosPack()
+        for path in icon_paths:
+            paths.append(os.path.join(rp.get_path(path[0]), path[1]))
+    return paths
+
+
+def hidden_in_parent(widget):
+    """
+    Whether ``widget`` sits inside a hidden parent, e.g. a group paged out by
+    :class:`rqt_robot_dashboard.dashboard_pager.DashboardPager`.
+    Widgets use this to skip repaints until their next ``showEvent``.
+    A widget whose window has not been shown yet is not considered hidden.
+
+    :param widget: The widget to check.
+    :type widget: QWidget
+    """
+    return widget.parentWidget() is not None and not widget.isVisibleTo(widget.window())
+
+
+class LazyToolTipMixin(object):
+    """
+    Mixin for dashboard widgets whose tooltip is built from data that changes
+    often but is rarely read. Instead of calling ``setToolTip`` on every update,
+    a widget stores the raw data and overrides :func:`tooltip_text`, which is
+    only called when a tooltip is about to be shown (or ``toolTip()`` is read).
+
+    Widgets call :func:`tooltip_data_changed` when the data shown by
+    :func:`tooltip_text` changes. As with ``setToolTip`` calls in the past,
+    the last one wins: text set with ``setToolTip`` is shown until the
+    next data change.
+
+    While a widget shows a state restored from saved settings (see
+    :func:`rqt_robot_dashboard.dashboard.Dashboard.restore_widget_states`),
+    the saved tooltip is shown instead, marked as cached.
+
+    Must come before the Qt widget class in the list of base classes.
+    """
+    _cached_state = None
+    _tooltip_overridden = False
+
+    def tooltip_text(self):
+        """
+        Build the tooltip from the stored data.
+
+        :returns: the tooltip text, or ``None`` to use the text set with ``setToolTip``
+        """
+        return None
+
+    def tooltip_data_changed(self):
+        """
+        Show :func:`tooltip_text` again instead of text set with ``setToolTip``.
+        """
+        self._tooltip_overridden = False
+
+    def setToolTip(self, text):
+        self._tooltip_overridden = True
+        super(LazyToolTipMixin, self).setToolTip(text)
+
+    def _current_tooltip_text(self):
+        if self._cached_state is not None:
+            return cached_tooltip_text(self._cached_state)
+        if self._tooltip_overridden:
+            return None
+        return self.tooltip_text()
+
+    def toolTip(self):
+        text = self._current_tooltip_text()
+        if text is None:
+            return super(LazyToolTipMixin, self).toolTip()
+        return text
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            text = self._current_tooltip_text()
+            if text is not None:
+                if text:
+                    QToolTip.showText(event.globalPos(), text, self)
+                else:
+                    QToolTip.hideText()
+                    event.ignore()
+                return True
+        return super(LazyToolTipMixin, self).event(event)
+
+
+def cached_tooltip_text(snapshot):
+    """
+    Tooltip of a widget state restored from saved settings.
+
+    :param snapshot: The saved state, with ``tooltip`` and ``stamp`` (seconds since the epoch) keys.
+    :type snapshot: dict
+    """
+    stamp = snapshot.get('stamp')
+    if stamp:
+        seen = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(stamp))
+    else:
+        seen = 'unknown'
+    note = '(cached, last updated %s, waiting for data)' % seen
+    if snapshot.get('tooltip'):
+        return '%s\n%s' % (snapshot['tooltip'], note)
+    return note
+
 
 def dashinfo(msg, obj, title='Info'):
     """
-    Logs a message with ``rospy.loginfo`` and displays a ``QMessageBox`` to the user
+    Logs a message with the transport's ``loginfo`` (``rospy.loginfo`` by default) and shows it
+    in the dashboard notification panel. Repeated messages are coalesced and rate limited,
+    see :class:`rqt_robot_dashboard.notifications.NotificationManager`.
 
     :param msg: Message to display.
     :type msg: str
-    :param obj: Parent object for the ``QMessageBox``
+    :param obj: Object reporting the message, its ``_message_box`` is set to the notification panel
     :type obj: QObject
-    :param title: An optional title for the `QMessageBox``
+    :param title: An optional title for the message
     :type title: str
     """
-    rospy.loginfo(msg)
-
-    box = QMessageBox()
-    box.setText(msg)
-    box.setWindowTitle(title)
-    box.show()
-
-    obj._message_box = box
+    _notify('info', msg, obj, title)
 
 
 def dashwarn(msg, obj, title='Warning'):
     """
-    Logs a message with ``rospy.logwarn`` and displays a ``QMessageBox`` to the user
+    Logs a message with the transport's ``logwarn`` (``rospy.logwarn`` by default) and shows it
+    in the dashboard notification panel. Repeated messages are coalesced and rate limited,
+    see :class:`rqt_robot_dashboard.notifications.NotificationManager`.
 
     :param msg: Message to display.
     :type msg: str
-    :param obj: Parent object for the ``QMessageBox``
+    :param obj: Object reporting the message, its ``_message_box`` is set to the notification panel
     :type obj: QObject
-    :param title: An optional title for the `QMessageBox``
+    :param title: An optional title for the message
     :type title: str
     """
-    rospy.logwarn(msg)
-
-    box = QMessageBox()
-    box.setText(msg)
-    box.setWindowTitle(title)
-    box.show()
-
-    obj._message_box = box
+    _notify('warn', msg, obj, title)
 
 
 def dasherr(msg, obj, title='Error'):
     """
-    Logs a message with ``rospy.logerr`` and displays a ``QMessageBox`` to the user
+    Logs a message with the transport's ``logerr`` (``rospy.logerr`` by default) and shows it
+    in the dashboard notification panel. Repeated messages are coalesced and rate limited,
+    see :class:`rqt_robot_dashboard.notifications.NotificationManager`.
 
     :param msg: Message to display.
     :type msg: str
-    :param obj: Parent object for the ``QMessageBox``
+    :param obj: Object reporting the message, its ``_message_box`` is set to the notification panel
     :type obj: QObject
-    :param title: An optional title for the `QMessageBox``
+    :param title: An optional title for the message
     :type title: str
     """
-    rospy.logerr(msg)
+    _notify('error', msg, obj, title)
 
-    box = QMessageBox()
-    box.setText(msg)
-    box.setWindowTitle(title)
-    box.show()
 
-    obj._message_box = box
+def _notify(level, msg, obj, title):
+    get_notification_manager().notify(level, msg, title, obj)
 
 
 class IconHelper(object):
@@ -146,6 +254,7 @@ class IconHelper(object):
 
         if num_svg != len(image_list):
             # Legacy support for non-svg images
+            startup_profiler.count('icon renders')
             icon_pixmap = QPixmap()
             icon_pixmap.load(image_list[0])
             painter = QPainter(icon_pixmap)
@@ -156,22 +265,56 @@ class IconHelper(object):
             painter.end()
             return icon
         else:
+            #  Convert QImage into a pixmap to create the icon
+            icon_pixmap = QPixmap()
+            icon_pixmap.convertFromImage(self.make_image(image_list))
+            icon = QIcon(icon_pixmap)
+            return icon
+
+    def make_image(self, image_list, size=None):
+        """
+        Composite a list of image files into a single QImage.
+        Layers are drawn in list order, like in :func:`make_icon`.
+
+        :param image_list: list of image paths to layer into an image.
+        :type image_list: list of str
+        :param size: If given, the composite is scaled to fit this size,\
+        keeping its aspect ratio. Otherwise the size of the first image is used.
+        :type size: QSize
+        """
+        if type(image_list) is not list:
+            image_list = [image_list]
+        if len(image_list) <= 0:
+            raise TypeError('The list of images is empty.')
+        startup_profiler.count('icon renders')
+
+        if all(item[-4:].lower() == '.svg' for item in image_list):
             #  rendering SVG files into a QImage
             renderer = QSvgRenderer(image_list[0])
-            icon_image = QImage(renderer.defaultSize(), QImage.Format_ARGB32)
+            target = QRectF(0, 0, renderer.defaultSize().width(), renderer.defaultSize().height())
+            if size is not None:
+                scaled = renderer.defaultSize().scaled(size, Qt.KeepAspectRatio)
+                target = QRectF(0, 0, scaled.width(), scaled.height())
+            icon_image = QImage(int(target.width()), int(target.height()), QImage.Format_ARGB32)
             icon_image.fill(0)
             painter = QPainter(icon_image)
-            renderer.render(painter)
+            renderer.render(painter, target)
             if len(image_list) > 1:
                 for item in image_list[1:]:
                     renderer.load(item)
-                    renderer.render(painter)
+                    renderer.render(painter, target)
             painter.end()
-            #  Convert QImage into a pixmap to create the icon
-            icon_pixmap = QPixmap()
-            icon_pixmap.convertFromImage(icon_image)
-            icon = QIcon(icon_pixmap)
-            return icon
+            return icon_image
+
+        # Legacy support for non-svg images
+        icon_image = QImage(image_list[0]).convertToFormat(QImage.Format_ARGB32)
+        painter = QPainter(icon_image)
+        for item in image_list[1:]:
+            painter.drawImage(0, 0, QImage(item))
+        painter.end()
+        if size is not None:
+            icon_image = icon_image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return icon_image
 
     def find_image(self, path):
         """
@@ -221,13 +364,67 @@ class IconHelper(object):
         :param suppress_overlays: if false and there is only one icon path supplied
         :type suppress_overlays: bool
         """
+        icons, clicked_icons = self.expand_icon_lists(icons, clicked_icons, suppress_overlays)
+        with startup_profiler.phase('icon rendering'):
+            icons_conv = []
+            for icon in icons:
+                icons_conv.append(self.build_icon(icon))
+            clicked_icons_conv = []
+            for icon in clicked_icons:
+                clicked_icons_conv.append(self.build_icon(icon))
+        return (icons_conv, clicked_icons_conv)
+
+    def set_atlas_lists(self, atlas, icons, clicked_icons=None, suppress_overlays=False):
+        """
+        Like :func:`set_icon_lists`, but renders the icons into ``atlas``
+        instead of creating one QIcon per state.
+
+        :param atlas: The atlas to render into, see :func:`get_icon_atlas`.
+        :type atlas: IconAtlas
+        :returns: tuple of two lists of slot numbers in ``atlas``
+        """
+        icons, clicked_icons = self.expand_icon_lists(icons, clicked_icons, suppress_overlays)
+        with startup_profiler.phase('icon rendering'):
+            icon_slots = []
+            for icon in icons:
+                icon_slots.append(self.build_atlas_slot(atlas, icon))
+            clicked_icon_slots = []
+            for icon in clicked_icons:
+                clicked_icon_slots.append(self.build_atlas_slot(atlas, icon))
+        return (icon_slots, clicked_icon_slots)
+
+    def build_atlas_slot(self, atlas, image_name_list):
+        """
+        Convenience function to render a list of file names into ``atlas``.
+        Composites already present in the atlas are reused.
+
+        :param atlas: The atlas to render into.
+        :type atlas: IconAtlas
+        :param image_name_list: List of file image names to layer
+        :type image_name_list: list of str
+        :returns: the slot number in ``atlas``
+        """
+        found_list = [self.find_image(name) for name in image_name_list]
+        key = tuple(found_list)
+        slot = atlas.find(key)
+        if slot is None:
+            slot = atlas.add(self.make_image(found_list, atlas.cell_size()), key)
+        return slot
+
+    def expand_icon_lists(self, icons, clicked_icons=None, suppress_overlays=False):
+        """
+        Validate the icon lists and fill in the default overlay and clicked states.
+        Used by :func:`set_icon_lists` and :func:`set_atlas_lists`.
+
+        :returns: tuple of the icon and clicked icon lists of file names
+        """
         if clicked_icons is not None and len(icons) != len(clicked_icons):
-            rospy.logerr("%s: icons and clicked states are unequal" % self._name)
+            get_transport().logerr("%s: icons and clicked states are unequal" % self._name)
             icons = clicked_icons = [['ic-missing-icon.svg']]
         if not (type(icons) is list and type(icons[0]) is list and type(icons[0][0] is str)):
             raise(IndexError("icons must be a list of lists of strings"))
         if len(icons) <= 0:
-            rospy.logerr("%s: Icons not supplied" % self._name)
+            get_transport().logerr("%s: Icons not supplied" % self._name)
             icons = clicked_icons = ['ic-missing-icon.svg']
         if len(icons) == 1 and suppress_overlays == False:
             if icons[0][0][-4].lower() == '.svg':
@@ -242,10 +439,124 @@ class IconHelper(object):
             clicked_icons = []
             for name in icons:
                 clicked_icons.append(name + ['ol-click.svg'])
-        icons_conv = []
-        for icon in icons:
-            icons_conv.append(self.build_icon(icon))
-        clicked_icons_conv = []
-        for icon in clicked_icons:
-            clicked_icons_conv.append(self.build_icon(icon))
-        return (icons_conv, clicked_icons_conv)
+        return (icons, clicked_icons)
+
+
+class IconAtlas(object):
+    """
+    A single pixmap holding many composited icons of the same size.
+    Icons are packed into a grid of equally sized cells. Widgets draw
+    sub-rectangles of :func:`pixmap`, so there is one allocation and one
+    upload to the display server for all icons of that size.
+
+    Use :func:`get_icon_atlas` to get the shared atlas for a size.
+
+    :param cell_size: The size every icon is rendered at.
+    :type cell_size: QSize
+    :param columns: Number of cells per row.
+    :type columns: int
+    """
+    def __init__(self, cell_size, columns=16):
+        self._cell_size = QSize(cell_size)
+        self._columns = columns
+        self._image = QImage()
+        self._pixmap = None
+        self._count = 0
+        self._slots = {}
+
+    def cell_size(self):
+        return QSize(self._cell_size)
+
+    def count(self):
+        """
+        Number of icons in the atlas.
+        """
+        return self._count
+
+    def find(self, key):
+        """
+        :returns: the slot previously added with ``key``, or ``None``
+        """
+        return self._slots.get(key)
+
+    def add(self, image, key=None):
+        """
+        Add an image to the atlas. It is centered in its cell and must not be
+        larger than the cell size.
+
+        :param image: The image to add.
+        :type image: QImage
+        :param key: Optional key to look the slot up with :func:`find`.
+        :returns: The slot number of the image.
+        """
+        slot = self._count
+        rows = slot // self._columns + 1
+        if self._image.isNull() or self._image.height() < rows * self._cell_size.height():
+            self._grow(max(rows, 2 * self._image.height() // max(self._cell_size.height(), 1)))
+        cell = self.rect(slot)
+        offset = QPoint((cell.width() - image.width()) // 2, (cell.height() - image.height()) // 2)
+        painter = QPainter(self._image)
+        painter.drawImage(cell.topLeft() + offset, image)
+        painter.end()
+        self._pixmap = None
+        self._count += 1
+        if key is not None:
+            self._slots[key] = slot
+        return slot
+
+    def rect(self, slot):
+        """
+        :returns: the QRect of ``slot`` inside :func:`pixmap`
+        """
+        return QRect((slot % self._columns) * self._cell_size.width(),
+                     (slot // self._columns) * self._cell_size.height(),
+                     self._cell_size.width(), self._cell_size.height())
+
+    def pixmap(self):
+        """
+        The atlas pixmap. It is converted from the backing image once and
+        again only after new icons were added.
+        """
+        if self._pixmap is None:
+            self._pixmap = QPixmap.fromImage(self._image)
+        return self._pixmap
+
+    def draw(self, painter, target, slot):
+        """
+        Draw the icon in ``slot`` into ``target``.
+
+        :param painter: An active painter.
+        :type painter: QPainter
+        :param target: The destination rectangle, normally of the cell size.
+        :type target: QRect
+        :param slot: The slot to draw.
+        :type slot: int
+        """
+        painter.drawPixmap(target, self.pixmap(), self.rect(slot))
+
+    def _grow(self, rows):
+        image = QImage(self._columns * self._cell_size.width(), rows * self._cell_size.height(),
+                       QImage.Format_ARGB32_Premultiplied)
+        image.fill(0)
+        if not self._image.isNull():
+            painter = QPainter(image)
+            painter.drawImage(0, 0, self._image)
+            painter.end()
+        self._image = image
+
+
+_icon_atlases = {}
+
+
+def get_icon_atlas(size):
+    """
+    The atlas shared by all widgets drawing icons of ``size``.
+
+    :param size: The icon size.
+    :type size: QSize
+    :returns: IconAtlas
+    """
+    key = (size.width(), size.height())
+    if key not in _icon_atlases:
+        _icon_atlases[key] = IconAtlas(size)
+    return _icon_atlases[key]
@@ -0,0 +1,167 @@
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2012, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+#  * Redistributions of source code must retain the above copyright
+#    notice, this list of conditions and the following disclaimer.
+#  * Redistributions in binary form must reproduce the above
+#    copyright notice, this list of conditions and the following
+#    disclaimer in the documentation and/or other materials provided
+#    with the distribution.
+#  * Neither the name of Willow Garage, Inc. nor the names of its
+#    contributors may be used to endorse or promote products derived
+#    from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import functools
+import inspect
+import os
+import time
+
+from python_qt_binding.QtCore import QObject, QTimer
+
+from .metrics import registry
+from .transport import get_transport
+
+#: Stall threshold in milliseconds, setting it enables the watchdog.
+WATCHDOG_ENV_VAR = 'RQT_DASHBOARD_WATCHDOG'
+
+
+class EventLoopWatchdog(QObject):
+    """
+    Measures the latency of the Qt event loop with a high frequency heartbeat
+    timer and reports stalls above a threshold.
+
+    Dashboard timers and signal handlers wrapped with :func:`watch` record
+    how long they ran, so a stall is attributed to the slowest wrapped slot
+    that ran since the previous heartbeat.
+
+    Enabled by setting ``RQT_DASHBOARD_WATCHDOG`` to the stall threshold in
+    milliseconds. While disabled :func:`watch` returns slots unchanged.
+
+    :param threshold: Stall threshold in milliseconds.
+    :type threshold: float
+    :param interval: Heartbeat interval in milliseconds.
+    :type interval: int
+    """
+    def __init__(self, threshold=None, interval=20):
+        super(EventLoopWatchdog, self).__init__()
+        value = os.environ.get(WATCHDOG_ENV_VAR, '')
+        if threshold is None and value:
+            try:
+                threshold = float(value)
+            except ValueError:
+                threshold = 200.0
+        self.enabled = threshold is not None
+        self.threshold = threshold if threshold is not None else 200.0
+        self._interval = interval
+        self._timer = None
+        self._last_beat = None
+        self._culprit = None
+        self._culprit_ms = 0.0
+        self._users = 0
+        self.stalls = []
+        self._metric_latency = registry.histogram('event loop/latency ms')
+        self._metric_stalls = registry.counter('event loop/stalls')
+
+    def start(self):
+        """
+        Start the heartbeat. Calls are counted, the heartbeat runs until
+        :func:`stop` was called as often as :func:`start`.
+        """
+        if not self.enabled:
+            return
+        self._users += 1
+        if self._timer is None:
+            self._timer = QTimer()
+            self._timer.timeout.connect(self._beat)
+            self._last_beat = time.time()
+            self._timer.start(self._interval)
+
+    def stop(self):
+        if self._timer is None:
+            return
+        self._users -= 1
+        if self._users <= 0:
+            self._users = 0
+            self._timer.stop()
+            self._timer = None
+
+    def watch(self, slot, label=None):
+        """
+        Wrap ``slot`` so stalls it causes are attributed to ``label``.
+
+        :param slot: The callable connected to a timer or signal.
+        :type slot: callable
+        :param label: Name reported for this slot, e.g. ``'Console Widget._insert_messages'``.
+        :type label: str
+        :returns: the wrapped callable, or ``slot`` itself while disabled
+        """
+        if not self.enabled:
+            return slot
+        if label is None:
+            label = getattr(slot, '__qualname__', getattr(slot, '__name__', repr(slot)))
+        # Qt passes every signal argument to a generic wrapper (e.g. the
+        # checked flag of clicked), so drop the ones the slot does not take
+        max_args = _positional_args(slot)
+
+        @functools.wraps(slot)
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                return slot(*args[:max_args], **kwargs)
+            finally:
+                elapsed = (time.time() - start) * 1000.0
+                if elapsed > self._culprit_ms:
+                    self._culprit_ms = elapsed
+                    self._culprit = label
+        return wrapper
+
+    def _beat(self):
+        now = time.time()
+        latency = (now - self._last_beat) * 1000.0 - self._interval
+        self._last_beat = now
+        self._metric_latency.observe(max(latency, 0.0))
+        if latency > self.threshold:
+            self._metric_stalls.inc()
+            if self._culprit is not None:
+                culprit = '%s (ran %.0f ms)' % (self._culprit, self._culprit_ms)
+            else:
+                culprit = 'an unwatched slot'
+            self.stalls.append((now, latency, self._culprit))
+            del self.stalls[:-100]
+            get_transport().logwarn('Dashboard GUI thread stalled for %.0f ms, longest slot: %s' % (latency, culprit))
+        self._culprit = None
+        self._culprit_ms = 0.0
+
+
+def _positional_args(slot):
+    try:
+        parameters = inspect.signature(slot).parameters.values()
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+        return None
+    return len([p for p in parameters if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)])
+
+
+#: The watchdog shared by all dashboards and widgets of this process.
+watchdog = EventLoopWatchdog()
@@ -52,11 +52,50 @@ To use them you must provide instances of them to your dashboard in its :func:`g
             return [[self.monitor, self.console],[self.battery]]
 
 Would create a simple dashboard with the ability to open a rqt_robot_monitor and a ROS console and monitor the battery.
+
+Dashboards with hundreds of indicators can use :class:`IndicatorItem` objects inside an
+:class:`IndicatorStrip` instead of one :class:`IconToolButton` per indicator. Items have the
+same ``update_state``/``state`` API but are all painted by the strip. Existing widgets are
+placed in a strip by wrapping them in a :class:`WidgetIndicator`::
+
+    strip = IndicatorStrip([WidgetIndicator(self.monitor), WidgetIndicator(self.battery)])
 """
 
-from .icon_tool_button import IconToolButton
-from .battery_dash_widget import BatteryDashWidget
-from .console_dash_widget import ConsoleDashWidget
-from .menu_dash_widget import MenuDashWidget
-from .monitor_dash_widget import MonitorDashWidget
-from .nav_view_dash_widget import NavViewDashWidget
+import importlib
+import sys
+
+# Widget classes are imported on first access, so a dashboard using only a
+# battery and a menu does not pull in rqt_console, rqt_robot_monitor and
+# rqt_nav_view.
+_widget_modules = {
+    'IconToolButton': 'icon_tool_button',
+    'IndicatorItem': 'indicator_strip',
+    'IndicatorStrip': 'indicator_strip',
+    'WidgetIndicator': 'indicator_strip',
+    'BatteryDashWidget': 'battery_dash_widget',
+    'ConsoleDashWidget': 'console_dash_widget',
+    'MenuDashWidget': 'menu_dash_widget',
+    'MonitorDashWidget': 'monitor_dash_widget',
+    'NavViewDashWidget': 'nav_view_dash_widget',
+}
+
+__all__ = sorted(_widget_modules)
+
+
+def __getattr__(name):
+    if name not in _widget_modules:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    module = importlib.import_module('.' + _widget_modules[name], __package__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ (PEP 562) is not available, import eagerly
+    for _name in __all__:
+        __getattr__(_name)
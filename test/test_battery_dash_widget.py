@@ -69,6 +69,12 @@ class TestBatteryDashWidget(unittest.TestCase):
         tool_tip = self._widget.toolTip()
         self.assertEqual(comp, tool_tip)
 
+    def test_set_tool_tip_wins_until_next_update(self):
+        self._widget.setToolTip('Custom battery tooltip')
+        self.assertEqual('Custom battery tooltip', self._widget.toolTip())
+        self._widget.update_time('0.5')
+        self.assertEqual("%s: %.2f%% remaining" % (self._WIDGET_NAME, 0.5), self._widget.toolTip())
+
 
 if __name__ == '__main__':
     argv = ['']
@@ -0,0 +1,299 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+import unittest
+
+from python_qt_binding.QtWidgets import QApplication, QLabel
+
+from rqt_robot_dashboard.battery_dash_widget import BatteryDashWidget
+from rqt_robot_dashboard.dashboard import Dashboard
+from rqt_robot_dashboard.icon_tool_button import IconToolButton
+from rqt_robot_dashboard.indicator_strip import IndicatorStrip, WidgetIndicator
+from rqt_robot_dashboard.metrics import registry
+from rqt_robot_dashboard.plugin_context import FakePluginContext
+
+
+class _Label(QLabel):
+
+    def __init__(self, name):
+        super(_Label, self).__init__(name)
+        self.setObjectName(name)
+        self.metrics_scope = registry.scope(name)
+        self.shut_down = False
+
+    def shutdown_widget(self):
+        self.shut_down = True
+
+
+class _TestDashboard(Dashboard):
+
+    def setup(self, context):
+        self.name = 'Test dashboard'
+        self.a, self.b, self.c = _Label('a'), _Label('b'), _Label('c')
+
+    def get_widgets(self):
+        return [[self.a, self.b], ['Label', [self.c]]]
+
+
+class _Battery(BatteryDashWidget):
+
+    def __init__(self):
+        super(_Battery, self).__init__('Battery')
+        self.shut_down = False
+
+    def shutdown_widget(self):
+        self.shut_down = True
+
+
+class _StripDashboard(Dashboard):
+
+    def setup(self, context):
+        self.name = 'Strip dashboard'
+        self.battery = _Battery()
+
+    def get_widgets(self):
+        return [[IndicatorStrip([WidgetIndicator(self.battery)])]]
+
+
+class _Unserializable(QLabel):
+
+    def __init__(self):
+        super(_Unserializable, self).__init__('Unserializable')
+        self.setObjectName('Unserializable')
+
+    def snapshot_state(self):
+        return {'state': object()}
+
+
+class _StateDashboard(Dashboard):
+
+    def setup(self, context):
+        self.name = 'State dashboard'
+        self.button = IconToolButton('Button', [['bg-green.svg'], ['bg-red.svg']])
+        self.broken = _Unserializable()
+        self.battery = _Battery()
+
+    def get_widgets(self):
+        return [[self.button, self.broken, self.battery]]
+
+
+class _Settings(object):
+
+    def __init__(self):
+        self._values = {}
+
+    def set_value(self, key, value):
+        self._values[key] = value
+
+    def value(self, key, default=None):
+        return self._values.get(key, default)
+
+
+class TestDashboard(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.dashboard = _TestDashboard(FakePluginContext())
+        self.dashboard._main_widget.show()
+
+    def tearDown(self):
+        self.dashboard.shutdown_plugin()
+
+    def _names(self, group_index):
+        box = self.dashboard._groups[group_index]['box']
+        return [widget.objectName() for widget in self.dashboard._group_widgets(box)]
+
+    def test_add_group(self):
+        d = _Label('d')
+        self.assertEqual(1, self.dashboard.add_group([d], 1))
+        self.assertEqual(3, self.dashboard.group_count())
+        self.assertEqual(['d'], self._names(1))
+        self.assertEqual(['c'], self._names(2))
+        self.assertIn(d, self.dashboard._widgets)
+
+    def test_remove_group(self):
+        self.dashboard.remove_group(0)
+        self.assertEqual(1, self.dashboard.group_count())
+        self.assertEqual(['c'], self._names(0))
+        self.assertTrue(self.dashboard.a.shut_down)
+        self.assertTrue(self.dashboard.b.shut_down)
+        self.assertEqual([self.dashboard.c], self.dashboard._widgets)
+
+    def test_add_widget(self):
+        d = _Label('d')
+        self.dashboard.add_widget(d, 0, 1)
+        self.assertEqual(['a', 'd', 'b'], self._names(0))
+        self.assertIn(d, self.dashboard._widgets)
+
+    def test_remove_widget(self):
+        self.dashboard.remove_widget(self.dashboard.b)
+        self.assertEqual(['a'], self._names(0))
+        self.assertTrue(self.dashboard.b.shut_down)
+        self.assertNotIn(self.dashboard.b, self.dashboard._widgets)
+
+    def test_removed_widget_metrics_are_released(self):
+        enabled = registry.enabled
+        registry.enabled = True
+        try:
+            registry.counter('%s/messages' % self.dashboard.b.metrics_scope).inc()
+            self.dashboard.remove_widget(self.dashboard.b)
+            self.assertNotIn('b/messages', registry.snapshot())
+        finally:
+            registry.enabled = enabled
+
+    def test_remove_unknown_widget_changes_nothing(self):
+        stranger = _Label('stranger')
+        self.dashboard.add_group([stranger])
+        self.dashboard._widgets.remove(stranger)
+        with self.assertRaises(ValueError):
+            self.dashboard.remove_widget(stranger)
+        self.assertEqual(['stranger'], self._names(2))
+        self.assertFalse(stranger.shut_down)
+
+    def test_move_widget(self):
+        self.dashboard.move_widget(self.dashboard.a, 1, 0)
+        self.assertEqual(['b'], self._names(0))
+        self.assertEqual(['a', 'c'], self._names(1))
+        self.assertTrue(self.dashboard.a.isVisible())
+        self.assertFalse(self.dashboard.a.shut_down)
+        self.assertIn(self.dashboard.a, self.dashboard._widgets)
+
+
+class TestStripDashboard(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication(sys.argv)
+
+    def test_wrapped_widgets_are_shut_down(self):
+        dashboard = _StripDashboard(FakePluginContext())
+        dashboard.shutdown_plugin()
+        self.assertTrue(dashboard.battery.shut_down)
+
+    def test_wrapped_widget_states_are_saved(self):
+        dashboard = _StripDashboard(FakePluginContext())
+        dashboard.battery.unset_stale()
+        dashboard.battery.update_perc(60)
+        dashboard.battery.update_time(60)
+        settings = _Settings()
+        dashboard.save_widget_states(settings)
+        dashboard.shutdown_plugin()
+
+        restored = _StripDashboard(FakePluginContext())
+        restored.restore_widget_states(settings)
+        self.assertEqual(3, restored.battery.state)
+        self.assertIsNotNone(restored.battery._cached_state)
+        restored.shutdown_plugin()
+
+
+
+class TestWidgetStates(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication(sys.argv)
+
+    def _saved_settings(self):
+        dashboard = _StateDashboard(FakePluginContext())
+        dashboard.button.update_state(1)
+        dashboard.button.setToolTip('Button: error')
+        dashboard.battery.unset_stale()
+        dashboard.battery.update_perc(60)
+        dashboard.battery.update_time(60)
+        settings = _Settings()
+        dashboard.save_widget_states(settings)
+        dashboard.shutdown_plugin()
+        return settings
+
+    def test_round_trip_skips_unserializable_snapshots(self):
+        restored = _StateDashboard(FakePluginContext())
+        restored.restore_widget_states(self._saved_settings())
+        self.assertEqual(1, restored.button.state)
+        self.assertEqual('Button: error', restored.button.snapshot_state()['tooltip'])
+        self.assertEqual(3, restored.battery.state)
+        self.assertEqual(60, restored.battery.snapshot_state()['time'])
+        restored.shutdown_plugin()
+
+    def test_warm_start_disabled(self):
+        restored = _StateDashboard(FakePluginContext())
+        restored.warm_start = False
+        restored.restore_widget_states(self._saved_settings())
+        self.assertEqual(0, restored.button.state)
+        self.assertIsNone(restored.button.snapshot_state())
+        restored.shutdown_plugin()
+
+    def test_button_cached_until_update(self):
+        button = IconToolButton('Button', [['bg-green.svg'], ['bg-red.svg']])
+        button.restore_cached_state({'state': 1, 'tooltip': 'cached', 'stamp': 1.0})
+        self.assertEqual(1, button.state)
+        self.assertEqual('cached', button.snapshot_state()['tooltip'])
+        button.update_state(0)
+        self.assertIsNone(button._cached_state)
+        self.assertEqual(0, button.snapshot_state()['state'])
+
+    def test_button_ignores_invalid_state(self):
+        button = IconToolButton('Button', [['bg-green.svg'], ['bg-red.svg']])
+        button.restore_cached_state({'state': 2})
+        button.restore_cached_state({'state': 'error'})
+        self.assertEqual(0, button.state)
+        self.assertIsNone(button._cached_state)
+
+    def test_battery_cached_until_update(self):
+        battery = BatteryDashWidget('Battery')
+        battery.restore_cached_state({'state': 2, 'time': 45, 'charging': True})
+        self.assertEqual(2, battery.state)
+        self.assertTrue(battery._charging)
+        battery.unset_stale()
+        battery.update_time(50)
+        self.assertIsNone(battery._cached_state)
+        self.assertEqual(50, battery.snapshot_state()['time'])
+
+    def test_battery_ignores_cache_after_live_update(self):
+        battery = BatteryDashWidget('Battery')
+        battery.update_time(50)
+        battery.restore_cached_state({'state': 2, 'time': 45})
+        self.assertIsNone(battery._cached_state)
+        # The stale icon cannot be restored
+        fresh = BatteryDashWidget('Battery')
+        fresh.restore_cached_state({'state': len(fresh._icons) - 1})
+        self.assertIsNone(fresh._cached_state)
+
+
+if __name__ == '__main__':
+    unittest.main()
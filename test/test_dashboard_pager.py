@@ -0,0 +1,111 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+import unittest
+
+from python_qt_binding.QtCore import QSize
+from python_qt_binding.QtWidgets import QApplication, QWidget
+
+from rqt_robot_dashboard.dashboard_pager import DashboardPager
+
+
+class _Group(QWidget):
+
+    def sizeHint(self):
+        return QSize(100, 20)
+
+
+class TestDashboardPager(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.pager = DashboardPager()
+        self.groups = [_Group() for _ in range(5)]
+        for group in self.groups:
+            self.pager.add_group(group)
+        self._resize(250)
+
+    def _resize(self, groups_width):
+        arrows = self.pager.width() - self.pager._available_width()
+        self.pager.resize(arrows + groups_width, 30)
+        # Hidden widgets get the resize event when shown
+        self.pager._relayout()
+
+    def _visible(self):
+        return [i for i, group in enumerate(self.groups) if group.isVisibleTo(self.pager)]
+
+    def test_only_fitting_groups_are_shown(self):
+        self.assertEqual([0, 1], self._visible())
+        self.assertFalse(self.pager._prev_button.isEnabled())
+        self.assertTrue(self.pager._next_button.isEnabled())
+        self._resize(300)
+        self.assertEqual([0, 1, 2], self._visible())
+
+    def test_paging(self):
+        self.pager.next_page()
+        self.assertEqual([2, 3], self._visible())
+        self.pager.next_page()
+        self.assertEqual([4], self._visible())
+        self.assertFalse(self.pager._next_button.isEnabled())
+        self.pager.next_page()
+        self.assertEqual([4], self._visible())
+        self.pager.previous_page()
+        self.assertEqual([2, 3], self._visible())
+        self.pager.previous_page()
+        self.assertEqual([0, 1], self._visible())
+        self.assertFalse(self.pager._prev_button.isEnabled())
+
+    def test_first_group_shown_when_too_wide(self):
+        self._resize(50)
+        self.assertEqual([0], self._visible())
+        self.pager.next_page()
+        self.assertEqual([1], self._visible())
+
+    def test_remove_group(self):
+        self.pager.next_page()
+        self.pager.next_page()
+        self.pager.remove_group(self.groups[4])
+        self.assertIsNone(self.groups[4].parent())
+        del self.groups[4]
+        self.assertEqual([3], self._visible())
+        self.assertEqual(400, self.pager.sizeHint().width() - (self.pager.width() - self.pager._available_width()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+from collections import namedtuple
+
+from rqt_robot_dashboard.diagnostics_index import DiagnosticsIndex
+
+Status = namedtuple('Status', ['name', 'level', 'message'])
+
+
+class TestDiagnosticsIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = DiagnosticsIndex()
+        self.index.update([Status('/Robot', 2, 'Error'),
+                           Status('/Robot/Motors', 2, 'Error'),
+                           Status('/Robot/Motors/Left', 2, 'Overheated'),
+                           Status('/Robot/Motors/Right', 0, 'OK'),
+                           Status('/Robot/Laser', 1, 'Low rate')], 1.0)
+
+    def test_only_changed_entries_are_touched(self):
+        changed = self.index.update([Status('/Robot', 2, 'Error'),
+                                     Status('/Robot/Motors', 2, 'Error'),
+                                     Status('/Robot/Motors/Left', 2, 'Overheated'),
+                                     Status('/Robot/Motors/Right', 1, 'Warm'),
+                                     Status('/Robot/Laser', 1, 'Low rate')], 2.0)
+        self.assertEqual(1, changed)
+        self.assertEqual((1, 'Warm', 2.0), self.index.get('/Robot/Motors/Right'))
+        self.assertEqual((2, 'Overheated', 1.0), self.index.get('/Robot/Motors/Left'))
+
+    def test_worst_lists_leaves_by_level(self):
+        self.assertEqual([('/Robot/Motors/Left', 2, 'Overheated'),
+                          ('/Robot/Laser', 1, 'Low rate')], self.index.worst())
+        self.assertEqual(3, len(self.index.worst(3, leaves_only=False)))
+
+    def test_missing_entries_are_removed(self):
+        self.index.update([Status('/Robot', 0, 'OK'),
+                           Status('/Robot/Motors', 0, 'OK')], 3.0)
+        self.assertEqual(2, len(self.index))
+        self.assertIsNone(self.index.get('/Robot/Laser'))
+        # /Robot/Motors has no children left, so it is reported itself
+        self.index.update([Status('/Robot', 2, 'Error'),
+                           Status('/Robot/Motors', 2, 'Error')], 4.0)
+        self.assertEqual([('/Robot/Motors', 2, 'Error')], self.index.worst())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+import unittest
+
+from python_qt_binding.QtWidgets import QApplication
+
+from rqt_robot_dashboard.battery_dash_widget import BatteryDashWidget
+from rqt_robot_dashboard.indicator_strip import IndicatorStrip, WidgetIndicator
+
+
+class TestWidgetIndicator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.battery = BatteryDashWidget('Battery')
+        self.item = WidgetIndicator(self.battery)
+        self.strip = IndicatorStrip([self.item])
+
+    def test_follows_widget_state(self):
+        # Stale until the first update
+        self.assertEqual(len(self.item._icons) // 2 - 1, self.item._IndicatorItem__state)
+        self.battery.unset_stale()
+        self.battery.update_perc(40)
+        self.assertEqual(2, self.item.state)
+        self.assertEqual(2, self.item._IndicatorItem__state)
+        self.battery.set_charging(True)
+        self.battery.update_perc(60)
+        self.assertEqual(len(self.item._icons) // 2 + 3, self.item._IndicatorItem__state)
+
+    def test_update_state_goes_to_widget(self):
+        self.battery.unset_stale()
+        self.item.update_state(4)
+        self.assertEqual(4, self.battery.state)
+        self.assertEqual(4, self.item._IndicatorItem__state)
+
+    def test_tooltip_read_from_widget(self):
+        self.battery.update_time('0.5')
+        self.assertEqual(self.battery.toolTip(), self.item.toolTip())
+        self.item.setToolTip('Custom')
+        self.assertEqual('Custom', self.battery.toolTip())
+
+
+if __name__ == '__main__':
+    unittest.main()
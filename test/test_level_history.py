@@ -0,0 +1,74 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+
+from rqt_robot_dashboard.level_history import SPARK_CHARS, LevelHistory
+
+
+class TestLevelHistory(unittest.TestCase):
+
+    def test_repeated_levels_are_one_run(self):
+        history = LevelHistory()
+        for stamp in range(100):
+            history.add(stamp, 0)
+        history.add(100, 2)
+        self.assertEqual([(0.0, 0, 100), (100.0, 2, 1)], history.runs())
+        self.assertEqual(101, history.samples)
+        self.assertEqual(1, history.changes(0))
+
+    def test_oldest_runs_are_dropped(self):
+        history = LevelHistory(capacity=3)
+        for stamp in range(10):
+            history.add(stamp, stamp % 2)
+        self.assertEqual(3, len(history))
+        self.assertEqual([7.0, 8.0, 9.0], [run[0] for run in history.runs()])
+        self.assertEqual(3, history.changes(0))
+        self.assertEqual(2, history.changes(8))
+
+    def test_sparkline_shows_worst_level_per_slot(self):
+        history = LevelHistory()
+        history.add(0, 0)
+        history.add(4.5, 2)
+        history.add(5, 0)
+        history.add(9, 3)
+        ok, _, error, stale = SPARK_CHARS
+        self.assertEqual(ok * 4 + error + ok * 4 + stale, history.sparkline(0, 10, 10))
+        # No data before the first sample
+        self.assertEqual(u' ' * 9 + ok, history.sparkline(-10, 0, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from rqt_robot_dashboard.log_spool import LogSpool
+
+
+def make_records(count, start=0):
+    return [(secs, 500, 8 if secs % 10 == 0 else 2, '/node', 'file.py:func:1',
+             ['/rosout', '/topic'], u'Message %d \u00e9' % secs)
+            for secs in range(start, start + count)]
+
+
+class TestLogSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'rosout.spool')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_by_time_severity_and_limit(self):
+        spool = LogSpool(self.path, block_size=8)
+        spool.append(make_records(50))
+        self.assertEqual(50, len(spool))
+        records = spool.read(start=20, end=22.0)
+        self.assertEqual([20, 21], [r[0] for r in records])
+        self.assertEqual((20, 500, 8, '/node', 'file.py:func:1', ['/rosout', '/topic'], u'Message 20 \u00e9'),
+                         records[0])
+        self.assertEqual([0, 10, 20, 30, 40], [r[0] for r in spool.read(min_severity=8)])
+        self.assertEqual([48, 49], [r[0] for r in spool.read(limit=2)])
+        spool.close()
+
+    def test_limit_reads_newest_blocks_only(self):
+        spool = LogSpool(self.path, block_size=8)
+        spool.append(make_records(50))
+        read_blocks = []
+        read_block = spool._read_block
+
+        def counting_read_block(view, block, *args):
+            read_blocks.append(block)
+            return read_block(view, block, *args)
+        spool._read_block = counting_read_block
+        self.assertEqual(list(range(38, 50)), [r[0] for r in spool.read(limit=12)])
+        self.assertEqual([6, 5, 4], read_blocks)
+        self.assertEqual([30, 40], [r[0] for r in spool.read(min_severity=8, limit=2)])
+        spool.close()
+
+    def test_reopen_appends_after_complete_records(self):
+        spool = LogSpool(self.path, block_size=8)
+        spool.append(make_records(20))
+        spool.close()
+        with open(self.path, 'ab') as spool_file:
+            spool_file.write(b'\x00\x01\x02')
+        spool = LogSpool(self.path, block_size=8)
+        self.assertEqual(20, len(spool))
+        spool.append(make_records(5, start=20))
+        self.assertEqual(list(range(25)), [r[0] for r in spool.read()])
+        spool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
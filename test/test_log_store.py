@@ -0,0 +1,82 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+
+from rqt_robot_dashboard.log_store import ColumnarLogStore, LogRecord, LogSummary, summarize
+
+SEVERITIES = (1, 2, 4, 8, 16)
+
+
+def make_records(count, start=0):
+    return [LogRecord(secs, 250, SEVERITIES[secs % 5], '/node%d' % (secs % 2), 'file.py:func:%d' % (secs % 3),
+                      ['/rosout'] if secs % 2 else [], u'Message %d \u00e9' % secs)
+            for secs in range(start, start + count)]
+
+
+class TestColumnarLogStore(unittest.TestCase):
+
+    def test_rows_round_trip(self):
+        store = ColumnarLogStore()
+        records = make_records(20)
+        store.append(records)
+        self.assertEqual(20, len(store))
+        self.assertEqual(records, store.records())
+        self.assertEqual(records[15:], store.records(15))
+
+    def test_limit_drops_oldest_rows(self):
+        store = ColumnarLogStore(limit=10)
+        store.append(make_records(16))
+        self.assertEqual(10, len(store))
+        self.assertEqual((6, 16), (store.first_seq, store.next_seq))
+        self.assertEqual(make_records(1, start=6)[0], store.record(6))
+        self.assertRaises(IndexError, store.record, 5)
+        store.append(make_records(2, start=16))
+        self.assertEqual(make_records(1, start=17)[0], store.record(17))
+
+    def test_severity_and_time_window_queries(self):
+        store = ColumnarLogStore()
+        store.append(make_records(20))
+        self.assertEqual(LogSummary(4, 4, 4, 4, 4), store.summary())
+        self.assertEqual(LogSummary(1, 1, 1, 1, 1), store.summary(15.0))
+        self.assertEqual(LogSummary(0, 1, 1, 1, 1), store.summary(16.000000250))
+        self.assertEqual([13, 14, 18, 19], store.sequence_numbers(min_severity=8, start=12, end=19.5))
+
+    def test_summarize_severities(self):
+        self.assertEqual(LogSummary(0, 2, 1, 0, 1), summarize([2, 4, 2, 16, 3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+import time
+import unittest
+
+from python_qt_binding.QtWidgets import QApplication
+
+from rqt_robot_dashboard.menu_dash_widget import MenuDashWidget
+from rqt_robot_dashboard.transport import FakeTransport, set_transport
+
+
+def process_events_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        QApplication.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+
+class TestMenuDashWidgetAsyncActions(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication([''])
+
+    def setUp(self):
+        self._previous_transport = set_transport(FakeTransport())
+        self.widget = MenuDashWidget('Menu')
+        self.results = []
+
+    def tearDown(self):
+        set_transport(self._previous_transport)
+        del self.widget
+
+    def test_action_is_disabled_while_running(self):
+        release = threading.Event()
+        action = self.widget.add_async_action('Slow', release.wait,
+                                              on_done=lambda *result: self.results.append(result))
+        action.trigger()
+        self.assertFalse(action.isEnabled())
+        release.set()
+        self.assertTrue(process_events_until(lambda: self.results))
+        self.assertEqual([(True, '')], self.results)
+        self.assertTrue(action.isEnabled())
+        self.assertEqual(1, self.widget.action_stats()['Slow']['calls'])
+
+    def test_failure_is_reported(self):
+        def fail():
+            raise RuntimeError('service unavailable')
+        self.widget.add_async_action('Fail', fail, on_done=lambda *result: self.results.append(result)).trigger()
+        self.assertTrue(process_events_until(lambda: self.results))
+        self.assertEqual([(False, 'service unavailable')], self.results)
+        self.assertEqual(1, self.widget.action_stats()['Fail']['failures'])
+
+    def test_timed_out_action_stays_disabled_until_it_returns(self):
+        release = threading.Event()
+        action = self.widget.add_async_action('Hung', release.wait, timeout=0.05,
+                                              on_done=lambda *result: self.results.append(result))
+        action.trigger()
+        self.assertTrue(process_events_until(lambda: self.results))
+        self.assertFalse(self.results[0][0])
+        self.assertFalse(action.isEnabled())
+        self.assertEqual(1, self.widget.action_stats()['Hung']['in_flight'])
+        release.set()
+        self.assertTrue(process_events_until(action.isEnabled))
+        self.assertEqual(0, self.widget.action_stats()['Hung']['in_flight'])
+        self.assertEqual(1, len(self.results))
+
+    def test_timeout_starts_when_a_worker_runs_the_action(self):
+        release = threading.Event()
+        busy = [self.widget.add_async_action('Busy %d' % i, release.wait, timeout=None)
+                for i in range(MenuDashWidget.max_workers)]
+        for action in busy:
+            action.trigger()
+        queued = self.widget.add_async_action('Queued', lambda: None, timeout=0.05,
+                                              on_done=lambda *result: self.results.append(result))
+        queued.trigger()
+        self.assertFalse(process_events_until(lambda: self.results, timeout=0.3))
+        release.set()
+        self.assertTrue(process_events_until(lambda: self.results))
+        self.assertEqual([(True, '')], self.results)
+        self.assertTrue(process_events_until(lambda: all(action.isEnabled() for action in busy)))
+
+    def test_nothing_is_reported_after_shutdown(self):
+        release = threading.Event()
+        action = self.widget.add_async_action('Slow', release.wait, timeout=0.05,
+                                              on_done=lambda *result: self.results.append(result))
+        action.trigger()
+        self.widget.shutdown_widget()
+        release.set()
+        self.assertFalse(process_events_until(lambda: self.results, timeout=0.3))
+        self.assertEqual({}, self.widget._in_flight)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+
+from rqt_robot_dashboard.metrics import Histogram, MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_disabled_registry_hands_out_no_ops(self):
+        registry = MetricsRegistry()
+        registry.enabled = False
+        counter = registry.counter('widget/messages')
+        counter.inc()
+        with registry.histogram('widget/duration').time():
+            pass
+        self.assertEqual({}, registry.snapshot())
+        self.assertIs(counter, registry.gauge('widget/queue length'))
+
+    def test_enabled_registry_records(self):
+        registry = MetricsRegistry()
+        registry.enabled = True
+        registry.counter('widget/messages').inc()
+        registry.counter('widget/messages').inc(2)
+        registry.gauge('widget/queue length').set(5)
+        registry.gauge('widget/queue length').set(1)
+        snapshot = registry.snapshot()
+        self.assertEqual(3, snapshot['widget/messages']['value'])
+        self.assertEqual(1, snapshot['widget/queue length']['value'])
+        self.assertEqual(5, snapshot['widget/queue length']['max'])
+
+        registry.remove('widget/')
+        self.assertEqual({}, registry.snapshot())
+
+    def test_scopes_are_unique_per_instance(self):
+        registry = MetricsRegistry()
+        registry.enabled = True
+        first = registry.scope('Console')
+        second = registry.scope('Console')
+        self.assertEqual('Console', first)
+        self.assertEqual('Console#2', second)
+        registry.counter('%s/messages' % first).inc()
+        registry.counter('%s/messages' % second).inc(2)
+        self.assertEqual(1, registry.snapshot()['Console/messages']['value'])
+
+        registry.release(first)
+        self.assertEqual(['Console#2/messages'], list(registry.snapshot()))
+        self.assertEqual('Console#3', registry.scope('Console'))
+
+    def test_disabled_registry_reserves_no_scopes(self):
+        registry = MetricsRegistry()
+        registry.enabled = False
+        self.assertEqual('Console', registry.scope('Console'))
+        self.assertEqual('Console', registry.scope('Console'))
+        self.assertEqual({}, registry._scope_counts)
+
+    def test_histogram_buckets(self):
+        histogram = Histogram('sizes', (1, 10))
+        for value in (0, 1, 5, 10, 11, 1000):
+            histogram.observe(value)
+        self.assertEqual([2, 2, 2], histogram.buckets)
+        self.assertEqual(6, histogram.count)
+        self.assertEqual(1000, histogram.max)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+
+from python_qt_binding.QtWidgets import QApplication
+
+from rqt_robot_dashboard.notifications import NotificationManager
+from rqt_robot_dashboard.transport import FakeTransport, get_transport, set_transport
+
+
+class TestNotificationManager(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication([''])
+
+    def setUp(self):
+        self._previous_transport = get_transport()
+        self.transport = FakeTransport()
+        set_transport(self.transport)
+        self.now = 100.0
+        self.manager = NotificationManager(history=3, log_interval=5.0, clock=lambda: self.now)
+
+    def tearDown(self):
+        set_transport(self._previous_transport)
+
+    def test_identical_messages_are_coalesced(self):
+        for _ in range(3):
+            self.manager.notify('error', 'Motors halted', 'Motors')
+        self.manager.notify('warn', 'Low battery', 'Battery')
+        notifications = self.manager.notifications()
+        self.assertEqual(2, len(notifications))
+        self.assertEqual(3, [n for n in notifications if n.level == 'error'][0].count)
+
+    def test_logging_is_rate_limited(self):
+        for _ in range(4):
+            self.manager.notify('error', 'Motors halted', 'Motors')
+            self.now += 1.0
+        self.assertEqual([('error', 'Motors halted')], self.transport.logs)
+        self.now += 5.0
+        self.manager.notify('error', 'Motors halted', 'Motors')
+        self.assertEqual(('error', 'Motors halted (repeated 3 more times)'), self.transport.logs[-1])
+
+    def test_history_is_bounded(self):
+        for i in range(5):
+            self.manager.notify('info', 'Message %d' % i, 'Info')
+            self.now += 1.0
+        self.assertEqual(['Message 4', 'Message 3', 'Message 2'],
+                         [n.text for n in self.manager.notifications()])
+
+    def test_least_recently_reported_message_is_forgotten(self):
+        for text in ('A', 'B', 'C', 'A', 'D'):
+            self.manager.notify('info', text, 'Info')
+            self.now += 1.0
+        self.assertEqual(['D', 'A', 'C'], [n.text for n in self.manager.notifications()])
+
+    def test_closed_panel_is_not_reopened_by_repeats(self):
+        self.manager.notify('error', 'Motors halted', 'Motors')
+        QApplication.processEvents()
+        panel = self.manager.panel()
+        self.assertTrue(panel.isVisible())
+        panel.close()
+        for _ in range(10):
+            self.now += 0.1
+            self.manager.notify('error', 'Motors halted', 'Motors')
+            QApplication.processEvents()
+        self.assertFalse(panel.isVisible())
+
+        # A new message opens it again
+        self.manager.notify('error', 'Runstop pressed', 'Motors')
+        QApplication.processEvents()
+        self.assertTrue(panel.isVisible())
+        panel.close()
+
+        # and so does a repeat after show_interval
+        self.now += 60.0
+        self.manager.notify('error', 'Motors halted', 'Motors')
+        QApplication.processEvents()
+        self.assertTrue(panel.isVisible())
+        panel.close()
+
+    def test_panel_is_refreshed_once_in_the_event_loop(self):
+        refreshes = []
+        self.manager.changed.connect(lambda: refreshes.append(True))
+        for _ in range(10):
+            self.manager.notify('error', 'Motors halted', 'Motors')
+        self.assertEqual([], refreshes)
+        QApplication.processEvents()
+        self.assertEqual([True], refreshes)
+        self.manager.panel().close()
+
+
+if __name__ == '__main__':
+    unittest.main()
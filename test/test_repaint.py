@@ -0,0 +1,118 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+import unittest
+
+from python_qt_binding.QtWidgets import QApplication
+
+from rqt_robot_dashboard.repaint import RepaintScheduler
+
+
+class TestRepaintScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.commits = []
+        self.widget = object()
+
+    def _commit(self, value):
+        return lambda: self.commits.append(value)
+
+    def test_disabled_commits_immediately(self):
+        scheduler = RepaintScheduler(frame_rate=0)
+        scheduler.schedule(self.widget, self._commit(1))
+        self.assertFalse(scheduler.enabled)
+        self.assertEqual([1], self.commits)
+
+    def test_latest_change_per_widget_is_committed(self):
+        scheduler = RepaintScheduler(frame_rate=10)
+        other = object()
+        scheduler.schedule(self.widget, self._commit(1))
+        scheduler.schedule(self.widget, self._commit(2))
+        scheduler.schedule(other, self._commit(3))
+        self.assertEqual([], self.commits)
+        scheduler.flush()
+        self.assertEqual([2, 3], sorted(self.commits))
+
+    def test_frames_are_throttled(self):
+        scheduler = RepaintScheduler(frame_rate=10)
+        self.assertEqual(0, scheduler._frame_delay())
+        scheduler.schedule(self.widget, self._commit(1))
+        scheduler.flush()
+        # The next frame waits for the rest of the 100 ms interval
+        self.assertTrue(50 < scheduler._frame_delay() <= 100)
+        scheduler.set_frame_rate(2)
+        self.assertTrue(450 < scheduler._frame_delay() <= 500)
+
+    def test_urgent_change_bypasses_throttle(self):
+        scheduler = RepaintScheduler(frame_rate=10)
+        scheduler.schedule(self.widget, self._commit(1))
+        scheduler.schedule(self.widget, self._commit(2), urgent=True)
+        self.assertEqual([2], self.commits)
+        # The older pending change is dropped
+        scheduler.flush()
+        self.assertEqual([2], self.commits)
+
+    def test_cancel_drops_pending_change(self):
+        scheduler = RepaintScheduler(frame_rate=10)
+        scheduler.schedule(self.widget, self._commit(1))
+        scheduler.cancel(self.widget)
+        scheduler.cancel(object())
+        scheduler.flush()
+        self.assertEqual([], self.commits)
+
+    def test_disabling_flushes_pending_changes(self):
+        scheduler = RepaintScheduler(frame_rate=10)
+        scheduler.schedule(self.widget, self._commit(1))
+        scheduler.set_frame_rate(None)
+        self.assertEqual([1], self.commits)
+
+    def test_deleted_widget_does_not_stop_the_frame(self):
+        scheduler = RepaintScheduler(frame_rate=10)
+
+        def deleted():
+            raise RuntimeError('wrapped C/C++ object has been deleted')
+        scheduler.schedule(object(), deleted)
+        scheduler.schedule(self.widget, self._commit(1))
+        scheduler.flush()
+        self.assertEqual([1], self.commits)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import threading
+import unittest
+from multiprocessing import Pipe
+
+from rqt_robot_dashboard.log_store import LogRecord, LogSummary
+from rqt_robot_dashboard.rosout_worker import RosoutWorker, _sample
+
+
+class FakeProcess(object):
+
+    def __init__(self):
+        self.returncode = None
+        self.waited = threading.Event()
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        self.waited.set()
+        self.returncode = 0
+        return 0
+
+    def terminate(self):
+        self.returncode = -15
+
+
+class FakeWorker(RosoutWorker):
+
+    def _spawn(self):
+        conn, self.child = Pipe()
+        self.process = FakeProcess()
+        return conn, self.process
+
+
+def make_record(secs, severity=8):
+    return LogRecord(secs, 0, severity, '/node', 'file.py:func:1', [], 'Failed')
+
+
+class TestRosoutWorker(unittest.TestCase):
+
+    def test_poll_receives_batches_without_blocking(self):
+        worker = FakeWorker()
+        worker.start()
+        self.assertEqual(([], LogSummary(0, 0, 0, 0, 0)), worker.poll())
+        worker.child.send(([make_record(1), make_record(2)], [0, 5, 0, 2, 0], 0))
+        worker.child.send(([make_record(3)], [0, 0, 1, 1, 0], 4))
+        records, counts = worker.poll()
+        self.assertEqual([1, 2, 3], [r.secs for r in records])
+        self.assertEqual(LogSummary(0, 5, 1, 3, 0), counts)
+        self.assertEqual(4, worker.dropped)
+        self.assertTrue(worker.alive)
+
+    def test_poll_limits_records_per_call(self):
+        worker = FakeWorker()
+        worker.start()
+        for secs in range(0, 6, 2):
+            worker.child.send(([make_record(secs), make_record(secs + 1)], [0, 0, 0, 2, 0], 0))
+        records, counts = worker.poll(max_records=3)
+        self.assertEqual(4, len(records))
+        self.assertEqual(4, counts.error)
+        self.assertEqual(2, len(worker.poll(max_records=3)[0]))
+
+    def test_sample_prefers_warnings_and_keeps_order(self):
+        records = [make_record(secs, 4 if secs in (1, 5) else 2) for secs in range(8)]
+        self.assertEqual([1, 5, 6, 7], [r.secs for r in _sample(records, 4)])
+        self.assertEqual([5], [r.secs for r in _sample(records, 1)])
+        self.assertIs(records, _sample(records, 8))
+
+    def test_closed_pipe_marks_worker_dead(self):
+        worker = FakeWorker()
+        worker.start()
+        worker.child.send(([make_record(1)], [0, 0, 0, 1, 0], 0))
+        worker.child.close()
+        self.assertEqual(1, len(worker.poll()[0]))
+        self.assertEqual([], worker.poll()[0])
+        self.assertFalse(worker.alive)
+
+    def test_exited_process_marks_worker_dead(self):
+        worker = FakeWorker()
+        worker.start()
+        worker.process.returncode = 1
+        self.assertFalse(worker.alive)
+
+    def test_stop_asks_the_worker_to_exit(self):
+        worker = FakeWorker()
+        worker.start()
+        child, process = worker.child, worker.process
+        worker.stop()
+        self.assertIsNone(child.recv())
+        self.assertTrue(process.waited.is_set())
+        self.assertFalse(worker.alive)
+
+    def test_stop_without_blocking_waits_in_the_background(self):
+        worker = FakeWorker()
+        worker.start()
+        child, process = worker.child, worker.process
+        worker.stop(block=False)
+        self.assertFalse(worker.alive)
+        self.assertIsNone(child.recv())
+        self.assertTrue(process.waited.wait(5.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+from collections import namedtuple
+
+from rqt_robot_dashboard.severity_index import SeverityIndex, fingerprint
+
+Message = namedtuple('Message', ['severity', 'node', 'message'])
+
+
+class TestSeverityIndex(unittest.TestCase):
+
+    def test_counts_per_node_and_fingerprint(self):
+        index = SeverityIndex(window=10.0)
+        index.add_messages(1.0, [Message(8, '/arm', 'Joint 3 failed'),
+                                 Message(8, '/arm', 'Joint 4 failed'),
+                                 Message(4, '/base', 'Slow'),
+                                 Message(2, '/base', 'Info is not counted')])
+        index.add_messages(2.0, [Message(16, '/base', 'Motors halted')])
+        self.assertEqual([('/base', [1, 0, 1]), ('/arm', [0, 2, 0])], index.top_nodes())
+        self.assertEqual('Joint # failed', fingerprint('Joint 4 failed'))
+        self.assertEqual([(('/base', 'Motors halted'), [0, 0, 1]),
+                          (('/arm', 'Joint # failed'), [0, 2, 0])], index.top_fingerprints(2))
+
+    def test_counts_leave_the_window(self):
+        index = SeverityIndex(window=10.0)
+        index.add_messages(1.0, [Message(8, '/arm', 'Failed')])
+        index.add_messages(5.0, [Message(4, '/arm', 'Slow')])
+        index.expire(10.5)
+        self.assertEqual([('/arm', [1, 1, 0])], index.top_nodes())
+        index.expire(11.0)
+        self.assertEqual([('/arm', [1, 0, 0])], index.top_nodes())
+        index.expire(100.0)
+        self.assertEqual([], index.top_nodes())
+
+    def test_time_jumping_back_resets(self):
+        index = SeverityIndex()
+        index.add_messages(100.0, [Message(8, '/arm', 'Failed')])
+        index.add_messages(1.0, [Message(4, '/arm', 'Slow')])
+        self.assertEqual([('/arm', [1, 0, 0])], index.top_nodes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import unittest
+
+import rospy
+
+from rqt_robot_dashboard.subscription_hub import SubscriptionHub
+
+
+class _Subscriber(object):
+    """Records what the hub does with a ``rospy.Subscriber``."""
+
+    def __init__(self, name, data_class, callback, callback_args):
+        self.name = name
+        self.data_class = data_class
+        self._callback = callback
+        self._callback_args = callback_args
+        self.unregistered = False
+
+    def publish(self, msg):
+        self._callback(msg, self._callback_args)
+
+    def unregister(self):
+        self.unregistered = True
+
+
+class TestSubscriptionHub(unittest.TestCase):
+
+    def setUp(self):
+        self._rospy_subscriber = rospy.Subscriber
+        self.subscribers = []
+
+        def create(*args):
+            subscriber = _Subscriber(*args)
+            self.subscribers.append(subscriber)
+            return subscriber
+        rospy.Subscriber = create
+        self.hub = SubscriptionHub()
+
+    def tearDown(self):
+        rospy.Subscriber = self._rospy_subscriber
+
+    def test_topic_shared_per_message_type(self):
+        self.hub.subscribe('/battery', int, lambda msg: None)
+        self.hub.subscribe('/battery', int, lambda msg: None)
+        self.hub.subscribe('/battery', str, lambda msg: None)
+        self.assertEqual(2, len(self.subscribers))
+        self.assertEqual(2, self.hub.subscriber_count('/battery', int))
+        self.assertEqual(1, self.hub.subscriber_count('/battery', str))
+
+    def test_last_unregister_unregisters_subscriber(self):
+        first = self.hub.subscribe('/battery', int, lambda msg: None)
+        second = self.hub.subscribe('/battery', int, lambda msg: None)
+        first.unregister()
+        first.unregister()
+        self.assertEqual(1, self.hub.subscriber_count('/battery', int))
+        self.assertFalse(self.subscribers[0].unregistered)
+        second.unregister()
+        self.assertEqual(0, self.hub.subscriber_count('/battery', int))
+        self.assertTrue(self.subscribers[0].unregistered)
+
+        # A new subscription after the last one is gone creates a new subscriber
+        self.hub.subscribe('/battery', int, lambda msg: None)
+        self.assertEqual(2, len(self.subscribers))
+
+    def test_dispatch_to_every_callback(self):
+        received = []
+
+        def failing(msg):
+            raise RuntimeError('widget bug')
+        self.hub.subscribe('/battery', int, lambda msg: received.append(('a', msg)))
+        self.hub.subscribe('/battery', int, failing)
+        self.hub.subscribe('/battery', int, lambda msg: received.append(('b', msg)))
+        self.subscribers[0].publish(42)
+        self.assertEqual([('a', 42), ('b', 42)], received)
+
+    def test_callback_unregistered_during_dispatch_is_skipped(self):
+        received = []
+        handles = []
+        handles.append(self.hub.subscribe('/battery', int, lambda msg: handles[1].unregister()))
+        handles.append(self.hub.subscribe('/battery', int, received.append))
+        self.subscribers[0].publish(42)
+        self.assertEqual([], received)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+
+from rqt_robot_dashboard.transport import FakeTransport, get_transport, set_transport
+
+
+class TestFakeTransport(unittest.TestCase):
+
+    def test_publish_reaches_subscribers_of_topic(self):
+        transport = FakeTransport()
+        received = []
+        transport.subscribe('diagnostics_toplevel_state', object, received.append)
+        handle = transport.subscribe('/diagnostics_toplevel_state', object, received.append)
+        transport.subscribe('/rosout_agg', object, self.fail)
+
+        self.assertEqual(2, transport.publish('/diagnostics_toplevel_state', 'msg'))
+        self.assertEqual(['msg', 'msg'], received)
+
+        handle.unregister()
+        handle.unregister()
+        self.assertEqual(1, transport.subscriber_count('diagnostics_toplevel_state'))
+
+    def test_manual_clock_and_logs(self):
+        transport = FakeTransport(start_time=10.0)
+        transport.advance(2.5)
+        self.assertEqual(12.5, transport.get_time())
+        transport.logwarn('careful')
+        self.assertEqual([('warn', 'careful')], transport.logs)
+
+    def test_clock_listeners_follow_the_manual_clock(self):
+        transport = FakeTransport()
+        times = []
+        transport.add_clock_listener(times.append)
+        transport.set_time(5.0)
+        transport.advance(0.5)
+        transport.remove_clock_listener(times.append)
+        transport.advance(1.0)
+        self.assertEqual([5.0, 5.5], times)
+        self.assertTrue(transport.manual_clock)
+        self.assertFalse(FakeTransport(clock=lambda: 1.0).manual_clock)
+
+    def test_set_transport(self):
+        transport = FakeTransport()
+        previous = set_transport(transport)
+        try:
+            self.assertIs(transport, get_transport())
+        finally:
+            set_transport(previous)
+        self.assertIs(previous, get_transport())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+import unittest
+
+from python_qt_binding.QtCore import QRect, QSize, Qt
+from python_qt_binding.QtGui import QColor, QImage
+from python_qt_binding.QtWidgets import QApplication
+
+from rqt_robot_dashboard.util import IconAtlas
+
+
+class TestIconAtlas(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.atlas = IconAtlas(QSize(10, 10), columns=4)
+
+    def _image(self, color=Qt.red):
+        image = QImage(4, 4, QImage.Format_ARGB32_Premultiplied)
+        image.fill(QColor(color))
+        return image
+
+    def test_slots_are_packed_in_rows(self):
+        self.assertEqual(0, self.atlas.add(self._image(), 'first'))
+        self.assertEqual(1, self.atlas.add(self._image()))
+        self.assertEqual(2, self.atlas.count())
+        self.assertEqual(0, self.atlas.find('first'))
+        self.assertIsNone(self.atlas.find('missing'))
+        self.assertEqual(QRect(10, 10, 10, 10), self.atlas.rect(5))
+
+    def test_atlas_doubles_in_height(self):
+        heights = []
+        for _ in range(9):
+            self.atlas.add(self._image())
+            heights.append(self.atlas._image.height())
+        self.assertEqual([10] * 4 + [20] * 4 + [40], heights)
+        self.assertEqual(40, self.atlas._image.width())
+
+    def test_icons_kept_when_growing(self):
+        self.atlas.add(self._image(Qt.red))
+        for _ in range(8):
+            self.atlas.add(self._image(Qt.blue))
+        # Centered in the cell
+        self.assertEqual(QColor(Qt.red).rgba(), self.atlas._image.pixel(5, 5))
+        self.assertEqual(0, self.atlas._image.pixel(1, 1))
+        self.assertEqual(QColor(Qt.blue).rgba(), self.atlas._image.pixel(5, 25))
+
+    def test_pixmap_converted_after_add_only(self):
+        self.atlas.add(self._image())
+        pixmap = self.atlas.pixmap()
+        self.assertIs(pixmap, self.atlas.pixmap())
+        self.atlas.add(self._image())
+        self.assertIsNot(pixmap, self.atlas.pixmap())
+
+
+if __name__ == '__main__':
+    unittest.main()
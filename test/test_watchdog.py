@@ -0,0 +1,110 @@
+#!/usr/bin/python
+
+# Software License Agreement (BSD License)
+#
+# Copyright (c) 2013, Willow Garage, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions
+# are met:
+#
+# * Redistributions of source code must retain the above copyright
+# notice, this list of conditions and the following disclaimer.
+# * Redistributions in binary form must reproduce the above
+# copyright notice, this list of conditions and the following
+# disclaimer in the documentation and/or other materials provided
+# with the distribution.
+# * Neither the name of Willow Garage, Inc. nor the names of its
+# contributors may be used to endorse or promote products derived
+# from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS
+# "AS IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT
+# LIMITED TO, THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS
+# FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE
+# COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING,
+# BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN
+# ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import sys
+import time
+import unittest
+
+from python_qt_binding.QtCore import QCoreApplication
+
+from rqt_robot_dashboard.transport import FakeTransport, set_transport
+from rqt_robot_dashboard.watchdog import EventLoopWatchdog
+
+
+class TestEventLoopWatchdog(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    def setUp(self):
+        self.transport = FakeTransport()
+        self._previous = set_transport(self.transport)
+
+    def tearDown(self):
+        set_transport(self._previous)
+
+    def _slot(self, value):
+        return value
+
+    def test_disabled_returns_slot_unchanged(self):
+        watchdog = EventLoopWatchdog()
+        watchdog.enabled = False
+        slot = self._slot
+        self.assertIs(slot, watchdog.watch(slot))
+        watchdog.start()
+        self.assertIsNone(watchdog._timer)
+
+    def test_watched_slot_drops_extra_signal_arguments(self):
+        watchdog = EventLoopWatchdog(threshold=100)
+        wrapped = watchdog.watch(self._slot, 'Test._slot')
+        # e.g. clicked(bool) connected to a slot taking one argument
+        self.assertEqual(3, wrapped(3, True))
+        self.assertEqual('Test._slot', watchdog._culprit)
+
+    def test_stall_is_attributed_to_slowest_slot(self):
+        watchdog = EventLoopWatchdog(threshold=100)
+        watchdog.watch(lambda: None, 'fast')()
+        watchdog.watch(lambda: time.sleep(0.01), 'slow')()
+        watchdog._last_beat = time.time() - 0.5
+        watchdog._beat()
+        self.assertEqual(1, len(watchdog.stalls))
+        self.assertEqual('slow', watchdog.stalls[0][2])
+        self.assertEqual('warn', self.transport.logs[0][0])
+        self.assertIn('slow (ran', self.transport.logs[0][1])
+        # The culprit is reset with every heartbeat
+        self.assertIsNone(watchdog._culprit)
+
+    def test_no_stall_below_threshold(self):
+        watchdog = EventLoopWatchdog(threshold=100)
+        watchdog._last_beat = time.time()
+        watchdog._beat()
+        self.assertEqual([], watchdog.stalls)
+        self.assertEqual([], self.transport.logs)
+
+    def test_heartbeat_runs_until_last_stop(self):
+        watchdog = EventLoopWatchdog(threshold=100)
+        watchdog.start()
+        watchdog.start()
+        watchdog.stop()
+        self.assertTrue(watchdog._timer.isActive())
+        watchdog.stop()
+        self.assertIsNone(watchdog._timer)
+        watchdog.stop()
+        self.assertEqual(0, watchdog._users)
+
+
+if __name__ == '__main__':
+    unittest.main()